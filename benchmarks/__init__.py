@@ -0,0 +1,4 @@
+# benchmarks/__init__.py
+from .suite import run_all
+
+__all__ = ["run_all"]
@@ -0,0 +1,114 @@
+# benchmarks/__main__.py
+"""
+Бенчмарки бота.
+
+    python -m benchmarks                          # все замеры, JSON в stdout
+    python -m benchmarks -o new.json -b old.json  # сравнить с прошлым прогоном
+    python -m benchmarks --quick                  # только база на 1k пользователей
+    python -m benchmarks --record                 # обновить снимки с сайта
+    python -m benchmarks --generate               # синтетические снимки
+
+Код возврата 1 — есть регрессии относительно baseline
+или движки парсера расходятся на снимках.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import platform
+import sys
+import time
+from typing import Any, Dict, List
+
+from .fixtures import record_pages, write_generated_pages
+from .suite import run_all
+
+
+def find_regressions(
+    current: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """Замеры, медиана которых выросла больше чем на threshold (доля)."""
+    regressions = []
+    for name, result in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old or not old.get("median_ms"):
+            continue
+        ratio = result["median_ms"] / old["median_ms"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{name}: {old['median_ms']} -> {result['median_ms']} мс (x{ratio:.2f})"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("-o", "--output", help="куда сохранить результаты (JSON)")
+    parser.add_argument("-b", "--baseline", help="прошлый прогон для сравнения")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="допустимый рост медианы, доля (по умолчанию 0.25)",
+    )
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000,100000",
+        help="размеры базы пользователей через запятую",
+    )
+    parser.add_argument(
+        "--subscribers", type=int, default=1000, help="подписчиков в цикле чекера"
+    )
+    parser.add_argument("--quick", action="store_true", help="только 1k пользователей")
+    parser.add_argument("--record", action="store_true", help="снять страницы с сайта")
+    parser.add_argument(
+        "--generate", action="store_true", help="записать синтетические снимки"
+    )
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(record_pages())
+        return 0
+    if args.generate:
+        write_generated_pages()
+        return 0
+
+    sizes = [1000] if args.quick else [int(x) for x in args.sizes.split(",")]
+    # Логи бота (print) не должны смешиваться с JSON в stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        report = asyncio.run(run_all(sizes, args.subscribers))
+    report["meta"] = {
+        "timestamp": int(time.time()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    failed = False
+    if report["conformance"]:
+        failed = True
+        print("❌ Движки парсера расходятся:", file=sys.stderr)
+        for problem in report["conformance"]:
+            print(f"  {problem}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.threshold)
+        if regressions:
+            failed = True
+            print("❌ Регрессии производительности:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+# benchmarks/fixtures.py
+import json
+import os
+import random
+from typing import Dict, List
+
+from config import AVAILABLE_GROUPS, SCHEDULE_URLS
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "pages")
+
+_SUBJECTS = [
+    "Математика",
+    "Физика",
+    "Иностранный язык в профессиональной деятельности",
+    "Основы алгоритмизации и программирования",
+    "МДК 01.01 Разработка программных модулей",
+    "МДК 11.01 Технология разработки и защиты БД",
+    "Архитектура аппаратных средств",
+    "Теория вероятностей",
+    "Психология общения",
+    "Физическая культура",
+    "Инженерная графика",
+    "Техническая механика",
+]
+_ROOMS = ["101", "208", "302", "305", "ЦОС", "(полигон)", ""]
+_MONTHS = ["января", "февраля", "марта", "апреля", "мая", "июня"]
+
+
+def page_path(weekday: int) -> str:
+    """Файл снимка страницы дня: pages/<последний сегмент URL>.html."""
+    slug = SCHEDULE_URLS[weekday].rstrip("/").rsplit("/", 1)[-1]
+    return os.path.join(PAGES_DIR, f"{slug}.html")
+
+
+def generate_page(weekday: int, seed: int = 0) -> str:
+    """
+    Синтетическая страница в вёрстке сайта колледжа: заголовок с датой
+    в <p style="text-align: center">, таблица, где под строкой с группами
+    идёт строка с парами, и «вордовская» разметка внутри ячеек.
+    """
+    rnd = random.Random(seed * 10 + weekday)
+    span = '<span style="font-size: 10.0pt; font-family: \'Times New Roman\';">'
+    out: List[str] = [
+        "<html><head><meta charset='utf-8'><title>Расписание</title>",
+        "<style>td { border: 1px solid #000; }</style>",
+        "<script>window.dataLayer = window.dataLayer || [];</script>",
+        "</head><body><div class='menu'>",
+        "".join(f"<a href='/page{i}'>Раздел {i}</a>" for i in range(40)),
+        "</div>",
+        f'<p style="text-align: center;"><strong>{span}Расписание занятий на '
+        f"{12 + weekday} {rnd.choice(_MONTHS)} 2026 г.</span></strong></p>",
+        '<table style="border-collapse: collapse; width: 100%;"><tbody>',
+    ]
+
+    groups = list(AVAILABLE_GROUPS)
+    for start in range(0, len(groups), 4):
+        row_groups = groups[start : start + 4]
+        out.append("<tr>")
+        for group in row_groups:
+            out.append(
+                f'<td style="width: 25%; text-align: center;">'
+                f"<p><strong>{span}{group}</span></strong></p></td>"
+            )
+        out.append("</tr><tr>")
+        for _ in row_groups:
+            out.append('<td style="width: 25%; vertical-align: top;">')
+            for num in range(1, 5):
+                if rnd.random() < 0.15:
+                    out.append(f"<p>{span}{num})</span></p>")
+                    continue
+                room = rnd.choice(_ROOMS)
+                out.append(
+                    f'<p style="margin: 0cm;">{span}{num}) '
+                    f"{rnd.choice(_SUBJECTS)}&nbsp;{room}</span></p>"
+                )
+            out.append("<p>&nbsp;</p></td>")
+        out.append("</tr>")
+
+    out.append("</tbody></table><!-- footer --><div class='footer'>")
+    out.append("<p>© ГАПОУ КО «СПТ»</p></div></body></html>")
+    return "\n".join(out)
+
+
+def write_generated_pages(seed: int = 0) -> None:
+    """Перезаписывает снимки синтетическими страницами."""
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    for weekday in SCHEDULE_URLS:
+        with open(page_path(weekday), "w", encoding="utf-8") as f:
+            f.write(generate_page(weekday, seed))
+
+
+async def record_pages() -> None:
+    """Сохраняет текущие страницы сайта как снимки для бенчмарков."""
+    from schedule import ScheduleFetcher
+
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    weekdays = sorted(SCHEDULE_URLS)
+    urls = [SCHEDULE_URLS[weekday] for weekday in weekdays]
+
+    async with ScheduleFetcher() as fetcher:
+        pages = await fetcher.fetch_many(urls)
+
+    for weekday, url, html in zip(weekdays, urls, pages):
+        if html is None:
+            print(f"❌ Не удалось сохранить {url}")
+            continue
+        with open(page_path(weekday), "w", encoding="utf-8") as f:
+            f.write(html)
+        print(f"✅ {url} -> {page_path(weekday)}")
+
+
+def load_pages() -> Dict[int, str]:
+    """Снимки страниц по дням недели."""
+    pages: Dict[int, str] = {}
+    for weekday in sorted(SCHEDULE_URLS):
+        with open(page_path(weekday), "r", encoding="utf-8") as f:
+            pages[weekday] = f.read()
+    return pages
+
+
+def make_users(count: int, auto_send_share: float = 0.5, seed: int = 0) -> Dict:
+    """Синтетическая база пользователей в формате users.json."""
+    rnd = random.Random(seed)
+    users = {}
+    for i in range(count):
+        users[str(100_000_000 + i)] = {
+            "group_name": rnd.choice(AVAILABLE_GROUPS),
+            "auto_send": rnd.random() < auto_send_share,
+        }
+    return {"users": users}
+
+
+def write_users(path: str, count: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(make_users(count), f, ensure_ascii=False, indent=2)
@@ -0,0 +1,282 @@
+# benchmarks/suite.py
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from aiohttp import web
+from aiohttp.test_utils import unused_port
+
+import config
+import database
+from config import AVAILABLE_GROUPS, SCHEDULE_URLS
+from database import close_db, init_db
+from database.sqlite_storage import SqliteStorage
+from database.storage import JsonStorage
+from schedule import (
+    DayCache,
+    ScheduleFetcher,
+    compare_engines,
+    format_schedule,
+    parse_day,
+    parse_schedule,
+    parse_schedule_date,
+    render_lessons,
+)
+from schedule.engines import ENGINES
+
+from .fixtures import load_pages, make_users, write_users
+
+Results = Dict[str, Dict[str, Any]]
+
+
+def _summary(samples: List[float], number: int) -> Dict[str, Any]:
+    """Время одного вызова в мс по нескольким повторам."""
+    per_call = [sample / number * 1000 for sample in samples]
+    return {
+        "median_ms": round(statistics.median(per_call), 4),
+        "min_ms": round(min(per_call), 4),
+        "repeat": len(samples),
+        "number": number,
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int = 5, number: int = 10) -> Dict:
+    func()  # прогрев
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append(time.perf_counter() - start)
+    return _summary(samples, number)
+
+
+async def measure_async(
+    func: Callable[[], Awaitable[Any]],
+    repeat: int = 5,
+    number: int = 1,
+    setup: Callable[[], Awaitable[Any]] | None = None,
+) -> Dict:
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            await setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            await func()
+        samples.append(time.perf_counter() - start)
+    return _summary(samples, number)
+
+
+# ============ PARSER / FORMATTER ============
+
+
+def bench_parser(pages: Dict[int, str], results: Results) -> None:
+    html = pages[0]
+    group = AVAILABLE_GROUPS[len(AVAILABLE_GROUPS) // 2]
+
+    for name in ENGINES:
+        results[f"parse.page.{name}"] = measure(
+            lambda: [parse_day(page, wd, name) for wd, page in pages.items()],
+            number=2,
+        )
+        # На одну страницу
+        for key in ("median_ms", "min_ms"):
+            results[f"parse.page.{name}"][key] = round(
+                results[f"parse.page.{name}"][key] / len(pages), 4
+            )
+
+    results["parse.schedule_per_group"] = measure(lambda: parse_schedule(html, group))
+    results["parse.schedule_date_per_page"] = measure(lambda: parse_schedule_date(html))
+
+    day = parse_day(html, 0)
+    results["parse.lookup_per_group"] = measure(
+        lambda: [day.lessons_for(g) for g in AVAILABLE_GROUPS], number=1000
+    )
+
+
+def bench_formatter(pages: Dict[int, str], results: Results) -> None:
+    day = parse_day(pages[3], 3)
+    lessons = day.lessons_for(AVAILABLE_GROUPS[0])
+    texts = day.texts_for(AVAILABLE_GROUPS[0])
+
+    results["format.format_schedule"] = measure(
+        lambda: (render_lessons.cache_clear(), format_schedule(texts, 3)), number=200
+    )
+    results["format.render_cold"] = measure(
+        lambda: (render_lessons.cache_clear(), render_lessons(3, lessons)), number=200
+    )
+    results["format.render_cached"] = measure(
+        lambda: render_lessons(3, lessons), number=2000
+    )
+
+
+# ============ DATABASE ============
+
+
+async def bench_database(sizes: List[int], results: Results) -> None:
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            users_path = os.path.join(tmp, "users.json")
+            cache_path = os.path.join(tmp, "schedule_cache.json")
+            write_users(users_path, size)
+            user_ids = [int(uid) for uid in make_users(size)["users"]]
+            rnd = random.Random(size)
+            sample = [rnd.choice(user_ids) for _ in range(200)]
+
+            backends = {
+                "json": lambda: JsonStorage(users_path, cache_path),
+                "sqlite": lambda: SqliteStorage(
+                    os.path.join(tmp, "bot.db"), users_path, cache_path
+                ),
+            }
+            for backend, make_storage in backends.items():
+                prefix = f"db.{backend}.{size}"
+
+                start = time.perf_counter()
+                await init_db(make_storage(), flush_interval=0)
+                results[f"{prefix}.init"] = _summary(
+                    [time.perf_counter() - start], 1
+                )
+
+                async def reads() -> None:
+                    for user_id in sample:
+                        await database.get_user_group(user_id)
+
+                async def writes() -> None:
+                    for user_id in sample:
+                        await database.set_auto_send(user_id, True)
+                    # Сброс на диск входит в стоимость записи
+                    await database.flush_db()
+
+                results[f"{prefix}.read"] = await measure_async(reads, number=1)
+                results[f"{prefix}.write"] = await measure_async(writes, number=1)
+                results[f"{prefix}.scan_auto_send"] = await measure_async(
+                    database.get_users_with_auto_send, number=1
+                )
+                results[f"{prefix}.subscribers_by_group"] = await measure_async(
+                    database.get_subscribers_by_group, number=1
+                )
+                # Пересчёт на одну операцию чтения/записи
+                for op in ("read", "write"):
+                    for key in ("median_ms", "min_ms"):
+                        results[f"{prefix}.{op}"][key] = round(
+                            results[f"{prefix}.{op}"][key] / len(sample), 4
+                        )
+
+                await close_db()
+
+
+# ============ CHECK CYCLE ============
+
+
+class StubBot:
+    """Бот-заглушка: считает сообщения вместо отправки."""
+
+    def __init__(self) -> None:
+        self.sent = 0
+
+    async def send_message(self, chat_id: int, text: str, **kwargs) -> None:
+        self.sent += 1
+
+
+async def bench_check_cycle(
+    pages: Dict[int, str], subscribers: int, results: Results
+) -> None:
+    from services.broadcaster import Broadcaster
+    from services.schedule_checker import _check_all_days
+
+    site_pages: Dict[str, str] = {}
+
+    async def serve(request: web.Request) -> web.Response:
+        return web.Response(text=site_pages[request.path], content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{slug}", serve)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = unused_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    original_urls = dict(SCHEDULE_URLS)
+    for weekday, url in original_urls.items():
+        slug = "/" + url.rstrip("/").rsplit("/", 1)[-1]
+        site_pages[slug] = pages[weekday]
+        config.SCHEDULE_URLS[weekday] = f"http://127.0.0.1:{port}{slug}"
+
+    bot = StubBot()
+    # Без лимитов Telegram: меряем собственную работу чекера
+    broadcaster = Broadcaster(bot, rate=1e9, chat_interval=0, workers=32)
+    tmp = tempfile.TemporaryDirectory()
+    state: Dict[str, Any] = {}
+
+    async def fresh_state() -> None:
+        """Пустой кэш и новый fetcher — все страницы «новые»."""
+        await close_db()
+        users_path = os.path.join(tmp.name, "users.json")
+        cache_path = os.path.join(tmp.name, "schedule_cache.json")
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+        write_users(users_path, subscribers * 2)
+        await init_db(JsonStorage(users_path, cache_path), flush_interval=0)
+        if "fetcher" in state:
+            await state["fetcher"].close()
+        state["fetcher"] = ScheduleFetcher()
+        state["day_cache"] = DayCache(state["fetcher"])
+        render_lessons.cache_clear()
+
+    async def cycle() -> None:
+        await _check_all_days(broadcaster, state["day_cache"])
+
+    try:
+        results["check_cycle.cold"] = await measure_async(
+            cycle, repeat=3, setup=fresh_state
+        )
+        results["check_cycle.cold"]["messages"] = bot.sent // 3
+        # Страницы не менялись: 304/тот же digest, без разбора и сравнения
+        results["check_cycle.unchanged"] = await measure_async(cycle, repeat=5)
+
+        async def restart() -> None:
+            """Новый fetcher (как после перезапуска), кэш отпечатков на месте."""
+            await state["fetcher"].close()
+            state["fetcher"] = ScheduleFetcher()
+            state["day_cache"] = DayCache(state["fetcher"])
+
+        # Страницы разбираются заново, но совпавший отпечаток страницы
+        # пропускает сверку групп
+        results["check_cycle.restart"] = await measure_async(
+            cycle, repeat=3, setup=restart
+        )
+    finally:
+        config.SCHEDULE_URLS.update(original_urls)
+        await state["fetcher"].close()
+        await close_db()
+        tmp.cleanup()
+        await runner.cleanup()
+
+
+# ============ CONFORMANCE ============
+
+
+def check_conformance(pages: Dict[int, str]) -> List[str]:
+    """Движки разбора должны давать одинаковый результат на всех снимках."""
+    problems = []
+    for weekday, html in pages.items():
+        for problem in compare_engines(html):
+            problems.append(f"{weekday}: {problem}")
+    return problems
+
+
+async def run_all(sizes: List[int], subscribers: int) -> Dict[str, Any]:
+    pages = load_pages()
+    results: Results = {}
+
+    bench_parser(pages, results)
+    bench_formatter(pages, results)
+    await bench_database(sizes, results)
+    await bench_check_cycle(pages, subscribers, results)
+
+    return {"results": results, "conformance": check_conformance(pages)}
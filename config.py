@@ -11,15 +11,121 @@ BOT_TOKEN = os.getenv("token")
 # Группа по умолчанию (для новых пользователей)
 DEFAULT_GROUP = "ИСП-21-24"
 
-# Путь к базе данных (теперь JSON)
+# Как получать апдейты: "polling" (getUpdates) или "webhook"
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+
+# Webhook: где слушать и какой адрес сообщить Telegram
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+# Публичный адрес за reverse proxy, например https://bot.example.com
+# (пусто — webhook в Telegram уже зарегистрирован снаружи)
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL", "")
+# Секрет из заголовка X-Telegram-Bot-Api-Secret-Token
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+
+# Несколько реплик бота: сайт проверяет и рассылает только лидер
+# (по аренде в SHARED_DB_PATH), остальные берут разобранные страницы
+# из общего хранилища. "local" — одна реплика, аренда не нужна.
+# Для нескольких реплик нужен и DB_BACKEND=sqlite.
+LEADER_BACKEND = os.getenv("LEADER_BACKEND", "local")
+SHARED_DB_PATH = os.getenv("SHARED_DB_PATH", "data/shared.db")
+LEADER_LEASE_TTL = 30  # аренда истекает, если лидер не продлил её (сек)
+LEADER_RENEW_INTERVAL = 10  # как часто продлевать/пытаться захватить (сек)
+# Сколько доверять странице, которую лидер последний раз подтвердил (сек)
+PAGE_STORE_MAX_AGE = 3600
+# Одна реплика: последние разобранные страницы хранятся здесь и переживают
+# перезапуск — кнопки отвечают из них, даже пока сайт недоступен
+PAGES_DB_PATH = "data/pages.db"
+# С какого возраста ответ из последней известной версии помечается (сек)
+STALE_NOTICE_AGE = 600
+
+# Профили пользователей в памяти (LRU): горячие пользователи не читают хранилище
+PROFILE_CACHE_SIZE = 10000  # максимум профилей
+PROFILE_CACHE_TTL = 300  # сек; изменения с другой реплики видны не позже
+
+# Бэкенд хранилища: "json" (файлы ниже) или "sqlite"
+DATABASE_BACKEND = os.getenv("DB_BACKEND", "json")
+
+# Путь к базе данных (JSON)
 DATABASE_PATH = "data/users.json"
 
+# Как часто сбрасывать изменения JSON-хранилища на диск (сек)
+DB_FLUSH_INTERVAL = 5
+
+# Путь к базе SQLite (при первом запуске данные переносятся из JSON)
+SQLITE_PATH = "data/bot.db"
+
 # Путь к кэшу расписания (для детекта изменений)
 SCHEDULE_CACHE_PATH = "data/schedule_cache.json"
 
-# Интервал проверки расписания (в секундах)
+# Интервал проверки расписания вне окон публикации (в секундах)
 CHECK_INTERVAL = 300  # 5 минут
 
+# Адаптивный опрос сайта (services/poller.py)
+# Окна, когда колледж обычно выкладывает расписание (местное время)
+POLL_WINDOWS: list[tuple[str, str]] = [("12:00", "18:00"), ("19:00", "22:00")]
+POLL_WINDOW_INTERVAL = 30  # интервал внутри окна (сек)
+POLL_WINDOW_MAX_INTERVAL = 60  # потолок отката внутри окна (сек)
+POLL_MAX_INTERVAL = 1800  # потолок отката вне окон (сек)
+POLL_BACKOFF_FACTOR = 2  # во сколько раз растёт интервал, пока страница не меняется
+POLL_JITTER = 0.1  # случайный разброс интервала, доля
+POLL_LOOKAHEAD_DAYS = 3  # опрашивать дни, до которых не больше N дней
+
+# HTTP-клиент для загрузки расписания
+FETCH_TIMEOUT = 4  # таймаут одной попытки (сек)
+# Таймаут установки соединения (сек) — часть FETCH_TIMEOUT, должен быть меньше
+FETCH_CONNECT_TIMEOUT = 2
+FETCH_POOL_LIMIT_PER_HOST = 10  # соединений на один хост
+FETCH_DNS_CACHE_TTL = 600  # время жизни DNS-кэша (сек)
+FETCH_CONCURRENCY = 5  # одновременных запросов в fetch_many
+FETCH_DEADLINE = 8  # дедлайн запроса со всеми повторами (сек)
+# Запас внешнего дедлайна iter_many сверх FETCH_DEADLINE (сек): бюджет
+# повторов соблюдает сама политика, внешний ловит только зависания
+FETCH_DEADLINE_GRACE = 2
+
+# Политика загрузки (schedule/policy.py)
+FETCH_RETRIES = 2  # повторов после временной ошибки (сеть, таймаут, 5xx)
+FETCH_BACKOFF_BASE = 0.5  # пауза перед первым повтором (сек), дальше ×2
+FETCH_BACKOFF_MAX = 4  # потолок паузы (сек)
+FETCH_BACKOFF_JITTER = 0.5  # случайный разброс паузы, доля
+FETCH_BREAKER_THRESHOLD = 5  # неудач подряд, после которых хост выключается
+FETCH_BREAKER_RESET = 30  # на сколько выключается хост (сек)
+# Дублирующий запрос, если ответ дольше p95 недавних (идемпотентный GET)
+FETCH_HEDGE = os.getenv("FETCH_HEDGE", "0") == "1"
+FETCH_HEDGE_QUANTILE = 0.95
+FETCH_HEDGE_MIN_DELAY = 0.2  # не раньше чем через (сек)
+FETCH_HEDGE_MIN_SAMPLES = 20  # сколько ответов нужно для оценки квантиля
+
+# Кэш разобранных страниц в памяти (для кнопок меню)
+DAY_CACHE_TTL = 120  # время жизни записи (сек)
+DAY_CACHE_SIZE = 16  # максимум страниц в кэше
+
+# Движок разбора HTML: "bs4" (эталонный) или "stream" (быстрый, без DOM;
+# совпадение с bs4 проверяет tests/test_engines.py)
+PARSER_ENGINE = os.getenv("PARSER_ENGINE", "bs4")
+
+# Где разбирать HTML: "process", "thread" или "inline" (в event loop, для тестов)
+PARSE_POOL_MODE = os.getenv("PARSE_POOL", "process")
+PARSE_POOL_WORKERS = 2
+
+# Максимальная длина одного сообщения Telegram
+MESSAGE_LIMIT = 4096
+
+# Сколько отрендеренных расписаний держать в памяти
+RENDER_CACHE_SIZE = 256
+
+# Рассылка уведомлений (лимиты Telegram Bot API)
+BROADCAST_RATE = 30  # сообщений в секунду на всего бота
+BROADCAST_CHAT_INTERVAL = 1.0  # минимум секунд между сообщениями в один чат
+BROADCAST_WORKERS = 8  # параллельных отправителей
+BROADCAST_MAX_RETRIES = 3  # повторов после RetryAfter
+
+# Метрики Prometheus: http://METRICS_HOST:METRICS_PORT/metrics
+METRICS_ENABLED = os.getenv("METRICS", "0") == "1"
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+
 # Список всех доступных групп
 AVAILABLE_GROUPS: list[str] = [
     "ИСП-11-25",
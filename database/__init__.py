@@ -1,28 +1,44 @@
 # database/__init__.py
 from .db import (
+    cache_batch,
+    close_db,
+    create_storage,
+    flush_db,
     get_auto_send,
-    get_cached_date,
-    get_cached_schedule,
+    get_cached_day,
+    get_profile,
+    get_subscribers_by_group,
     get_user_group,
     get_users_with_auto_send,
     init_db,
+    save_profile,
     set_auto_send,
-    set_cached_date,
-    set_cached_schedule,
+    set_cached_day,
     set_user_group,
     user_exists,
 )
+from .profiles import UserProfile
+from .storage import JsonStorage, Storage, lessons_digest
 
 __all__ = [
+    "Storage",
+    "JsonStorage",
+    "create_storage",
+    "lessons_digest",
     "init_db",
+    "flush_db",
+    "close_db",
+    "UserProfile",
+    "get_profile",
+    "save_profile",
     "get_user_group",
     "set_user_group",
     "user_exists",
     "get_auto_send",
     "set_auto_send",
     "get_users_with_auto_send",
-    "get_cached_schedule",
-    "set_cached_schedule",
-    "get_cached_date",
-    "set_cached_date",
+    "get_subscribers_by_group",
+    "cache_batch",
+    "get_cached_day",
+    "set_cached_day",
 ]
@@ -1,153 +1,262 @@
 # database/db.py
-import json
-import os
-from typing import Any, Dict, List
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, TypeVar
+
+from config import (
+    DATABASE_BACKEND,
+    DATABASE_PATH,
+    DB_FLUSH_INTERVAL,
+    DEFAULT_GROUP,
+    PROFILE_CACHE_SIZE,
+    PROFILE_CACHE_TTL,
+    SCHEDULE_CACHE_PATH,
+    SQLITE_PATH,
+)
+from metrics import Histogram
+
+from .profiles import ProfileCache, UserProfile
+from .storage import JsonStorage, Storage, new_day_record
+
+T = TypeVar("T")
+
+# С ожиданием в очереди потока ввода-вывода — столько ждёт вызывающий
+DB_SECONDS = Histogram("database_operation_seconds", "Операции хранилища", ["op"])
+
+_storage: Storage | None = None
+_flush_task: asyncio.Task | None = None
+
+# Все обращения к хранилищу идут через один поток: файловый и SQLite
+# ввод-вывод не блокирует event loop, а записи выполняются строго по очереди
+_io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-io")
+
+# Профили недавно активных пользователей
+_profiles = ProfileCache(PROFILE_CACHE_SIZE, PROFILE_CACHE_TTL)
+
+# Изменения кэша, накопленные внутри cache_batch() (None — вне пакета)
+_cache_batch: ContextVar[Dict[str, Any] | None] = ContextVar(
+    "cache_batch", default=None
+)
+
+
+def create_storage(backend: str = DATABASE_BACKEND) -> Storage:
+    """Создаёт хранилище по имени бэкенда из конфига."""
+    if backend == "json":
+        return JsonStorage(DATABASE_PATH, SCHEDULE_CACHE_PATH)
+    if backend == "sqlite":
+        from .sqlite_storage import SqliteStorage
+
+        return SqliteStorage(
+            SQLITE_PATH,
+            json_db_path=DATABASE_PATH,
+            json_cache_path=SCHEDULE_CACHE_PATH,
+        )
+    raise ValueError(f"Неизвестный бэкенд базы данных: {backend}")
+
+
+def _get_storage() -> Storage:
+    """Текущее хранилище (по умолчанию — из конфига)."""
+    global _storage
+    if _storage is None:
+        _storage = create_storage()
+    return _storage
+
+
+async def _run(func: Callable[..., T], *args: Any) -> T:
+    """Выполняет операцию хранилища в потоке ввода-вывода."""
+    loop = asyncio.get_running_loop()
+    with DB_SECONDS.time(func.__name__):
+        return await loop.run_in_executor(_io_executor, partial(func, *args))
 
-from config import DATABASE_PATH, DEFAULT_GROUP, SCHEDULE_CACHE_PATH
 
 # ============ USERS ============
 
 
-def _load_db() -> Dict[str, Any]:
-    """Загружает данные из JSON файла."""
-    if not os.path.exists(DATABASE_PATH):
-        return {"users": {}}
+async def _flush_loop(interval: float) -> None:
+    """Периодически сбрасывает отложенные изменения на диск."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await flush_db()
+        except Exception as e:
+            print(f"❌ Ошибка сохранения базы данных: {e}")
 
-    try:
-        with open(DATABASE_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return {"users": {}}
 
+async def init_db(
+    storage: Storage | None = None, flush_interval: float = DB_FLUSH_INTERVAL
+) -> None:
+    """Инициализация базы данных и фонового сброса изменений."""
+    global _storage, _flush_task
+    if storage is not None:
+        _storage = storage
+    _profiles.clear()
 
-def _save_db(data: Dict[str, Any]) -> None:
-    """Сохраняет данные в JSON файл."""
-    with open(DATABASE_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    await _run(_get_storage().init)
 
+    if _flush_task is None and flush_interval > 0:
+        _flush_task = asyncio.create_task(_flush_loop(flush_interval))
 
-async def init_db() -> None:
-    """Инициализация базы данных."""
-    if not os.path.exists(DATABASE_PATH):
-        _save_db({"users": {}})
 
-    if not os.path.exists(SCHEDULE_CACHE_PATH):
-        _save_cache({})
+async def flush_db() -> None:
+    """Сразу сбрасывает отложенные изменения на диск."""
+    await _run(_get_storage().flush)
 
 
-async def get_user_group(user_id: int) -> str:
-    """Получает группу пользователя."""
-    db = _load_db()
-    user_data = db["users"].get(str(user_id))
+async def close_db() -> None:
+    """Останавливает фоновый сброс, сохраняет изменения и закрывает хранилище."""
+    global _storage, _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        _flush_task = None
+
+    if _storage is not None:
+        storage, _storage = _storage, None
+        await _run(storage.close)
+    _profiles.clear()
+
+
+async def get_profile(user_id: int) -> UserProfile:
+    """Профиль пользователя: из LRU в памяти или одним чтением хранилища."""
+    profile = _profiles.get(user_id)
+    if profile is not None:
+        return profile
 
+    writes = _profiles.writes
+    user_data = await _run(_get_storage().get_user, user_id)
     if user_data:
-        return user_data.get("group_name", DEFAULT_GROUP)
-    return DEFAULT_GROUP
+        profile = UserProfile(
+            user_id=user_id,
+            group_name=user_data.get("group_name", DEFAULT_GROUP),
+            auto_send=user_data.get("auto_send", False),
+            exists=True,
+        )
+    else:
+        profile = UserProfile(user_id=user_id, group_name=DEFAULT_GROUP)
+
+    # Пока читали, кто-то писал — прочитанное могло устареть, не кэшируем
+    if _profiles.writes == writes:
+        _profiles.put(profile)
+    return profile
+
+
+async def save_profile(profile: UserProfile) -> None:
+    """Записывает изменённые поля профиля (ничего, если изменений нет)."""
+    if not profile.dirty:
+        return
+    if profile.group_changed:
+        await set_user_group(profile.user_id, profile.group_name)
+    if profile.auto_send_changed:
+        await set_auto_send(profile.user_id, profile.auto_send)
+    profile.exists = True
+    profile.mark_saved()
 
 
-async def set_user_group(user_id: int, group_name: str) -> None:
-    """Устанавливает группу для пользователя."""
-    db = _load_db()
+async def get_user_group(user_id: int) -> str:
+    """Получает группу пользователя."""
+    return (await get_profile(user_id)).group_name
 
-    user_id_str = str(user_id)
-    if user_id_str not in db["users"]:
-        db["users"][user_id_str] = {}
 
-    db["users"][user_id_str]["group_name"] = group_name
-    _save_db(db)
+async def set_user_group(user_id: int, group_name: str) -> None:
+    """Устанавливает группу для пользователя."""
+    await _run(_get_storage().set_user_group, user_id, group_name)
+    _profiles.update(user_id, group_name=group_name)
 
 
 async def user_exists(user_id: int) -> bool:
     """Проверяет, есть ли пользователь в базе."""
-    db = _load_db()
-    return str(user_id) in db["users"]
+    return (await get_profile(user_id)).exists
 
 
 async def get_auto_send(user_id: int) -> bool:
     """Получает статус авто-рассылки для пользователя."""
-    db = _load_db()
-    user_data = db["users"].get(str(user_id))
-
-    if user_data:
-        return user_data.get("auto_send", False)
-    return False
+    return (await get_profile(user_id)).auto_send
 
 
 async def set_auto_send(user_id: int, enabled: bool) -> None:
     """Устанавливает статус авто-рассылки."""
-    db = _load_db()
-
-    user_id_str = str(user_id)
-    if user_id_str not in db["users"]:
-        db["users"][user_id_str] = {"group_name": DEFAULT_GROUP}
-
-    db["users"][user_id_str]["auto_send"] = enabled
-    _save_db(db)
+    await _run(_get_storage().set_auto_send, user_id, enabled)
+    _profiles.update(user_id, auto_send=enabled)
 
 
 async def get_users_with_auto_send() -> List[Dict[str, Any]]:
     """Возвращает список пользователей с включённой авто-рассылкой."""
-    db = _load_db()
-    users = []
+    return await _run(_get_storage().get_users_with_auto_send)
 
-    for user_id, user_data in db["users"].items():
-        if user_data.get("auto_send", False):
-            users.append(
-                {
-                    "user_id": int(user_id),
-                    "group_name": user_data.get("group_name", DEFAULT_GROUP),
-                }
-            )
 
-    return users
+async def get_subscribers_by_group() -> Dict[str, List[int]]:
+    """Подписчики авто-рассылки по группам: group_name -> [user_id, ...]."""
+    return await _run(_get_storage().get_subscribers_by_group)
 
 
 # ============ SCHEDULE CACHE ============
 
 
-def _load_cache() -> Dict[str, Any]:
-    """Загружает кэш расписания."""
-    if not os.path.exists(SCHEDULE_CACHE_PATH):
-        return {}
-
-    try:
-        with open(SCHEDULE_CACHE_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return {}
-
-
-def _save_cache(data: Dict[str, Any]) -> None:
-    """Сохраняет кэш расписания."""
-    with open(SCHEDULE_CACHE_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+@asynccontextmanager
+async def cache_batch() -> AsyncIterator[None]:
+    """
+    Транзакция над кэшем расписания.
 
+    Все set_cached_* внутри блока копятся в памяти и записываются
+    одной атомарной операцией при выходе. При исключении
+    изменения отбрасываются целиком.
 
-async def get_cached_schedule(weekday: int, group_name: str) -> List[str] | None:
-    """Получает закэшированное расписание."""
-    cache = _load_cache()
-    key = f"{weekday}:{group_name}"
-    return cache.get(key)
+        async with cache_batch():
+            await set_cached_day(0, monday)
+            await set_cached_day(1, tuesday)
+    """
+    if _cache_batch.get() is not None:
+        # Вложенный пакет — часть внешнего
+        yield
+        return
 
-
-async def set_cached_schedule(
-    weekday: int, group_name: str, lessons: List[str]
-) -> None:
-    """Сохраняет расписание в кэш."""
-    cache = _load_cache()
-    key = f"{weekday}:{group_name}"
-    cache[key] = lessons
-    _save_cache(cache)
-
-
-async def get_cached_date(weekday: int) -> str | None:
-    """Получает закэшированную дату расписания."""
-    cache = _load_cache()
-    return cache.get(f"date:{weekday}")
-
-
-async def set_cached_date(weekday: int, date: str) -> None:
-    """Сохраняет дату расписания в кэш."""
-    cache = _load_cache()
-    cache[f"date:{weekday}"] = date
-    _save_cache(cache)
+    staged: Dict[str, Any] = {}
+    token = _cache_batch.set(staged)
+    try:
+        yield
+    finally:
+        _cache_batch.reset(token)
+
+    # Сюда попадаем только без исключения
+    if staged:
+        await _run(_get_storage().set_cache_many, staged)
+
+
+async def _get_cache(key: str) -> Any:
+    """Читает ключ кэша с учётом ещё не записанного пакета."""
+    staged = _cache_batch.get()
+    if staged is not None and key in staged:
+        return staged[key]
+    return await _run(_get_storage().get_cache, key)
+
+
+async def _set_cache(key: str, value: Any) -> None:
+    """Пишет ключ кэша сразу или откладывает до конца пакета."""
+    staged = _cache_batch.get()
+    if staged is not None:
+        staged[key] = value
+        return
+    await _run(_get_storage().set_cache, key, value)
+
+
+async def get_cached_day(weekday: int) -> Dict[str, Any]:
+    """
+    Отпечатки расписания на день: {"date", "page", "groups"}.
+    Пустая запись, если день ещё не проверялся.
+    """
+    record = await _get_cache(f"day:{weekday}")
+    if record is None:
+        return new_day_record()
+    return {
+        "date": record.get("date", ""),
+        "page": record.get("page", ""),
+        # Копия: вызывающий может менять её до set_cached_day()
+        "groups": dict(record.get("groups", {})),
+    }
+
+
+async def set_cached_day(weekday: int, record: Dict[str, Any]) -> None:
+    """Сохраняет отпечатки расписания на день."""
+    await _set_cache(f"day:{weekday}", record)
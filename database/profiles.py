@@ -0,0 +1,112 @@
+# database/profiles.py
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Tuple
+
+
+@dataclass
+class UserProfile:
+    """
+    Настройки пользователя на время обработки одного апдейта.
+
+    Хендлеры меняют поля напрямую; изменения записываются
+    в хранилище в конце апдейта (save_profile).
+    """
+
+    user_id: int
+    group_name: str
+    auto_send: bool = False
+    # Есть ли запись в хранилище (False — новый пользователь с настройками по умолчанию)
+    exists: bool = False
+    _saved: Tuple[str, bool] = field(default=("", False), repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.mark_saved()
+
+    @property
+    def dirty(self) -> bool:
+        """Есть ли изменения, ещё не записанные в хранилище."""
+        return (self.group_name, self.auto_send) != self._saved
+
+    @property
+    def group_changed(self) -> bool:
+        return self.group_name != self._saved[0]
+
+    @property
+    def auto_send_changed(self) -> bool:
+        return self.auto_send != self._saved[1]
+
+    def mark_saved(self) -> None:
+        self._saved = (self.group_name, self.auto_send)
+
+    def copy(self) -> "UserProfile":
+        return replace(self)
+
+
+@dataclass
+class _Entry:
+    profile: UserProfile
+    stored_at: float
+
+
+class ProfileCache:
+    """
+    Ограниченный LRU профилей в памяти процесса.
+
+    Отдаёт копии: изменения хендлера попадают сюда только после
+    записи в хранилище. ttl ограничивает, как долго видна устаревшая
+    запись, если настройки поменяла другая реплика.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        # Растёт на каждой записи: чтение, начатое до записи,
+        # не должно положить в кэш старые данные
+        self.writes = 0
+
+    def get(self, user_id: int) -> UserProfile | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.stored_at > self._ttl:
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return entry.profile.copy()
+
+    def put(self, profile: UserProfile) -> None:
+        if self._maxsize <= 0:
+            return
+        self._entries[profile.user_id] = _Entry(profile.copy(), time.monotonic())
+        self._entries.move_to_end(profile.user_id)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def update(
+        self,
+        user_id: int,
+        group_name: str | None = None,
+        auto_send: bool | None = None,
+    ) -> None:
+        """Отражает запись в хранилище в закэшированном профиле (если он есть)."""
+        self.writes += 1
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return
+        profile = entry.profile
+        if group_name is not None:
+            profile.group_name = group_name
+        if auto_send is not None:
+            profile.auto_send = auto_send
+        profile.exists = True
+        profile.mark_saved()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.writes += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
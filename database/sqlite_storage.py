@@ -0,0 +1,226 @@
+# database/sqlite_storage.py
+import json
+import sqlite3
+from typing import Any, Dict, List
+
+from config import DEFAULT_GROUP
+
+from .storage import (
+    Storage,
+    load_cache_file,
+    load_users_file,
+    migrate_schedule_cache,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id    INTEGER PRIMARY KEY,
+    group_name TEXT    NOT NULL,
+    auto_send  INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_users_auto_send_group
+    ON users (auto_send, group_name);
+CREATE TABLE IF NOT EXISTS schedule_cache (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SqliteStorage(Storage):
+    """
+    Хранилище в SQLite (режим WAL).
+
+    При первом запуске один раз переносит данные
+    из старых JSON-файлов users.json и schedule_cache.json.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        json_db_path: str | None = None,
+        json_cache_path: str | None = None,
+    ) -> None:
+        self.path = path
+        self.json_db_path = json_db_path
+        self.json_cache_path = json_cache_path
+        self._conn: sqlite3.Connection | None = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # Соединение используется из разных потоков, но строго по очереди
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    def init(self) -> None:
+        with self.conn:
+            self.conn.executescript(_SCHEMA)
+        self._migrate_from_json()
+        self._migrate_cache_digests()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _migrate_from_json(self) -> None:
+        """Разовый перенос данных из JSON-хранилища."""
+        done = self.conn.execute(
+            "SELECT 1 FROM meta WHERE key = 'migrated_from_json'"
+        ).fetchone()
+        if done:
+            return
+
+        users = load_users_file(self.json_db_path) if self.json_db_path else {}
+        cache = load_cache_file(self.json_cache_path) if self.json_cache_path else {}
+        if users is None or cache is None:
+            # Файл отложен в сторону: отметку не ставим, чтобы после
+            # восстановления данных перенос выполнился при следующем запуске
+            print("❌ Перенос из JSON отложен: исходный файл повреждён")
+            return
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO users (user_id, group_name, auto_send) "
+                "VALUES (?, ?, ?)",
+                [
+                    (
+                        int(user_id),
+                        data.get("group_name", DEFAULT_GROUP),
+                        int(bool(data.get("auto_send", False))),
+                    )
+                    for user_id, data in users.items()
+                ],
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO schedule_cache (key, value) VALUES (?, ?)",
+                [
+                    (key, json.dumps(value, ensure_ascii=False))
+                    for key, value in cache.items()
+                ],
+            )
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('migrated_from_json', '1')"
+            )
+
+        if users or cache:
+            print(
+                f"✅ Перенесено из JSON: {len(users)} пользователей, "
+                f"{len(cache)} записей кэша"
+            )
+
+    def _migrate_cache_digests(self) -> None:
+        """Разовый перевод кэша расписания на записи с отпечатками по дням."""
+        done = self.conn.execute(
+            "SELECT 1 FROM meta WHERE key = 'cache_digests'"
+        ).fetchone()
+        if done:
+            return
+
+        cache = {
+            key: json.loads(value)
+            for key, value in self.conn.execute(
+                "SELECT key, value FROM schedule_cache"
+            )
+        }
+        records, legacy = migrate_schedule_cache(cache)
+
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM schedule_cache WHERE key = ?",
+                [(key,) for key in legacy],
+            )
+            self.conn.executemany(
+                "INSERT INTO schedule_cache (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                [(key, self._dump(value)) for key, value in records.items()],
+            )
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('cache_digests', '1')"
+            )
+
+        if legacy:
+            print(f"✅ Кэш расписания переведён на отпечатки: {len(legacy)} ключей")
+
+    @staticmethod
+    def _dump(value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+    # ---- пользователи ----
+
+    def get_user(self, user_id: int) -> Dict[str, Any] | None:
+        row = self.conn.execute(
+            "SELECT group_name, auto_send FROM users WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {"group_name": row[0], "auto_send": bool(row[1])}
+
+    def set_user_group(self, user_id: int, group_name: str) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO users (user_id, group_name) VALUES (?, ?) "
+                "ON CONFLICT (user_id) DO UPDATE SET group_name = excluded.group_name",
+                (user_id, group_name),
+            )
+
+    def set_auto_send(self, user_id: int, enabled: bool) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO users (user_id, group_name, auto_send) VALUES (?, ?, ?) "
+                "ON CONFLICT (user_id) DO UPDATE SET auto_send = excluded.auto_send",
+                (user_id, DEFAULT_GROUP, int(enabled)),
+            )
+
+    def get_users_with_auto_send(self) -> List[Dict[str, Any]]:
+        rows = self.conn.execute(
+            "SELECT user_id, group_name FROM users WHERE auto_send = 1 "
+            "ORDER BY group_name"
+        ).fetchall()
+        return [{"user_id": row[0], "group_name": row[1]} for row in rows]
+
+    def get_subscribers_by_group(self) -> Dict[str, List[int]]:
+        # Индекс (auto_send, group_name) покрывающий: user_id — это rowid,
+        # так что читаются только подписчики, без обхода таблицы. SQLite
+        # обновляет индекс при каждой записи, и он верен для всех реплик,
+        # пишущих в этот файл
+        rows = self.conn.execute(
+            "SELECT group_name, user_id FROM users WHERE auto_send = 1 "
+            "ORDER BY group_name"
+        ).fetchall()
+        subscribers: Dict[str, List[int]] = {}
+        for group_name, user_id in rows:
+            subscribers.setdefault(group_name, []).append(user_id)
+        return subscribers
+
+    # ---- кэш расписания ----
+
+    def get_cache(self, key: str) -> Any:
+        row = self.conn.execute(
+            "SELECT value FROM schedule_cache WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_cache(self, key: str, value: Any) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO schedule_cache (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, self._dump(value)),
+            )
+
+    def set_cache_many(self, items: Dict[str, Any]) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO schedule_cache (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                [(key, self._dump(value)) for key, value in items.items()],
+            )
@@ -0,0 +1,342 @@
+# database/storage.py
+import hashlib
+import json
+import os
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Sequence, Set, Tuple
+
+from config import DEFAULT_GROUP
+
+
+class Storage(ABC):
+    """
+    Интерфейс хранилища пользователей и кэша расписания.
+
+    Функции из database.db работают через него и не знают,
+    где лежат данные (JSON-файлы, SQLite, ...).
+    """
+
+    @abstractmethod
+    def init(self) -> None:
+        """Создаёт файлы/таблицы при первом запуске."""
+
+    def flush(self) -> None:
+        """Сбрасывает отложенные изменения на диск."""
+
+    def close(self) -> None:
+        """Сбрасывает изменения и освобождает ресурсы хранилища."""
+
+    # ---- пользователи ----
+
+    @abstractmethod
+    def get_user(self, user_id: int) -> Dict[str, Any] | None:
+        """Запись пользователя: {"group_name": ..., "auto_send": ...} или None."""
+
+    @abstractmethod
+    def set_user_group(self, user_id: int, group_name: str) -> None:
+        ...
+
+    @abstractmethod
+    def set_auto_send(self, user_id: int, enabled: bool) -> None:
+        ...
+
+    @abstractmethod
+    def get_users_with_auto_send(self) -> List[Dict[str, Any]]:
+        """Список {"user_id": int, "group_name": str} с включённой рассылкой."""
+
+    def get_subscribers_by_group(self) -> Dict[str, List[int]]:
+        """Подписчики рассылки по группам: group_name -> [user_id, ...]."""
+        subscribers: Dict[str, List[int]] = {}
+        for user in self.get_users_with_auto_send():
+            subscribers.setdefault(user["group_name"], []).append(user["user_id"])
+        return subscribers
+
+    # ---- кэш расписания ----
+
+    @abstractmethod
+    def get_cache(self, key: str) -> Any:
+        ...
+
+    @abstractmethod
+    def set_cache(self, key: str, value: Any) -> None:
+        ...
+
+    @abstractmethod
+    def set_cache_many(self, items: Dict[str, Any]) -> None:
+        """Атомарно записывает несколько ключей кэша (всё или ничего)."""
+
+
+def lessons_digest(texts: Sequence[str]) -> str:
+    """Отпечаток пар группы (исходные строки в порядке страницы)."""
+    data = "\x1f".join(text.strip() for text in texts)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def new_day_record() -> Dict[str, Any]:
+    """
+    Запись кэша расписания на один день (ключ "day:{weekday}").
+
+    date — дата с последней обработанной страницы, page — отпечаток
+    всей разобранной страницы, groups — group_name -> lessons_digest.
+    """
+    return {"date": "", "page": "", "groups": {}}
+
+
+def migrate_schedule_cache(cache: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Переводит старый формат кэша в записи по дням.
+
+    Старые ключи "date:{weekday}" и "{weekday}:{group}" (полный список
+    пар) сворачиваются в "day:{weekday}". Возвращает новые записи
+    и старые ключи, которые нужно удалить.
+    """
+    records: Dict[str, Any] = {}
+    legacy: List[str] = []
+    for key, value in cache.items():
+        prefix, _, rest = key.partition(":")
+        if prefix == "date":
+            day_key = f"day:{rest}"
+        elif prefix.isdigit() and isinstance(value, list):
+            day_key = f"day:{prefix}"
+        else:
+            continue
+
+        if day_key not in records:
+            records[day_key] = cache.get(day_key) or new_day_record()
+        record = records[day_key]
+        if prefix == "date":
+            record["date"] = value or ""
+        else:
+            record["groups"].setdefault(rest, lessons_digest(value))
+        legacy.append(key)
+    return records, legacy
+
+
+def load_json(path: str, default: Any) -> Any:
+    """Читает JSON-файл, при отсутствии или ошибке возвращает default."""
+    if not os.path.exists(path):
+        return default
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return default
+
+
+def save_json(path: str, data: Any, compact: bool = False) -> None:
+    """
+    Атомарно сохраняет данные в JSON-файл.
+
+    Пишет во временный файл рядом и подменяет им исходный,
+    так что при сбое на диске остаётся старая или новая версия целиком.
+    compact=True — без отступов и пробелов (для машинных файлов).
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            if compact:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            else:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _quarantine(path: str, reason: str) -> None:
+    """Откладывает файл в сторону для разбора вместо того, чтобы его перезаписать."""
+    broken_path = f"{path}.corrupt-{int(time.time())}"
+    os.replace(path, broken_path)
+    print(f"❌ Файл {path} {reason}, сохранён как {broken_path}")
+
+
+def _load_or_quarantine(path: str, default: Any) -> Any:
+    """
+    Читает JSON-файл при старте. Повреждённый файл не выдаётся
+    молча за пустой — он откладывается в сторону для разбора.
+    """
+    if not os.path.exists(path):
+        return default
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        _quarantine(path, f"повреждён ({e})")
+        return default
+
+
+_BROKEN = object()
+
+
+def _load_dict(path: str, key: str | None = None) -> Dict[str, Any] | None:
+    """
+    Словарь из JSON-файла при старте (или словарь под ключом key).
+    Нет файла или ключа — пустой словарь. None — файл повреждён или
+    не того вида: он отложен в сторону, а не выдан за пустой.
+    """
+    if not os.path.exists(path):
+        return {}
+
+    data = _load_or_quarantine(path, _BROKEN)
+    if data is _BROKEN:
+        return None
+    if key is not None and isinstance(data, dict):
+        data = data.get(key, {})
+    if not isinstance(data, dict):
+        _quarantine(path, "не того вида (ожидался словарь)")
+        return None
+    return data
+
+
+def load_users_file(path: str) -> Dict[str, Dict[str, Any]] | None:
+    """Пользователи из users.json: {user_id: {...}}; None — см. _load_dict."""
+    users = _load_dict(path, "users")
+    if users is not None and not all(isinstance(u, dict) for u in users.values()):
+        _quarantine(path, "не того вида (записи users — не словари)")
+        return None
+    return users
+
+
+def load_cache_file(path: str) -> Dict[str, Any] | None:
+    """Кэш расписания из schedule_cache.json; None — см. _load_dict."""
+    return _load_dict(path)
+
+
+class JsonStorage(Storage):
+    """
+    Хранилище в JSON-файлах (users.json и schedule_cache.json).
+
+    После init() данные живут в памяти: чтения не трогают диск,
+    изменения помечаются и сбрасываются пачкой через flush().
+    Подписчики рассылки индексируются по группам при каждой записи,
+    так что чекер не перебирает всех пользователей.
+    """
+
+    def __init__(self, db_path: str, cache_path: str) -> None:
+        self.db_path = db_path
+        self.cache_path = cache_path
+        self._users: Dict[str, Dict[str, Any]] = {}
+        self._cache: Dict[str, Any] = {}
+        # group_name -> user_id с включённой рассылкой
+        self._subscribers: Dict[str, Set[int]] = {}
+        self._users_dirty = False
+        self._cache_dirty = False
+
+    def init(self) -> None:
+        # Повреждённые файлы отложены в сторону — начинаем с пустых данных
+        self._users = load_users_file(self.db_path) or {}
+        self._cache = load_cache_file(self.cache_path) or {}
+        self._rebuild_subscribers()
+
+        if not os.path.exists(self.db_path):
+            save_json(self.db_path, {"users": self._users})
+
+        records, legacy = migrate_schedule_cache(self._cache)
+        if legacy:
+            for key in legacy:
+                del self._cache[key]
+            self._cache.update(records)
+            print(f"✅ Кэш расписания переведён на отпечатки: {len(legacy)} ключей")
+
+        if legacy or not os.path.exists(self.cache_path):
+            save_json(self.cache_path, self._cache, compact=True)
+
+    def flush(self) -> None:
+        # Флаг снимается до записи: изменения, пришедшие во время
+        # сериализации, попадут в следующий flush
+        if self._users_dirty:
+            self._users_dirty = False
+            try:
+                save_json(self.db_path, {"users": self._users})
+            except BaseException:
+                self._users_dirty = True
+                raise
+
+        if self._cache_dirty:
+            self._cache_dirty = False
+            try:
+                save_json(self.cache_path, self._cache, compact=True)
+            except BaseException:
+                self._cache_dirty = True
+                raise
+
+    def close(self) -> None:
+        self.flush()
+
+    def _rebuild_subscribers(self) -> None:
+        self._subscribers = {}
+        for user_id, user_data in self._users.items():
+            if user_data.get("auto_send", False):
+                group_name = user_data.get("group_name", DEFAULT_GROUP)
+                self._subscribe(int(user_id), group_name)
+
+    def _subscribe(self, user_id: int, group_name: str) -> None:
+        self._subscribers.setdefault(group_name, set()).add(user_id)
+
+    def _unsubscribe(self, user_id: int, group_name: str) -> None:
+        group = self._subscribers.get(group_name)
+        if group is None:
+            return
+        group.discard(user_id)
+        if not group:
+            del self._subscribers[group_name]
+
+    def get_user(self, user_id: int) -> Dict[str, Any] | None:
+        # Копия: запись читается в другом потоке, чем изменяется
+        user = self._users.get(str(user_id))
+        return dict(user) if user is not None else None
+
+    def set_user_group(self, user_id: int, group_name: str) -> None:
+        user = self._users.setdefault(str(user_id), {})
+        if user.get("auto_send", False):
+            self._unsubscribe(user_id, user.get("group_name", DEFAULT_GROUP))
+            self._subscribe(user_id, group_name)
+        user["group_name"] = group_name
+        self._users_dirty = True
+
+    def set_auto_send(self, user_id: int, enabled: bool) -> None:
+        user = self._users.setdefault(str(user_id), {"group_name": DEFAULT_GROUP})
+        group_name = user.get("group_name", DEFAULT_GROUP)
+        if enabled:
+            self._subscribe(user_id, group_name)
+        else:
+            self._unsubscribe(user_id, group_name)
+        user["auto_send"] = enabled
+        self._users_dirty = True
+
+    def get_users_with_auto_send(self) -> List[Dict[str, Any]]:
+        return [
+            {"user_id": user_id, "group_name": group_name}
+            for group_name, user_ids in self._subscribers.items()
+            for user_id in user_ids
+        ]
+
+    def get_subscribers_by_group(self) -> Dict[str, List[int]]:
+        # Копии списков: индекс меняется в потоке хранилища
+        return {
+            group_name: list(user_ids)
+            for group_name, user_ids in self._subscribers.items()
+        }
+
+    def get_cache(self, key: str) -> Any:
+        return self._cache.get(key)
+
+    def set_cache(self, key: str, value: Any) -> None:
+        self._cache[key] = value
+        self._cache_dirty = True
+
+    def set_cache_many(self, items: Dict[str, Any]) -> None:
+        # Одна атомарная запись файла на всю пачку
+        self._cache.update(items)
+        self._cache_dirty = True
+        self.flush()
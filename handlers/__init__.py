@@ -1,5 +1,11 @@
 # handlers/__init__.py
+from .middlewares import HandlerMetricsMiddleware, ProfileMiddleware
 from .schedule_handlers import router as schedule_router
 from .settings_handlers import router as settings_router
 
-__all__ = ["schedule_router", "settings_router"]
+__all__ = [
+    "HandlerMetricsMiddleware",
+    "ProfileMiddleware",
+    "schedule_router",
+    "settings_router",
+]
@@ -0,0 +1,88 @@
+# handlers/middlewares.py
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+import metrics
+from database import get_profile, save_profile
+from metrics import Histogram
+
+HANDLER_SECONDS = Histogram(
+    "bot_handler_seconds", "Время обработки апдейта хендлером", ["handler"]
+)
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """
+    Время работы хендлера, с метками по имени функции.
+
+    Регистрируется как inner-middleware на dp.message / dp.callback_query:
+    к этому моменту фильтры пройдены и известно, какой хендлер сработал.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not metrics.is_enabled():
+            return await handler(event, data)
+
+        handler_object = data.get("handler")
+        name = handler_object.callback.__name__ if handler_object else "unknown"
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            HANDLER_SECONDS.observe(time.perf_counter() - start, name)
+
+
+# user_id -> [замок, сколько апдейтов его держат или ждут]; общий
+# для сообщений и кнопок, запись удаляется с последним апдейтом
+_user_locks: Dict[int, List[Any]] = {}
+
+
+class ProfileMiddleware(BaseMiddleware):
+    """
+    Загружает профиль пользователя один раз на апдейт.
+
+    Outer-middleware на dp.message / dp.callback_query: хендлеры получают
+    data["profile"] (UserProfile), меняют его поля, а изменения
+    записываются в хранилище одним проходом после хендлера.
+
+    Апдейты одного пользователя проходят по очереди: иначе два быстрых
+    нажатия «переключить» прочитали бы одну версию профиля, и второе
+    записало бы то же значение вместо обратного.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+
+        entry = _user_locks.get(user.id)
+        if entry is None:
+            entry = _user_locks[user.id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                profile = await get_profile(user.id)
+                data["profile"] = profile
+                try:
+                    return await handler(event, data)
+                finally:
+                    # Запись даже если хендлер упал после изменения настроек
+                    await save_profile(profile)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _user_locks[user.id]
@@ -1,44 +1,38 @@
 # handlers/schedule_handlers.py
 import asyncio
 from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Set, Tuple
 
 from aiogram import F, Router
+from aiogram.exceptions import TelegramAPIError
 from aiogram.filters import Command
 from aiogram.types import Message
 
-from config import DAY_NAMES, SCHEDULE_URLS
-from database import get_user_group
+from config import DAY_NAMES, MESSAGE_LIMIT, SCHEDULE_URLS, STALE_NOTICE_AGE
+from database import UserProfile
 from keyboards import get_menu_keyboard
-from schedule import (
-    fetch_schedule,
-    format_schedule,
-    parse_schedule,
-    parse_schedule_date,
-)
+from schedule import DayCache, DaySnapshot, ParsedDay, render_lessons
 
 router = Router()
 
+# Разделитель дней в сообщении с расписанием на неделю
+WEEK_SEPARATOR = "\n\n➖➖➖➖➖➖➖➖\n\n"
 
-async def get_schedule_for_day(weekday: int, group_name: str) -> str:
-    """Получает и форматирует расписание для дня недели."""
-    day_name = DAY_NAMES.get(weekday, "")
+Days = List[Tuple[int, DaySnapshot]]
 
-    # Выходные
-    if weekday > 4:
-        return f"😴 {day_name} — выходной"
+# Фоновые обновления ответов (ссылки держим, чтобы задачи не собрал GC)
+_revalidations: Set[asyncio.Task] = set()
 
-    url = SCHEDULE_URLS.get(weekday)
-    if not url:
-        return f"❌ Нет данных для {day_name}"
 
-    # Загружаем HTML
-    html = await fetch_schedule(url)
-    if not html:
+def render_day(weekday: int, group_name: str, day: ParsedDay | None) -> str:
+    """Форматирует расписание группы из разобранной страницы дня."""
+    day_name = DAY_NAMES.get(weekday, "")
+
+    if day is None:
         return f"❌ Не удалось загрузить расписание на {day_name}"
 
-    # Парсим
-    lessons = parse_schedule(html, group_name)
-    schedule_date = parse_schedule_date(html)
+    lessons = day.lessons_for(group_name)
+    schedule_date = day.date
 
     # Формируем заголовок
     if schedule_date:
@@ -51,15 +45,166 @@ async def get_schedule_for_day(weekday: int, group_name: str) -> str:
         return f"{header}\n\n❌ Группа {group_name} не найдена"
 
     # Форматируем расписание
-    formatted = format_schedule(lessons, weekday)
+    formatted = render_lessons(weekday, lessons)
 
     return f"{header}\n\n{formatted}"
 
 
+def _age_text(age: float) -> str:
+    minutes = int(age // 60)
+    if minutes < 60:
+        return f"{max(1, minutes)} мин"
+    if minutes < 24 * 60:
+        return f"{minutes // 60} ч"
+    return f"{minutes // (24 * 60)} дн"
+
+
+def render_snapshot(weekday: int, group_name: str, snapshot: DaySnapshot) -> str:
+    """render_day с пометкой, если показана давно не проверенная версия."""
+    text = render_day(weekday, group_name, snapshot.day)
+    if snapshot.day is not None and snapshot.stale and snapshot.age >= STALE_NOTICE_AGE:
+        text += f"\n\n🕓 Сохранённая версия, проверена {_age_text(snapshot.age)} назад"
+    return text
+
+
+def render_week(group_name: str, days: Iterable[Tuple[int, DaySnapshot]]) -> str:
+    """Расписание группы на неделю одним текстом, дни — как в render_snapshot."""
+    return WEEK_SEPARATOR.join(
+        render_snapshot(weekday, group_name, snapshot) for weekday, snapshot in days
+    )
+
+
+def _tg_len(text: str) -> int:
+    """Длина так, как её считает Telegram — в UTF-16 (эмодзи — за два)."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _cut(text: str, limit: int) -> List[str]:
+    """Режет строку на куски не длиннее limit в единицах Telegram."""
+    parts: List[str] = []
+    current: List[str] = []
+    size = 0
+    for char in text:
+        width = _tg_len(char)
+        if size + width > limit:
+            parts.append("".join(current))
+            current, size = [], 0
+        current.append(char)
+        size += width
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def _pack(blocks: List[str], separator: str, limit: int) -> List[str]:
+    """Склеивает блоки в куски не длиннее limit (длинный блок — отдельно)."""
+    parts: List[str] = []
+    current = ""
+    for block in blocks:
+        candidate = f"{current}{separator}{block}" if current else block
+        if _tg_len(candidate) <= limit:
+            current = candidate
+            continue
+        if current:
+            parts.append(current)
+        current = block
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_message(text: str, limit: int = MESSAGE_LIMIT) -> List[str]:
+    """
+    Делит текст на сообщения не длиннее limit: сначала по границам
+    дней, затем по парам, и только в крайнем случае — посреди строки.
+    """
+    if _tg_len(text) <= limit:
+        return [text]
+
+    parts: List[str] = []
+    for part in _pack(text.split(WEEK_SEPARATOR), WEEK_SEPARATOR, limit):
+        if _tg_len(part) <= limit:
+            parts.append(part)
+            continue
+        for piece in _pack(part.split("\n\n"), "\n\n", limit):
+            parts.extend(_cut(piece, limit))
+    return parts
+
+
+async def _refreshed(snapshot: DaySnapshot) -> DaySnapshot:
+    """Снимок после фоновой загрузки (прежний, если она не удалась)."""
+    if snapshot.refresh is None:
+        return snapshot
+    try:
+        day = await snapshot.refresh
+    except Exception as e:
+        print(f"❌ Ошибка фонового обновления расписания: {e}")
+        return snapshot
+    if day is None:
+        return snapshot
+    return DaySnapshot(day=day)
+
+
+def _revalidate_later(
+    sent: Message, text: str, days: Days, render: Callable[[Days], str]
+) -> None:
+    """
+    Когда фоновые загрузки устаревших дней завершатся, перерисовывает
+    ответ и правит отправленное сообщение, если текст изменился.
+    """
+    if not any(snapshot.refresh is not None for _, snapshot in days):
+        return
+
+    async def revalidate() -> None:
+        fresh = [(weekday, await _refreshed(snapshot)) for weekday, snapshot in days]
+        new_text = render(fresh)
+        # Правим только одно сообщение: неделю из нескольких не перекраиваем
+        if new_text == text or len(split_message(new_text)) > 1:
+            return
+        try:
+            await sent.edit_text(new_text)
+        except TelegramAPIError as e:
+            print(f"❌ Не удалось обновить ответ с расписанием: {e}")
+
+    task = asyncio.create_task(revalidate())
+    _revalidations.add(task)
+    task.add_done_callback(_revalidations.discard)
+
+
+async def answer_day(
+    message: Message, weekday: int, group_name: str, day_cache: DayCache
+) -> None:
+    """
+    Отвечает расписанием на день недели.
+
+    Уже встречавшийся день отдаётся сразу из последней известной версии,
+    без ожидания сайта; свежая грузится в фоне и правит ответ.
+    """
+    day_name = DAY_NAMES.get(weekday, "")
+
+    # Выходные
+    if weekday > 4:
+        await message.answer(f"😴 {day_name} — выходной")
+        return
+
+    url = SCHEDULE_URLS.get(weekday)
+    if not url:
+        await message.answer(f"❌ Нет данных для {day_name}")
+        return
+
+    def render(days: Days) -> str:
+        return render_snapshot(weekday, group_name, days[0][1])
+
+    days = [(weekday, await day_cache.snapshot(weekday))]
+    text = render(days)
+    sent = await message.answer(text)
+    _revalidate_later(sent, text, days, render)
+
+
 @router.message(Command("start"))
-async def cmd_start(message: Message):
+async def cmd_start(message: Message, profile: UserProfile):
     """Обработчик команды /start."""
-    group_name = await get_user_group(message.from_user.id)
+    group_name = profile.group_name
 
     await message.answer(
         f"📚 Твоя группа: <b>{group_name}</b>\n\n"
@@ -71,9 +216,9 @@ async def cmd_start(message: Message):
 
 
 @router.message(Command("menu"))
-async def cmd_menu(message: Message):
+async def cmd_menu(message: Message, profile: UserProfile):
     """Обработчик команды /menu."""
-    group_name = await get_user_group(message.from_user.id)
+    group_name = profile.group_name
 
     await message.answer(
         f"📚 Группа: <b>{group_name}</b>\n\nВыберите действие из меню ниже 👇🏻",
@@ -83,10 +228,12 @@ async def cmd_menu(message: Message):
 
 
 @router.message(F.text == "📅 Сегодня")
-async def schedule_today(message: Message):
+async def schedule_today(
+    message: Message, day_cache: DayCache, profile: UserProfile
+):
     """Расписание на сегодня."""
     today = datetime.now().weekday()
-    group_name = await get_user_group(message.from_user.id)
+    group_name = profile.group_name
 
     if today > 4:
         await message.answer(
@@ -94,33 +241,46 @@ async def schedule_today(message: Message):
         )
         return
 
-    result = await get_schedule_for_day(today, group_name)
-    await message.answer(result)
+    await answer_day(message, today, group_name, day_cache)
 
 
 @router.message(F.text == "📅 Завтра")
-async def schedule_tomorrow(message: Message):
+async def schedule_tomorrow(
+    message: Message, day_cache: DayCache, profile: UserProfile
+):
     """Расписание на завтра."""
     tomorrow = (datetime.now() + timedelta(days=1)).weekday()
-    group_name = await get_user_group(message.from_user.id)
+    group_name = profile.group_name
 
     if tomorrow > 4:
         await message.answer(
             "😴 Завтра выходной!\n\nПоказываю расписание на понедельник:"
         )
-        result = await get_schedule_for_day(0, group_name)
+        await answer_day(message, 0, group_name, day_cache)
     else:
-        result = await get_schedule_for_day(tomorrow, group_name)
-
-    await message.answer(result)
+        await answer_day(message, tomorrow, group_name, day_cache)
 
 
 @router.message(F.text == "📅 На неделю")
-async def schedule_week(message: Message):
-    """Расписание на всю неделю."""
-    group_name = await get_user_group(message.from_user.id)
-
-    for weekday in range(5):
-        result = await get_schedule_for_day(weekday, group_name)
-        await message.answer(result)
-        await asyncio.sleep(0.1)
+async def schedule_week(
+    message: Message, day_cache: DayCache, profile: UserProfile
+):
+    """Расписание на всю неделю одним сообщением."""
+    group_name = profile.group_name
+
+    # Дни из кэша разобранных страниц, устаревшие обновляются в фоне
+    weekdays = range(5)
+    snapshots = await asyncio.gather(*(day_cache.snapshot(w) for w in weekdays))
+    days = list(zip(weekdays, snapshots))
+
+    def render(days: Days) -> str:
+        return render_week(group_name, days)
+
+    text = render(days)
+    parts = split_message(text)
+
+    # Несколько сообщений — только если неделя не влезает в лимит Telegram
+    for part in parts:
+        sent = await message.answer(part)
+    if len(parts) == 1:
+        _revalidate_later(sent, text, days, render)
@@ -3,17 +3,17 @@ from aiogram import F, Router
 from aiogram.types import CallbackQuery, Message
 
 from config import AVAILABLE_GROUPS
-from database import get_auto_send, get_user_group, set_auto_send, set_user_group
+from database import UserProfile
 from keyboards import get_groups_keyboard, get_menu_keyboard, get_settings_keyboard
 
 router = Router()
 
 
 @router.message(F.text == "⚙️ Настройки")
-async def settings_menu(message: Message):
+async def settings_menu(message: Message, profile: UserProfile):
     """Меню настроек."""
-    current_group = await get_user_group(message.from_user.id)
-    auto_send = await get_auto_send(message.from_user.id)
+    current_group = profile.group_name
+    auto_send = profile.auto_send
 
     await message.answer(
         f"⚙️ <b>Настройки</b>\n\n"
@@ -26,10 +26,10 @@ async def settings_menu(message: Message):
 
 
 @router.callback_query(F.data == "back_to_settings")
-async def back_to_settings(callback: CallbackQuery):
+async def back_to_settings(callback: CallbackQuery, profile: UserProfile):
     """Возврат в настройки."""
-    current_group = await get_user_group(callback.from_user.id)
-    auto_send = await get_auto_send(callback.from_user.id)
+    current_group = profile.group_name
+    auto_send = profile.auto_send
 
     await callback.message.edit_text(
         f"⚙️ <b>Настройки</b>\n\n"
@@ -43,9 +43,9 @@ async def back_to_settings(callback: CallbackQuery):
 
 
 @router.callback_query(F.data == "choose_group")
-async def choose_group(callback: CallbackQuery):
+async def choose_group(callback: CallbackQuery, profile: UserProfile):
     """Показывает список групп для выбора."""
-    current_group = await get_user_group(callback.from_user.id)
+    current_group = profile.group_name
 
     await callback.message.edit_text(
         "📚 <b>Выбери свою группу:</b>",
@@ -56,7 +56,7 @@ async def choose_group(callback: CallbackQuery):
 
 
 @router.callback_query(F.data.startswith("set_group:"))
-async def set_group(callback: CallbackQuery):
+async def set_group(callback: CallbackQuery, profile: UserProfile):
     """Устанавливает выбранную группу."""
     group_name = callback.data.split(":")[1]
 
@@ -64,8 +64,9 @@ async def set_group(callback: CallbackQuery):
         await callback.answer("❌ Неизвестная группа", show_alert=True)
         return
 
-    await set_user_group(callback.from_user.id, group_name)
-    auto_send = await get_auto_send(callback.from_user.id)
+    # Запишется в хранилище после хендлера (ProfileMiddleware)
+    profile.group_name = group_name
+    auto_send = profile.auto_send
 
     await callback.message.edit_text(
         f"✅ Группа изменена на <b>{group_name}</b>!\n\n"
@@ -79,14 +80,14 @@ async def set_group(callback: CallbackQuery):
 
 
 @router.callback_query(F.data == "toggle_auto_send")
-async def toggle_auto_send(callback: CallbackQuery):
+async def toggle_auto_send(callback: CallbackQuery, profile: UserProfile):
     """Переключает авто-рассылку."""
-    current_auto_send = await get_auto_send(callback.from_user.id)
-    new_auto_send = not current_auto_send
+    new_auto_send = not profile.auto_send
 
-    await set_auto_send(callback.from_user.id, new_auto_send)
+    # Запишется в хранилище после хендлера (ProfileMiddleware)
+    profile.auto_send = new_auto_send
 
-    current_group = await get_user_group(callback.from_user.id)
+    current_group = profile.group_name
     status = "включена ✅" if new_auto_send else "выключена ❌"
 
     await callback.message.edit_text(
@@ -0,0 +1,6 @@
+# loadtest/__init__.py
+from .driver import LoadDriver, run_load
+from .site import StubSite
+from .telegram import FakeBotAPI
+
+__all__ = ["FakeBotAPI", "LoadDriver", "StubSite", "run_load"]
@@ -0,0 +1,83 @@
+# loadtest/__main__.py
+"""
+Нагрузочный прогон без настоящего сайта и Telegram.
+
+    python -m loadtest                         # 200 пользователей, публикация через 1 с
+    python -m loadtest --users 2000 --concurrency 200 -o report.json
+    python -m loadtest --no-publish            # только нажатия кнопок
+    python -m loadtest --api-latency 0.1 --api-rate 30
+    python -m loadtest --transport webhook     # через webhook-приложение бота
+
+Отчёт (JSON): перцентили задержки ответа по кнопкам меню, время
+от публикации до первого и последнего уведомления, число 429 от Bot API.
+Код возврата 1 — хендлеры падали не из-за лимита Telegram.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import sys
+
+from .driver import run_load
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest")
+    parser.add_argument("-o", "--output", help="куда сохранить отчёт (JSON)")
+    parser.add_argument("--users", type=int, default=200, help="пользователей в базе")
+    parser.add_argument("--taps", type=int, default=5, help="нажатий на пользователя")
+    parser.add_argument(
+        "--concurrency", type=int, default=20, help="одновременно активных пользователей"
+    )
+    parser.add_argument(
+        "--think", type=float, default=0.5, help="средняя пауза между нажатиями, с"
+    )
+    parser.add_argument(
+        "--publish-after", type=float, default=1.0, help="публикация через N секунд"
+    )
+    parser.add_argument("--no-publish", action="store_true", help="без публикации")
+    parser.add_argument(
+        "--api-latency", type=float, default=0.03, help="задержка Bot API, с"
+    )
+    parser.add_argument(
+        "--api-rate", type=float, default=30, help="лимит Bot API, сообщений в секунду"
+    )
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json")
+    parser.add_argument(
+        "--transport",
+        choices=("feed", "webhook"),
+        default="feed",
+        help="апдейты напрямую в диспетчер или POST-ом на webhook",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Логи бота (print) не должны смешиваться с JSON в stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        report = asyncio.run(
+            run_load(
+                users=args.users,
+                taps=args.taps,
+                concurrency=args.concurrency,
+                think=args.think,
+                publish_after=None if args.no_publish else args.publish_after,
+                api_latency=args.api_latency,
+                api_rate=args.api_rate,
+                backend=args.backend,
+                transport=args.transport,
+                seed=args.seed,
+            )
+        )
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
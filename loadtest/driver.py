@@ -0,0 +1,277 @@
+# loadtest/driver.py
+import asyncio
+import math
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.types import Update
+from aiohttp import web
+from aiohttp.test_utils import unused_port
+
+import config
+from benchmarks.fixtures import make_users, write_users
+from database import close_db, init_db
+from database.sqlite_storage import SqliteStorage
+from database.storage import JsonStorage
+from keyboards import get_menu_keyboard
+from main import build_webhook_app, create_dispatcher
+from schedule import DayCache, ScheduleFetcher
+from services.broadcaster import Broadcaster
+from services.schedule_checker import _check_all_days
+
+from .site import StubSite
+from .telegram import FakeBotAPI
+from .webhook import WebhookPoster, message_update
+
+_TOKEN = "123456:LOADTEST"
+_SECRET = "loadtest-secret"
+
+
+def percentiles(samples: List[float]) -> Dict[str, Any]:
+    """p50/p90/p99/max в мс (ближайший ранг)."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def rank(p: float) -> float:
+        index = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+        return round(ordered[index] * 1000, 2)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": rank(50),
+        "p90_ms": rank(90),
+        "p99_ms": rank(99),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def menu_buttons() -> List[str]:
+    """Тексты кнопок главного меню — то, что «нажимают» пользователи."""
+    keyboard = get_menu_keyboard().keyboard
+    return [button.text for row in keyboard for button in row]
+
+
+class LoadDriver:
+    """
+    Имитирует пользователей, которые жмут кнопки меню.
+
+    Апдейты передаются прямо в Dispatcher.feed_update или, если задан
+    poster, POST-ом на webhook (как их присылает Telegram).
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        dp: Dispatcher,
+        seed: int = 0,
+        poster: WebhookPoster | None = None,
+    ) -> None:
+        self.bot = bot
+        self.dp = dp
+        self.poster = poster
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        # Ответ не ушёл из-за 429 — это лимит Telegram, а не ошибка бота
+        self.throttled: Dict[str, int] = defaultdict(int)
+        self._random = random.Random(seed)
+        self._buttons = menu_buttons()
+
+    async def _deliver(self, update: Dict[str, Any]) -> None:
+        if self.poster is not None:
+            # Webhook отвечает после хендлера (build_webhook_app(background=False))
+            status = await self.poster.post(update)
+            if status != 200:
+                raise RuntimeError(f"webhook ответил HTTP {status}")
+            return
+        await self.dp.feed_update(
+            self.bot, Update.model_validate(update, context={"bot": self.bot})
+        )
+
+    async def tap(self, user_id: int, text: str) -> None:
+        """
+        Одно нажатие: время от входящего апдейта до того, как хендлер
+        отправил все ответы (их запросы уже приняты Bot API).
+        """
+        update = message_update(user_id, text)
+        start = time.perf_counter()
+        try:
+            await self._deliver(update)
+        except TelegramRetryAfter:
+            self.throttled[text] += 1
+            return
+        except Exception as e:
+            self.errors[text] += 1
+            print(f"❌ {text} для {user_id}: {e}")
+            return
+        self.latencies[text].append(time.perf_counter() - start)
+
+    async def user_session(self, user_id: int, taps: int, think: float) -> None:
+        for _ in range(taps):
+            await self.tap(user_id, self._random.choice(self._buttons))
+            if think:
+                await asyncio.sleep(self._random.uniform(0, 2 * think))
+
+    async def run(
+        self, user_ids: List[int], taps: int, concurrency: int, think: float
+    ) -> float:
+        """Сессии всех пользователей, не больше concurrency одновременно."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited(user_id: int) -> None:
+            async with semaphore:
+                await self.user_session(user_id, taps, think)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(limited(user_id) for user_id in user_ids))
+        return time.perf_counter() - start
+
+
+async def run_load(
+    users: int = 200,
+    taps: int = 5,
+    concurrency: int = 20,
+    think: float = 0.5,
+    publish_after: float | None = 1.0,
+    api_latency: float = 0.03,
+    api_rate: float = 30,
+    backend: str = "json",
+    transport: str = "feed",
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Полный прогон: заглушка сайта, поддельный Bot API, база на users
+    пользователей и нагрузка нажатиями. Через publish_after секунд
+    (None — без публикации) сайт выкладывает новое расписание, и
+    чекер рассылает уведомления на фоне нажатий.
+
+    transport="webhook" поднимает webhook-приложение бота и шлёт
+    апдейты через него (в ответ на 429 webhook отвечает 500 — такие
+    нажатия считаются ошибками).
+    """
+    site = StubSite()
+    api = FakeBotAPI(latency=api_latency, rate=api_rate)
+    await site.start()
+    await api.start()
+
+    original_urls = dict(config.SCHEDULE_URLS)
+    config.SCHEDULE_URLS.update(site.urls())
+
+    tmp = tempfile.TemporaryDirectory()
+    users_path = os.path.join(tmp.name, "users.json")
+    cache_path = os.path.join(tmp.name, "schedule_cache.json")
+    write_users(users_path, users)
+    if backend == "sqlite":
+        storage = SqliteStorage(os.path.join(tmp.name, "bot.db"), users_path, cache_path)
+    else:
+        storage = JsonStorage(users_path, cache_path)
+    await init_db(storage, flush_interval=0)
+
+    bot = Bot(
+        token=_TOKEN,
+        session=AiohttpSession(api=TelegramAPIServer.from_base(api.base_url)),
+    )
+    fetcher = ScheduleFetcher()
+    day_cache = DayCache(fetcher)
+    dp = create_dispatcher(day_cache)
+    broadcaster = Broadcaster(bot)
+
+    webhook_runner: web.AppRunner | None = None
+    poster: WebhookPoster | None = None
+    if transport == "webhook":
+        webhook_runner = web.AppRunner(
+            build_webhook_app(bot, dp, path="/webhook", secret=_SECRET, background=False)
+        )
+        await webhook_runner.setup()
+        port = unused_port()
+        await web.TCPSite(webhook_runner, "127.0.0.1", port).start()
+        poster = WebhookPoster(f"http://127.0.0.1:{port}/webhook", _SECRET)
+    driver = LoadDriver(bot, dp, seed=seed, poster=poster)
+
+    population = make_users(users)["users"]
+    user_ids = [int(user_id) for user_id in population]
+    subscribers = sum(1 for user in population.values() if user["auto_send"])
+    report: Dict[str, Any] = {}
+
+    try:
+        # Первый цикл заполняет кэш расписаний — дальше рассылаются только изменения
+        await _check_all_days(broadcaster, day_cache)
+        api.sent.clear()
+        api.throttled = 0
+
+        async def publish_and_check() -> Dict[str, Any]:
+            await asyncio.sleep(publish_after)
+            mark = len(api.sent)
+            site.publish()
+            published_at = min(site.published_at.values())
+            await _check_all_days(broadcaster, day_cache)
+
+            notifications = [
+                sent
+                for sent in api.sent[mark:]
+                if sent.text.startswith("🆕")
+            ]
+            result: Dict[str, Any] = {
+                "subscribers": subscribers,
+                "notifications": len(notifications),
+            }
+            if notifications:
+                times = [sent.at - published_at for sent in notifications]
+                result["first_ms"] = round(min(times) * 1000, 2)
+                result["last_ms"] = round(max(times) * 1000, 2)
+            return result
+
+        tasks = [driver.run(user_ids, taps, concurrency, think)]
+        if publish_after is not None:
+            tasks.append(publish_and_check())
+        outcomes = await asyncio.gather(*tasks)
+
+        elapsed = outcomes[0]
+        all_latencies = [value for values in driver.latencies.values() for value in values]
+        report["handlers"] = {
+            text: percentiles(values) for text, values in driver.latencies.items()
+        }
+        report["handlers"]["all"] = percentiles(all_latencies)
+        report["errors"] = dict(driver.errors)
+        report["throttled"] = dict(driver.throttled)
+        report["taps_per_second"] = round(len(all_latencies) / elapsed, 1)
+        if publish_after is not None:
+            report["publish"] = outcomes[1]
+        report["bot_api"] = {
+            "calls": dict(api.calls),
+            "throttled_429": api.throttled,
+        }
+        report["site"] = {"requests": site.requests, "not_modified": site.not_modified}
+        report["fetcher"] = fetcher.stats()
+    finally:
+        config.SCHEDULE_URLS.update(original_urls)
+        if poster is not None:
+            await poster.close()
+        if webhook_runner is not None:
+            await webhook_runner.cleanup()
+        await fetcher.close()
+        await bot.session.close()
+        await close_db()
+        tmp.cleanup()
+        await api.stop()
+        await site.stop()
+
+    report["params"] = {
+        "users": users,
+        "taps": taps,
+        "concurrency": concurrency,
+        "think_s": think,
+        "api_latency_s": api_latency,
+        "api_rate": api_rate,
+        "backend": backend,
+        "transport": transport,
+    }
+    return report
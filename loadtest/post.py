@@ -0,0 +1,42 @@
+# loadtest/post.py
+"""
+Поддельный Telegram для webhook-режима: шлёт апдейты POST-ом.
+
+    python -m loadtest.post http://127.0.0.1:8080/webhook --secret S \\
+        --user 123 --text "📅 Сегодня" --count 10
+
+Ответы бота уйдут в настоящий Bot API — для полностью локальной
+проверки используйте python -m loadtest --transport webhook.
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from .webhook import WebhookPoster, message_update
+
+
+async def _post_many(url: str, secret: str, user_id: int, text: str, count: int) -> int:
+    async with WebhookPoster(url, secret) as poster:
+        statuses = []
+        for _ in range(count):
+            start = time.perf_counter()
+            status = await poster.post(message_update(user_id, text))
+            statuses.append(status)
+            print(f"{status} за {(time.perf_counter() - start) * 1000:.1f} мс")
+    return 0 if all(status == 200 for status in statuses) else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.post")
+    parser.add_argument("url", help="адрес webhook бота")
+    parser.add_argument("--secret", default="", help="WEBHOOK_SECRET бота")
+    parser.add_argument("--user", type=int, default=1, help="id пользователя")
+    parser.add_argument("--text", default="📅 Сегодня", help="текст сообщения")
+    parser.add_argument("--count", type=int, default=1, help="сколько апдейтов")
+    args = parser.parse_args()
+    return asyncio.run(_post_many(args.url, args.secret, args.user, args.text, args.count))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# loadtest/site.py
+import hashlib
+import time
+from typing import Dict, Iterable, List
+
+from aiohttp import web
+from aiohttp.test_utils import unused_port
+
+from benchmarks.fixtures import generate_page
+from config import SCHEDULE_URLS
+
+
+def _slug(url: str) -> str:
+    return "/" + url.rstrip("/").rsplit("/", 1)[-1]
+
+
+class StubSite:
+    """
+    Локальная копия сайта колледжа.
+
+    Отдаёт страницы по тем же путям, что в SCHEDULE_URLS, с ETag
+    (и 304 на If-None-Match). publish() выкладывает новую версию
+    расписания — как если бы колледж обновил страницу.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int | None = None) -> None:
+        self.host = host
+        self.port = port or unused_port()
+        self.requests = 0
+        self.not_modified = 0
+        # Время последней публикации (time.monotonic()) по дням
+        self.published_at: Dict[int, float] = {}
+        self._versions: Dict[int, int] = {weekday: 0 for weekday in SCHEDULE_URLS}
+        self._pages: Dict[str, str] = {}
+        self._etags: Dict[str, str] = {}
+        self._slugs = {_slug(url): weekday for weekday, url in SCHEDULE_URLS.items()}
+        self._runner: web.AppRunner | None = None
+
+        for weekday in self._versions:
+            self._render(weekday)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def urls(self) -> Dict[int, str]:
+        """Адреса страниц по дням недели — подменяют SCHEDULE_URLS."""
+        return {
+            weekday: self.base_url + slug
+            for slug, weekday in self._slugs.items()
+        }
+
+    def _render(self, weekday: int) -> None:
+        slug = _slug(SCHEDULE_URLS[weekday])
+        html = generate_page(weekday, seed=self._versions[weekday])
+        self._pages[slug] = html
+        digest = hashlib.blake2b(html.encode("utf-8"), digest_size=8).hexdigest()
+        self._etags[slug] = f'"{digest}"'
+
+    def publish(self, weekdays: Iterable[int] | None = None) -> List[int]:
+        """Выкладывает новую версию расписания на указанные дни (по умолчанию все)."""
+        weekdays = list(self._versions) if weekdays is None else list(weekdays)
+        now = time.monotonic()
+        for weekday in weekdays:
+            self._versions[weekday] += 1
+            self._render(weekday)
+            self.published_at[weekday] = now
+        return weekdays
+
+    async def _serve(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        slug = request.path
+        if slug not in self._pages:
+            raise web.HTTPNotFound()
+
+        etag = self._etags[slug]
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+
+        return web.Response(
+            text=self._pages[slug],
+            content_type="text/html",
+            headers={"ETag": etag},
+        )
+
+    async def _publish(self, request: web.Request) -> web.Response:
+        """POST /_publish?weekday=N — то же, что publish(), снаружи процесса."""
+        weekday = request.query.get("weekday")
+        published = self.publish(None if weekday is None else [int(weekday)])
+        return web.json_response({"published": published, "versions": self._versions})
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post("/_publish", self._publish)
+        app.router.add_get("/{slug}", self._serve)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,128 @@
+# loadtest/telegram.py
+import asyncio
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List
+
+from aiohttp import web
+from aiohttp.test_utils import unused_port
+
+# Методы, которые отправляют сообщение в чат (под лимит Telegram)
+_SEND_METHODS = frozenset({"sendMessage", "editMessageText"})
+
+
+@dataclass
+class SentMessage:
+    chat_id: int
+    method: str
+    text: str
+    # time.monotonic() момента, когда запрос дошёл до «Telegram»
+    at: float
+
+
+class FakeBotAPI:
+    """
+    Поддельный Bot API: принимает запросы aiogram.Bot по /bot<token>/<method>.
+
+    Записывает отправленные сообщения со временем прихода, имитирует
+    задержку сети (latency, секунды) и глобальный лимит Telegram:
+    больше rate сообщений за секунду — ответ 429 с retry_after.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        rate: float = 30,
+        retry_after: int = 1,
+        host: str = "127.0.0.1",
+        port: int | None = None,
+    ) -> None:
+        self.latency = latency
+        self.rate = rate
+        self.retry_after = retry_after
+        self.host = host
+        self.port = port or unused_port()
+        self.sent: List[SentMessage] = []
+        self.calls: Counter = Counter()
+        self.throttled = 0
+        self._window: Deque[float] = deque()
+        self._message_id = 0
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _over_limit(self, now: float) -> bool:
+        """Скользящее окно в одну секунду по всем чатам."""
+        while self._window and now - self._window[0] >= 1:
+            self._window.popleft()
+        if len(self._window) >= self.rate:
+            return True
+        self._window.append(now)
+        return False
+
+    def _message(self, chat_id: int, text: str) -> Dict[str, Any]:
+        self._message_id += 1
+        return {
+            "message_id": self._message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": text,
+        }
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        data = dict(await request.post())
+        self.calls[method] += 1
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method in _SEND_METHODS:
+            now = time.monotonic()
+            if self._over_limit(now):
+                self.throttled += 1
+                return web.json_response(
+                    {
+                        "ok": False,
+                        "error_code": 429,
+                        "description": (
+                            f"Too Many Requests: retry after {self.retry_after}"
+                        ),
+                        "parameters": {"retry_after": self.retry_after},
+                    }
+                )
+            chat_id = int(data.get("chat_id", 0))
+            text = str(data.get("text", ""))
+            self.sent.append(SentMessage(chat_id, method, text, now))
+            return web.json_response({"ok": True, "result": self._message(chat_id, text)})
+
+        if method == "getMe":
+            return web.json_response(
+                {
+                    "ok": True,
+                    "result": {
+                        "id": 1,
+                        "is_bot": True,
+                        "first_name": "Load Test",
+                        "username": "loadtest_bot",
+                    },
+                }
+            )
+
+        # answerCallbackQuery и прочие служебные методы
+        return web.json_response({"ok": True, "result": True})
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,53 @@
+# loadtest/webhook.py
+import itertools
+import time
+from typing import Any, Dict
+
+import aiohttp
+
+_update_ids = itertools.count(1)
+
+
+def message_update(user_id: int, text: str) -> Dict[str, Any]:
+    """Апдейт с текстовым сообщением пользователя, как его шлёт Telegram."""
+    update_id = next(_update_ids)
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Student"},
+            "text": text,
+        },
+    }
+
+
+class WebhookPoster:
+    """Отправляет апдейты на webhook бота с секретным заголовком."""
+
+    def __init__(self, url: str, secret: str = "") -> None:
+        self.url = url
+        self._headers = {"X-Telegram-Bot-Api-Secret-Token": secret} if secret else {}
+        self._session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self) -> "WebhookPoster":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def post(self, update: Dict[str, Any]) -> int:
+        """POST апдейта; возвращает HTTP-статус ответа бота."""
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        async with self._session.post(
+            self.url, json=update, headers=self._headers
+        ) as response:
+            await response.read()
+            return response.status
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
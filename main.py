@@ -1,13 +1,112 @@
 # bot.py
 import asyncio
+import contextlib
 import os
+import signal
 
 from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
 
-from config import BOT_TOKEN
-from database import init_db
-from handlers import schedule_router, settings_router
-from services import check_schedule_updates
+from config import (
+    BOT_MODE,
+    BOT_TOKEN,
+    LEADER_BACKEND,
+    METRICS_ENABLED,
+    METRICS_HOST,
+    METRICS_PORT,
+    WEBHOOK_BASE_URL,
+    WEBHOOK_HOST,
+    WEBHOOK_PATH,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET,
+)
+from database import close_db, init_db
+from handlers import (
+    HandlerMetricsMiddleware,
+    ProfileMiddleware,
+    schedule_router,
+    settings_router,
+)
+from metrics import start_metrics_server
+from schedule import (
+    DayCache,
+    ScheduleFetcher,
+    create_page_store,
+    init_parse_pool,
+    shutdown_parse_pool,
+)
+from services import check_schedule_updates, create_lease, run_as_leader
+
+
+def create_dispatcher(day_cache: DayCache) -> Dispatcher:
+    """Диспетчер со всеми роутерами и middleware."""
+    dp = Dispatcher(day_cache=day_cache)
+
+    # Профиль пользователя загружается один раз на апдейт
+    dp.message.outer_middleware(ProfileMiddleware())
+    dp.callback_query.outer_middleware(ProfileMiddleware())
+
+    # Время хендлеров (ничего не стоит, пока метрики выключены)
+    dp.message.middleware(HandlerMetricsMiddleware())
+    dp.callback_query.middleware(HandlerMetricsMiddleware())
+
+    # Подключаем роутеры
+    dp.include_router(schedule_router)
+    dp.include_router(settings_router)
+    return dp
+
+
+def build_webhook_app(
+    bot: Bot,
+    dp: Dispatcher,
+    path: str = WEBHOOK_PATH,
+    secret: str = WEBHOOK_SECRET,
+    background: bool = True,
+) -> web.Application:
+    """
+    aiohttp-приложение, принимающее апдейты от Telegram на path.
+
+    background=True — ответ Telegram сразу, апдейт обрабатывается
+    в фоне; False — ответ после хендлера (удобно мерить задержку).
+    """
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        handle_in_background=background,
+        secret_token=secret or None,
+    ).register(app, path=path)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_webhook(bot: Bot, dp: Dispatcher) -> None:
+    """Слушает webhook до SIGINT/SIGTERM."""
+    runner = web.AppRunner(build_webhook_app(bot, dp))
+    await runner.setup()
+    await web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT).start()
+
+    if WEBHOOK_BASE_URL:
+        await bot.set_webhook(
+            WEBHOOK_BASE_URL.rstrip("/") + WEBHOOK_PATH,
+            secret_token=WEBHOOK_SECRET or None,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+    print(f"✅ Webhook слушает {WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await stop.wait()
+    finally:
+        print("🛑 Остановка webhook-сервера")
+        # Дожидается текущих запросов и закрывает сессию бота
+        await runner.cleanup()
 
 
 async def main():
@@ -16,6 +115,10 @@ async def main():
         print("❌ Токен бота не найден! Проверь .env файл.")
         return
 
+    if BOT_MODE not in ("polling", "webhook"):
+        print(f"❌ Неизвестный режим BOT_MODE: {BOT_MODE}")
+        return
+
     # Создаём папку для данных
     os.makedirs("data", exist_ok=True)
 
@@ -23,19 +126,57 @@ async def main():
     await init_db()
     print("✅ База данных инициализирована")
 
+    # Пул разбора HTML прогревается до первого запроса
+    await init_parse_pool()
+    print("✅ Пул разбора расписания запущен")
+
+    metrics_runner = None
+    if METRICS_ENABLED:
+        metrics_runner = await start_metrics_server()
+        print(f"✅ Метрики: http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+
     bot = Bot(token=BOT_TOKEN)
-    dp = Dispatcher()
 
-    # Подключаем роутеры
-    dp.include_router(schedule_router)
-    dp.include_router(settings_router)
+    # Общий HTTP-клиент и кэш страниц для хендлеров и чекера;
+    # с несколькими репликами страницы берутся у лидера через store,
+    # с одной store хранит последние версии дней между перезапусками
+    fetcher = ScheduleFetcher()
+    page_store = create_page_store()
+    day_cache = DayCache(
+        fetcher, store=page_store, store_first=LEADER_BACKEND != "local"
+    )
+    dp = create_dispatcher(day_cache)
 
-    # Запускаем фоновую задачу проверки расписания
-    asyncio.create_task(check_schedule_updates(bot))
+    # Чекер расписания работает только на реплике-лидере
+    lease = create_lease()
+    checker = asyncio.create_task(
+        run_as_leader(lease, lambda: check_schedule_updates(bot, day_cache))
+    )
+    if LEADER_BACKEND != "local":
+        print(f"✅ Реплика {lease.holder}, выбор лидера: {LEADER_BACKEND}")
 
-    print("✅ Бот запущен")
+    print(f"✅ Бот запущен ({BOT_MODE})")
 
-    await dp.start_polling(bot)
+    try:
+        if BOT_MODE == "webhook":
+            await run_webhook(bot, dp)
+        else:
+            await dp.start_polling(bot)
+    finally:
+        # Сначала чекер: незавершённый пакет кэша отбрасывается,
+        # а не пишется наполовину, аренда лидера освобождается сразу
+        checker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await checker
+        await fetcher.close()
+        page_store.close()
+        await bot.session.close()
+        # Сбрасывает отложенные изменения на диск
+        await close_db()
+        shutdown_parse_pool()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        print("✅ Бот остановлен")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,295 @@
+# metrics.py
+"""
+Метрики в текстовом формате Prometheus.
+
+Метрики объявляются в модулях, которые их пишут:
+
+    FETCH_SECONDS = Histogram("schedule_fetch_seconds", "Загрузка страницы", ["kind"])
+
+    with FETCH_SECONDS.time("full"):
+        ...
+
+    @timed(CHECK_SECONDS)
+    async def _check_all_days(...): ...
+
+Пока метрики не включены (enable()), запись — одна проверка флага.
+"""
+import functools
+import inspect
+import time
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple, TypeVar
+
+from aiohttp import web
+
+from config import METRICS_HOST, METRICS_PORT
+
+F = TypeVar("F", bound=Callable)
+
+# Границы корзин гистограмм по умолчанию (секунды)
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)  # fmt: skip
+
+_enabled = False
+_NULL_TIMER = nullcontext()
+
+
+def enable(enabled: bool = True) -> None:
+    """Включает (или выключает) запись метрик."""
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric(ABC):
+    """Общая часть метрик: имя, описание, имена меток, регистрация."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labels)
+        REGISTRY.register(self)
+
+    def _check(self, labels: Tuple[str, ...]) -> None:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name}: ожидались метки {self.labelnames}, получено {labels}"
+            )
+
+    @abstractmethod
+    def samples(self) -> Iterable[str]:
+        """Строки значений метрики в формате Prometheus."""
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples(),
+        ]
+
+
+class Counter(Metric):
+    """Монотонно растущий счётчик."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        if not _enabled:
+            return
+        self._check(labels)
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in sorted(self._values.items()):
+            yield (
+                f"{self.name}{_format_labels(self.labelnames, labels)} "
+                f"{_format_value(value)}"
+            )
+
+
+class Gauge(Counter):
+    """Текущее значение (глубина очереди, размер кэша)."""
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        if not _enabled:
+            return
+        self._check(labels)
+        self._values[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class _Timer:
+    """Контекстный менеджер: пишет длительность блока в гистограмму."""
+
+    __slots__ = ("_histogram", "_labels", "_start")
+
+    def __init__(self, histogram: "Histogram", labels: Tuple[str, ...]) -> None:
+        self._histogram = histogram
+        self._labels = labels
+        self._start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._histogram.observe(time.perf_counter() - self._start, *self._labels)
+
+
+class Histogram(Metric):
+    """Распределение длительностей по корзинам."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # метки -> [счётчики корзин..., сумма, количество]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not _enabled:
+            return
+        self._check(labels)
+        series = self._values.get(labels)
+        if series is None:
+            series = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+    def time(self, *labels: str):
+        """with HISTOGRAM.time("label"): ... — длительность блока."""
+        if not _enabled:
+            return _NULL_TIMER
+        return _Timer(self, labels)
+
+    def samples(self) -> Iterable[str]:
+        for labels, series in sorted(self._values.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield (
+                    f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} "
+                    f"{_format_value(cumulative)}"
+                )
+            inf = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            yield f"{self.name}_bucket{inf} {_format_value(series[-1])}"
+            base = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{base} {_format_value(series[-2])}"
+            yield f"{self.name}_count{base} {_format_value(series[-1])}"
+
+
+def timed(histogram: Histogram, *labels: str) -> Callable[[F], F]:
+    """Декоратор: время вызова функции (обычной или async) в гистограмму."""
+
+    def decorator(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start, *labels)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, *labels)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+class Registry:
+    """Все объявленные метрики и сборщики значений на момент запроса."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name} уже объявлена")
+        self._metrics[metric.name] = metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Функция, обновляющая метрики перед отдачей (размеры кэшей и т.п.)."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                print(f"❌ Ошибка сборщика метрик: {e}")
+
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+async def _handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(
+        body=REGISTRY.render().encode("utf-8"),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+    )
+
+
+def create_metrics_app() -> web.Application:
+    """aiohttp-приложение с GET /metrics (можно встроить в webhook-сервер)."""
+    app = web.Application()
+    app.router.add_get("/metrics", _handle_metrics)
+    return app
+
+
+async def start_metrics_server(
+    host: str = METRICS_HOST, port: int = METRICS_PORT
+) -> web.AppRunner:
+    """Включает метрики и поднимает HTTP-сервер для Prometheus."""
+    enable()
+    runner = web.AppRunner(create_metrics_app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -1,12 +1,41 @@
 # schedule/__init__.py
-from .fetcher import fetch_schedule
-from .formatter import format_schedule, parse_lesson
-from .parser import parse_schedule, parse_schedule_date
+from .cache import DayCache, DaySnapshot
+from .engines import ParserEngine, compare_engines, get_engine
+from .fetcher import FetchResult, ScheduleFetcher, content_digest, fetch_schedule
+from .formatter import format_schedule, parse_lesson, render_lessons
+from .lessons import Lesson, make_lesson
+from .parser import ParsedDay, parse_day, parse_schedule, parse_schedule_date
+from .policy import CircuitBreaker, CircuitOpenError, FetchError, FetchPolicy
+from .pool import init_parse_pool, parse_day_async, shutdown_parse_pool
+from .store import PageStore, SqlitePageStore, create_page_store
 
 __all__ = [
+    "DayCache",
+    "DaySnapshot",
+    "PageStore",
+    "SqlitePageStore",
+    "create_page_store",
+    "FetchResult",
+    "content_digest",
+    "ScheduleFetcher",
     "fetch_schedule",
+    "FetchPolicy",
+    "FetchError",
+    "CircuitOpenError",
+    "CircuitBreaker",
+    "ParserEngine",
+    "get_engine",
+    "compare_engines",
+    "ParsedDay",
+    "parse_day",
     "parse_schedule",
     "parse_schedule_date",
+    "init_parse_pool",
+    "shutdown_parse_pool",
+    "parse_day_async",
+    "Lesson",
+    "make_lesson",
     "parse_lesson",
     "format_schedule",
+    "render_lessons",
 ]
@@ -0,0 +1,299 @@
+# schedule/cache.py
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Sequence, Tuple
+
+from config import DAY_CACHE_SIZE, DAY_CACHE_TTL, PAGE_STORE_MAX_AGE, SCHEDULE_URLS
+from metrics import Counter
+
+from .fetcher import ScheduleFetcher, content_digest
+from .parser import ParsedDay
+from .pool import parse_day_async
+from .store import PageStore, StoredPage
+
+# hit — из памяти, miss — загрузка, shared — ждал чужую загрузку,
+# stale — отдана устаревшая версия, загрузка свежей в фоне
+DAY_CACHE_REQUESTS = Counter(
+    "schedule_day_cache_requests_total", "Запросы к кэшу страниц дня", ["result"]
+)
+
+
+@dataclass
+class _Entry:
+    day: ParsedDay
+    digest: str  # версия страницы (content_digest HTML), её подтверждает чекер
+    version: int  # порядковый номер записи в кэше
+    stored_at: float  # monotonic — для ttl
+    checked_at: float  # time.time() последнего подтверждения — для возраста
+
+
+@dataclass
+class DaySnapshot:
+    """
+    Страница дня для ответа пользователю без ожидания сети.
+
+    stale=True — отдана последняя известная версия (age секунд с последней
+    проверки), а refresh — уже запущенная загрузка свежей (None, если
+    она не нужна). day=None — день ещё ни разу не загружался успешно.
+    """
+
+    day: ParsedDay | None
+    age: float = 0.0
+    stale: bool = False
+    refresh: "asyncio.Future[ParsedDay | None] | None" = None
+
+
+class DayCache:
+    """
+    Кэш разобранных страниц расписания в памяти процесса.
+
+    Записи свежие ttl секунд, хранится не больше maxsize дней
+    (вытесняются давно не использованные). Одновременные промахи
+    по одному дню ждут одну общую загрузку. Устаревшая запись не
+    удаляется: snapshot() отдаёт её сразу и обновляет в фоне.
+
+    С общим store (store_first=True, несколько реплик) промах сначала
+    ищет страницу, опубликованную лидером, и идёт на сайт, только если
+    её там нет или она устарела; возраст ответа — от проверки лидером.
+    Одна реплика (store_first=False) берёт из store только последнюю
+    версию для snapshot(), а за свежей идёт на сайт.
+    """
+
+    def __init__(
+        self,
+        fetcher: ScheduleFetcher,
+        ttl: float = DAY_CACHE_TTL,
+        maxsize: int = DAY_CACHE_SIZE,
+        store: PageStore | None = None,
+        store_max_age: float = PAGE_STORE_MAX_AGE,
+        store_first: bool = False,
+    ) -> None:
+        self.fetcher = fetcher
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._store = store
+        self._store_max_age = store_max_age
+        self._store_first = store_first
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._inflight: Dict[int, asyncio.Future] = {}
+        # Растёт на каждой записи: загрузка, начатая раньше текущей
+        # записи, не должна её перетереть
+        self._version = 0
+
+    def _fresh(self, weekday: int) -> ParsedDay | None:
+        """Возвращает запись, если она ещё не устарела."""
+        entry = self._entries.get(weekday)
+        if entry is None or time.monotonic() - entry.stored_at > self._ttl:
+            return None
+        self._entries.move_to_end(weekday)
+        return entry.day
+
+    def put(
+        self,
+        weekday: int,
+        day: ParsedDay,
+        digest: str,
+        checked_at: float | None = None,
+        fresh: bool = True,
+        since: int | None = None,
+    ) -> bool:
+        """
+        Кладёт свежую страницу (в том числе из чекера расписания).
+        checked_at — когда версия последний раз подтверждена (по умолчанию
+        сейчас), ttl отсчитывается от него. fresh=False — последняя
+        известная версия, сразу на обновление.
+
+        since — self.version на момент начала загрузки: если с тех пор
+        запись уже заменили (например, чекер опубликовал новую версию),
+        результат загрузки отбрасывается. Возвращает, записана ли страница.
+        """
+        entry = self._entries.get(weekday)
+        if since is not None and entry is not None and entry.version > since:
+            return False
+
+        now = time.time()
+        if checked_at is None:
+            checked_at = now
+        self._version += 1
+        self._entries[weekday] = _Entry(
+            day=day,
+            digest=digest,
+            version=self._version,
+            stored_at=(
+                time.monotonic() - max(0.0, now - checked_at)
+                if fresh
+                else float("-inf")
+            ),
+            checked_at=checked_at,
+        )
+        self._entries.move_to_end(weekday)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+        return True
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def touch(self, weekday: int, digest: str) -> None:
+        """
+        Продлевает запись: чекер подтвердил, что версия digest не менялась.
+        Запись другой версии не продлевается — она уже не та, что на сайте.
+        """
+        entry = self._entries.get(weekday)
+        if entry is not None and entry.digest == digest:
+            entry.stored_at = time.monotonic()
+            entry.checked_at = time.time()
+
+    async def publish(self, weekday: int, day: ParsedDay, digest: str) -> None:
+        """Новая версия страницы от чекера: в память и в общий store."""
+        self.put(weekday, day, digest)
+        if self._store is None:
+            return
+        try:
+            await asyncio.to_thread(self._store.save, weekday, day, digest)
+        except Exception as e:
+            print(f"❌ Не удалось опубликовать страницу дня {weekday}: {e}")
+
+    async def confirm(self, weekday: int, digest: str) -> None:
+        """Чекер подтвердил, что версия digest не менялась."""
+        self.touch(weekday, digest)
+        if self._store is None:
+            return
+        try:
+            await asyncio.to_thread(self._store.confirm, weekday, digest)
+        except Exception as e:
+            print(f"❌ Не удалось подтвердить страницу дня {weekday}: {e}")
+
+    async def _from_store(self, weekday: int) -> StoredPage | None:
+        if self._store is None or not self._store_first:
+            return None
+        try:
+            return await asyncio.to_thread(
+                self._store.load, weekday, self._store_max_age
+            )
+        except Exception as e:
+            print(f"❌ Не удалось прочитать страницу дня {weekday} из store: {e}")
+            return None
+
+    async def _load(self, weekday: int) -> ParsedDay | None:
+        """Берёт страницу у лидера или загружает и разбирает её сама."""
+        url = SCHEDULE_URLS.get(weekday)
+        if not url:
+            return None
+
+        since = self._version
+        page = await self._from_store(weekday)
+        if page is not None:
+            return self._settle(
+                weekday, page.day, page.digest, since, checked_at=page.checked_at
+            )
+
+        html = await self.fetcher.fetch(url)
+        if not html:
+            return None
+
+        day = await parse_day_async(html, weekday)
+        return self._settle(weekday, day, content_digest(html), since)
+
+    def _settle(
+        self,
+        weekday: int,
+        day: ParsedDay,
+        digest: str,
+        since: int,
+        checked_at: float | None = None,
+    ) -> ParsedDay:
+        """Кладёт загруженную страницу; если её обогнала более новая — отдаёт ту."""
+        if self.put(weekday, day, digest, checked_at, since=since):
+            return day
+        return self._entries[weekday].day
+
+    def _start_load(self, weekday: int) -> "asyncio.Future[ParsedDay | None]":
+        """Общая загрузка дня: новая или уже идущая."""
+        future = self._inflight.get(weekday)
+        if future is not None:
+            DAY_CACHE_REQUESTS.inc("shared")
+            return future
+
+        DAY_CACHE_REQUESTS.inc("miss")
+        # Загрузка — отдельная задача, чтобы отмена одного
+        # ожидающего не обрывала её для остальных
+        future = asyncio.ensure_future(self._load(weekday))
+        self._inflight[weekday] = future
+        future.add_done_callback(lambda _: self._inflight.pop(weekday, None))
+        return future
+
+    async def get(self, weekday: int) -> ParsedDay | None:
+        """Возвращает страницу дня из кэша или загружает её."""
+        day = self._fresh(weekday)
+        if day is not None:
+            DAY_CACHE_REQUESTS.inc("hit")
+            return day
+        return await asyncio.shield(self._start_load(weekday))
+
+    async def _last_from_store(self, weekday: int) -> _Entry | None:
+        """Последняя версия дня из store (после перезапуска в памяти пусто)."""
+        if self._store is None:
+            return None
+        since = self._version
+        try:
+            page = await asyncio.to_thread(self._store.load_last, weekday)
+        except Exception as e:
+            print(f"❌ Не удалось прочитать страницу дня {weekday} из store: {e}")
+            return None
+        if page is None:
+            return self._entries.get(weekday)
+        fresh = time.time() - page.checked_at <= self._store_max_age
+        self.put(
+            weekday, page.day, page.digest, page.checked_at, fresh=fresh, since=since
+        )
+        return self._entries.get(weekday)
+
+    async def snapshot(self, weekday: int) -> DaySnapshot:
+        """
+        Страница дня без ожидания сети, если день уже встречался.
+
+        Свежая запись — как get(). Устаревшая (в памяти или в store) —
+        отдаётся сразу с возрастом, а загрузка свежей идёт в фоне
+        (одна на всех). Ждём сеть, только если дня ещё не видели.
+        """
+        day = self._fresh(weekday)
+        if day is not None:
+            DAY_CACHE_REQUESTS.inc("hit")
+            return DaySnapshot(day=day, age=self._age(weekday))
+
+        entry = self._entries.get(weekday) or await self._last_from_store(weekday)
+        if entry is not None:
+            if time.monotonic() - entry.stored_at <= self._ttl:
+                # store подтверждён лидером недавно — это свежая версия
+                DAY_CACHE_REQUESTS.inc("hit")
+                return DaySnapshot(day=entry.day, age=self._age(weekday))
+            DAY_CACHE_REQUESTS.inc("stale")
+            return DaySnapshot(
+                day=entry.day,
+                age=self._age(weekday),
+                stale=True,
+                refresh=self._start_load(weekday),
+            )
+
+        day = await asyncio.shield(self._start_load(weekday))
+        return DaySnapshot(day=day)
+
+    def _age(self, weekday: int) -> float:
+        entry = self._entries.get(weekday)
+        return max(0.0, time.time() - entry.checked_at) if entry else 0.0
+
+    async def iter_days(
+        self, weekdays: Sequence[int]
+    ) -> AsyncIterator[Tuple[int, ParsedDay | None]]:
+        """Запрашивает дни параллельно и отдаёт их по порядку weekdays."""
+        tasks = [asyncio.create_task(self.get(weekday)) for weekday in weekdays]
+        try:
+            for weekday, task in zip(weekdays, tasks):
+                yield weekday, await task
+        finally:
+            for task in tasks:
+                task.cancel()
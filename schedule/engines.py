@@ -0,0 +1,245 @@
+# schedule/engines.py
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List, Tuple
+
+from bs4 import BeautifulSoup
+
+from config import PARSER_ENGINE
+
+# Ячейка таблицы: полный текст (как cell.get_text()) и тексты её <p>
+Cell = Tuple[str, List[str]]
+
+
+@dataclass
+class PageTable:
+    """То, что парсеру нужно со страницы: строки таблицы и центрированные <p>."""
+
+    rows: List[List[Cell]] = field(default_factory=list)
+    # Тексты <p style="text-align: center"> — среди них заголовок с датой
+    centered: List[str] = field(default_factory=list)
+
+
+class ParserEngine(ABC):
+    """Движок извлечения таблицы из HTML."""
+
+    name = ""
+
+    @abstractmethod
+    def extract(self, html: str) -> PageTable:
+        ...
+
+
+def _is_centered(style: str | None) -> bool:
+    return bool(style) and "text-align: center" in style
+
+
+class Bs4Engine(ParserEngine):
+    """Эталонный движок: полное DOM-дерево BeautifulSoup."""
+
+    name = "bs4"
+
+    def extract(self, html: str) -> PageTable:
+        soup = BeautifulSoup(html, "html.parser")
+        table = PageTable()
+
+        for p in soup.find_all("p", style=_is_centered):
+            table.centered.append(p.get_text(strip=True))
+
+        for row in soup.find_all("tr"):
+            table.rows.append(
+                [
+                    (
+                        cell.get_text(),
+                        [p.get_text(strip=True) for p in cell.find_all("p")],
+                    )
+                    for cell in row.find_all("td")
+                ]
+            )
+
+        return table
+
+
+# Теги без закрывающей пары (как их понимает BeautifulSoup)
+_VOID_TAGS = frozenset(
+    {
+        "area", "base", "basefont", "bgsound", "br", "col", "command",
+        "embed", "frame", "hr", "image", "img", "input", "isindex",
+        "keygen", "link", "menuitem", "meta", "nextid", "param",
+        "source", "spacer", "track", "wbr",
+    }
+)  # fmt: skip
+
+# Текст внутри этих тегов BeautifulSoup не отдаёт в get_text()
+_HIDDEN_TEXT_TAGS = frozenset({"script", "style", "template", "rt", "rp"})
+
+
+class _Element:
+    """Открытый тег и то, что нужно собрать из его текста."""
+
+    __slots__ = ("tag", "cell", "paragraph", "strings", "chunks")
+
+    def __init__(self, tag: str) -> None:
+        self.tag = tag
+        self.cell: List | None = None  # [текст, абзацы] для <td>
+        self.paragraph: List | None = None  # [текст] для <p>
+        self.strings: List[str] = []  # полоски текста для strip-склейки
+        self.chunks: List[str] = []  # сырой текст для get_text()
+
+
+class _TableExtractor(HTMLParser):
+    """
+    Потоковый разбор без построения DOM.
+
+    Повторяет семантику BeautifulSoup c "html.parser": закрывающий тег
+    снимает со стека всё до парного открывающего, вложенные <tr>/<td>/<p>
+    видны всем открытым предкам, комментарии и текст script/style
+    в текст не попадают.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.table = PageTable()
+        self._stack: List[_Element] = []
+        self._rows: List[List[List]] = []  # открытые <tr>
+        self._cells: List[_Element] = []  # открытые <td>
+        self._paragraphs: List[_Element] = []  # открытые <p>
+        self._hidden = 0
+        self._run: List[str] = []
+
+    def _flush_run(self) -> None:
+        """Текст между двумя тегами — одна строка в терминах bs4."""
+        if not self._run:
+            return
+        text = "".join(self._run)
+        self._run = []
+
+        stripped = text.strip()
+        for cell in self._cells:
+            cell.chunks.append(text)
+        if stripped:
+            for p in self._paragraphs:
+                p.strings.append(stripped)
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        self._flush_run()
+        if tag in _VOID_TAGS:
+            return
+
+        element = _Element(tag)
+        self._stack.append(element)
+
+        if tag in _HIDDEN_TEXT_TAGS:
+            self._hidden += 1
+        elif tag == "tr":
+            row: List = []
+            self.table.rows.append(row)
+            self._rows.append(row)
+        elif tag == "td":
+            element.cell = ["", []]
+            for row in self._rows:
+                row.append(element.cell)
+            self._cells.append(element)
+        elif tag == "p":
+            element.paragraph = [""]
+            for cell in self._cells:
+                cell.cell[1].append(element.paragraph)
+            self._paragraphs.append(element)
+            if _is_centered(dict(attrs).get("style")):
+                self.table.centered.append(element.paragraph)
+
+    def handle_endtag(self, tag: str) -> None:
+        self._flush_run()
+        # Как bs4: нет открытого парного тега — закрывающий игнорируется
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i].tag == tag:
+                break
+        else:
+            return
+
+        while len(self._stack) > i:
+            self._close(self._stack.pop())
+
+    def _close(self, element: _Element) -> None:
+        if element.tag in _HIDDEN_TEXT_TAGS:
+            self._hidden -= 1
+        elif element.tag == "tr":
+            self._rows.pop()
+        elif element.tag == "td":
+            element.cell[0] = "".join(element.chunks)
+            self._cells.remove(element)
+        elif element.tag == "p":
+            element.paragraph[0] = "".join(element.strings)
+            self._paragraphs.remove(element)
+
+    def handle_data(self, data: str) -> None:
+        if not self._hidden:
+            self._run.append(data)
+
+    def handle_comment(self, data: str) -> None:
+        self._flush_run()
+
+    def finish(self) -> PageTable:
+        self.close()
+        self._flush_run()
+        while self._stack:
+            self._close(self._stack.pop())
+
+        # Списки-заготовки -> итоговые кортежи/строки
+        table = self.table
+        table.rows = [
+            [(cell[0], [p[0] for p in cell[1]]) for cell in row]
+            for row in table.rows
+        ]
+        table.centered = [p[0] for p in table.centered]
+        return table
+
+
+class StreamEngine(ParserEngine):
+    """Быстрый движок на html.parser.HTMLParser без построения дерева."""
+
+    name = "stream"
+
+    def extract(self, html: str) -> PageTable:
+        extractor = _TableExtractor()
+        extractor.feed(html)
+        return extractor.finish()
+
+
+ENGINES: Dict[str, ParserEngine] = {
+    engine.name: engine for engine in (Bs4Engine(), StreamEngine())
+}
+
+
+def get_engine(name: str | None = None) -> ParserEngine:
+    """Движок по имени (по умолчанию — из конфига)."""
+    name = name or PARSER_ENGINE
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Неизвестный движок парсера: {name}") from None
+
+
+def compare_engines(
+    html: str, reference: str = "bs4", candidate: str = "stream"
+) -> List[str]:
+    """
+    Проверка соответствия: разбирает страницу двумя движками
+    и возвращает список расхождений (пустой — результаты идентичны).
+    """
+    expected = get_engine(reference).extract(html)
+    actual = get_engine(candidate).extract(html)
+    problems: List[str] = []
+
+    if expected.centered != actual.centered:
+        problems.append(f"centered: {expected.centered!r} != {actual.centered!r}")
+
+    if len(expected.rows) != len(actual.rows):
+        problems.append(f"rows: {len(expected.rows)} != {len(actual.rows)}")
+
+    for i, (exp_row, act_row) in enumerate(zip(expected.rows, actual.rows)):
+        if exp_row != act_row:
+            problems.append(f"row {i}: {exp_row!r} != {act_row!r}")
+
+    return problems
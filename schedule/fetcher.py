@@ -1,16 +1,306 @@
 # schedule/fetcher.py
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from importlib.util import find_spec
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+from urllib.parse import urlsplit
+
 import aiohttp
 
+from config import (
+    FETCH_CONCURRENCY,
+    FETCH_CONNECT_TIMEOUT,
+    FETCH_DEADLINE,
+    FETCH_DEADLINE_GRACE,
+    FETCH_DNS_CACHE_TTL,
+    FETCH_POOL_LIMIT_PER_HOST,
+    FETCH_TIMEOUT,
+)
+from metrics import Counter, Histogram
+
+from .policy import CircuitOpenError, FetchError, FetchPolicy
+
+FETCH_SECONDS = Histogram(
+    "schedule_fetch_seconds", "Загрузка страницы расписания", ["kind"]
+)
+FETCH_RESULTS = Counter(
+    "schedule_fetch_total", "Результаты загрузки страниц расписания", ["result"]
+)
+
+# aiohttp умеет распаковывать brotli, только если установлен brotli/brotlicffi
+_HAS_BROTLI = bool(find_spec("brotli") or find_spec("brotlicffi"))
+ACCEPT_ENCODING = "gzip, deflate, br" if _HAS_BROTLI else "gzip, deflate"
+
+T = TypeVar("T")
+
+
+def content_digest(text: str) -> str:
+    """Короткий отпечаток содержимого страницы."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class FetchResult:
+    """Результат условного запроса страницы."""
+
+    url: str
+    # False — страница не менялась с последнего commit() (304 или тот же digest)
+    changed: bool
+    text: str | None = None
+    digest: str = ""
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+@dataclass
+class _Response:
+    status: int
+    text: str | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+@dataclass
+class _Validators:
+    etag: str | None
+    last_modified: str | None
+    digest: str
+
+
+class ScheduleFetcher:
+    """
+    Долгоживущий HTTP-клиент для страниц расписания.
+
+    Держит одну aiohttp-сессию с пулом keep-alive соединений
+    и DNS-кэшем. Создаётся и закрывается в main.py.
+
+    Каждый запрос идёт через FetchPolicy: повторы временных ошибок,
+    предохранитель на хост и (опционально) дублирующие запросы.
+    """
+
+    def __init__(
+        self,
+        timeout: float = FETCH_TIMEOUT,
+        connect_timeout: float = FETCH_CONNECT_TIMEOUT,
+        limit_per_host: int = FETCH_POOL_LIMIT_PER_HOST,
+        dns_cache_ttl: int = FETCH_DNS_CACHE_TTL,
+        concurrency: int = FETCH_CONCURRENCY,
+        deadline: float = FETCH_DEADLINE,
+        deadline_grace: float = FETCH_DEADLINE_GRACE,
+        policy: FetchPolicy | None = None,
+    ) -> None:
+        self._timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self._limit_per_host = limit_per_host
+        self._dns_cache_ttl = dns_cache_ttl
+        self._concurrency = concurrency
+        self._deadline = deadline
+        # Внешний дедлайн iter_many позже бюджета политики: иначе он
+        # отменял бы её на той же секунде, и сбои считались бы «deadline»
+        self._hard_deadline = deadline + deadline_grace
+        self.policy = policy or FetchPolicy(budget=deadline)
+        self._session: aiohttp.ClientSession | None = None
+        # url -> ETag/Last-Modified/digest последней обработанной версии
+        self._validators: Dict[str, _Validators] = {}
+
+    async def __aenter__(self) -> "ScheduleFetcher":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Лениво создаёт сессию (внутри работающего event loop)."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self._limit_per_host,
+                use_dns_cache=True,
+                ttl_dns_cache=self._dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self._timeout,
+                headers={"Accept-Encoding": ACCEPT_ENCODING},
+            )
+        return self._session
+
+    async def _get(self, url: str, headers: Dict[str, str], kind: str) -> _Response:
+        """Одна HTTP-попытка; FetchError, если ответ не 200/304."""
+        with FETCH_SECONDS.time(kind):
+            async with self._get_session().get(url, headers=headers) as response:
+                if response.status == 304:
+                    return _Response(status=304)
+                if response.status != 200:
+                    # 5xx и 429 — сайт перегружен, повтор может помочь
+                    transient = response.status >= 500 or response.status == 429
+                    raise FetchError(f"HTTP {response.status}", transient=transient)
+                return _Response(
+                    status=200,
+                    text=await response.text(),
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+
+    async def _request(
+        self, url: str, headers: Dict[str, str], kind: str
+    ) -> _Response | None:
+        """Запрос по правилам политики; None — все попытки неудачны."""
+        try:
+            return await self.policy.call(
+                urlsplit(url).netloc, lambda: self._get(url, headers, kind)
+            )
+        except CircuitOpenError:
+            # Хост выключен — без лога на каждый запрос, сообщил предохранитель
+            FETCH_RESULTS.inc("short_circuit")
+        except Exception as e:
+            print(f"Ошибка загрузки расписания с {url}: {e}")
+            FETCH_RESULTS.inc("error")
+        return None
+
+    async def fetch(self, url: str) -> str | None:
+        """Получает HTML страницы расписания по указанному URL."""
+        response = await self._request(url, {}, "full")
+        if response is None:
+            return None
+        if response.status != 200:
+            print(f"Ошибка загрузки расписания с {url}: HTTP {response.status}")
+            FETCH_RESULTS.inc("error")
+            return None
+        FETCH_RESULTS.inc("ok")
+        return response.text
+
+    async def fetch_if_changed(self, url: str) -> FetchResult | None:
+        """
+        Условный GET: отправляет If-None-Match/If-Modified-Since
+        и сверяет digest тела с последней версией, переданной в commit().
+        Возвращает None при ошибке загрузки.
+        """
+        known = self._validators.get(url)
+        headers: Dict[str, str] = {}
+        if known:
+            if known.etag:
+                headers["If-None-Match"] = known.etag
+            if known.last_modified:
+                headers["If-Modified-Since"] = known.last_modified
+
+        response = await self._request(url, headers, "conditional")
+        if response is None:
+            return None
+
+        if response.status == 304:
+            if known is None:
+                print(f"Ошибка загрузки расписания с {url}: HTTP 304")
+                FETCH_RESULTS.inc("error")
+                return None
+            FETCH_RESULTS.inc("not_modified")
+            return FetchResult(url=url, changed=False, digest=known.digest)
+
+        text = response.text
+        etag, last_modified = response.etag, response.last_modified
+
+        digest = content_digest(text)
+        if known and known.digest == digest:
+            # Тело то же — просто обновляем валидаторы для следующих запросов
+            known.etag, known.last_modified = etag, last_modified
+            FETCH_RESULTS.inc("unchanged")
+            return FetchResult(url=url, changed=False, digest=digest)
+
+        FETCH_RESULTS.inc("changed")
+
+        return FetchResult(
+            url=url,
+            changed=True,
+            text=text,
+            digest=digest,
+            etag=etag,
+            last_modified=last_modified,
+        )
+
+    def commit(self, result: FetchResult) -> None:
+        """
+        Запоминает версию страницы как обработанную.
+
+        Вызывается после успешной обработки, чтобы сбой посередине
+        не привёл к пропуску изменений в следующем цикле.
+        """
+        if not result.changed:
+            return
+        self._validators[result.url] = _Validators(
+            etag=result.etag,
+            last_modified=result.last_modified,
+            digest=result.digest,
+        )
+
+    async def iter_many(
+        self,
+        urls: Sequence[str],
+        fetch: Callable[[str], Awaitable[T | None]] | None = None,
+    ) -> AsyncIterator[Tuple[int, T | None]]:
+        """
+        Загружает страницы параллельно (не больше concurrency одновременно)
+        и отдаёт (индекс, результат) строго в порядке urls, как только
+        готов очередной элемент. Запрос, зависший дольше deadline
+        с запасом, даёт None.
+        """
+        fetch = fetch or self.fetch
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def one(url: str) -> T | None:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(fetch(url), self._hard_deadline)
+                except asyncio.TimeoutError:
+                    FETCH_RESULTS.inc("deadline")
+                    deadline = self._hard_deadline
+                    print(f"Ошибка загрузки расписания с {url}: дедлайн {deadline} с")
+                    return None
+
+        tasks = [asyncio.create_task(one(url)) for url in urls]
+        try:
+            for i, task in enumerate(tasks):
+                yield i, await task
+        finally:
+            # Потребитель мог прервать перебор — не оставляем висящих задач
+            for task in tasks:
+                task.cancel()
+
+    async def fetch_many(self, urls: Sequence[str]) -> List[str | None]:
+        """Загружает несколько страниц параллельно, результаты — в порядке urls."""
+        return [html async for _, html in self.iter_many(urls)]
+
+    async def fetch_many_if_changed(
+        self, urls: Sequence[str]
+    ) -> List[FetchResult | None]:
+        """Параллельный fetch_if_changed, результаты — в порядке urls."""
+        return [r async for _, r in self.iter_many(urls, self.fetch_if_changed)]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Состояние политики загрузки по хостам (см. FetchPolicy.stats)."""
+        return self.policy.stats()
+
+    async def close(self) -> None:
+        """Закрывает сессию и все соединения пула."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
 
 async def fetch_schedule(url: str) -> str | None:
-    """Получает HTML страницы расписания по указанному URL."""
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=10) as response:
-                if response.status == 200:
-                    return await response.text()
-                # Можно залогировать и другие статусы, если нужно
-    except Exception as e:
-        # Здесь можно подключить logging вместо print
-        print(f"Ошибка загрузки расписания с {url}: {e}")
-    return None
+    """
+    Разовая загрузка страницы без общего пула.
+
+    В боте используется общий ScheduleFetcher — эта функция
+    оставлена для скриптов и отладки.
+    """
+    async with ScheduleFetcher() as fetcher:
+        return await fetcher.fetch(url)
@@ -1,83 +1,67 @@
 # schedule/formatter.py
-import re
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
 
-from config import LESSON_TIMES_DEFAULT, LESSON_TIMES_THURSDAY
+from config import LESSON_TIMES_THURSDAY, RENDER_CACHE_SIZE
+from metrics import REGISTRY, Gauge, Histogram, timed
 
+from .lessons import Lesson, make_lesson, parse_lesson  # noqa: F401
 
-def parse_lesson(lesson_text: str) -> tuple[str, str]:
-    """
-    Разбирает строку пары на название предмета и кабинет.
-    Пример входа:
-    "1) Математика 305" -> ("Математика", "305")
-    """
-    lesson_text = lesson_text.strip()
-
-    if not lesson_text:
-        return "", ""
-
-    # Ищем номер кабинета в конце строки
-    match = re.search(
-        r"\s+(\d{3}|ЦОС|полигон|\(полигон\))$",
-        lesson_text,
-        re.IGNORECASE,
-    )
-
-    if match:
-        room = match.group(1).strip("()")
-        subject = lesson_text[: match.start()].strip()
-    else:
-        subject = lesson_text
-        room = "—"
-
-    return subject, room
+# Пишется только при промахе кэша — то есть настоящий рендер
+RENDER_SECONDS = Histogram("schedule_render_seconds", "Рендер расписания группы")
+RENDER_CACHE = Gauge(
+    "schedule_render_cache", "Кэш рендера: попадания, промахи, размер", ["stat"]
+)
 
 
-def format_schedule(lessons: List[str], weekday: int) -> str:
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+@timed(RENDER_SECONDS)
+def render_lessons(weekday: int, lessons: Tuple[Lesson, ...]) -> str:
     """
-    Форматирует список строк-пар в красивое сообщение для Telegram.
-    lessons: список строк вида "1) Предмет 305"
-    weekday: номер дня недели (0 = понедельник, ..., 3 = четверг, и т.д.)
+    Форматирует разобранные пары в сообщение для Telegram.
+
+    Результат кэшируется по (weekday, lessons): одно и то же расписание
+    при рассылке и в ответах на кнопки рендерится один раз.
     """
     if not lessons:
         return "📭 Пар нет"
 
     formatted: list[str] = []
-    is_thursday = weekday == 3
 
     # Добавляем классный час для четверга
-    if is_thursday and 0 in LESSON_TIMES_THURSDAY:
+    if weekday == 3 and 0 in LESSON_TIMES_THURSDAY:
         time_info = LESSON_TIMES_THURSDAY[0]
         # time_info: tuple("08:00-08:30", "Классный час")
         time_range, title = time_info
         formatted.append(f"📖 {title}\n⏰ {time_range}\n🏫 —")
 
     for lesson in lessons:
-        # Извлекаем номер пары (1), (2) и т.д.
-        match = re.match(r"^(\d+)\)\s*(.*)$", lesson)
-        if not match:
+        if lesson.is_empty:
             continue
+        formatted.append(f"📖 {lesson.subject}\n⏰ {lesson.time}\n🏫 {lesson.room}")
 
-        num = int(match.group(1))
-        content = match.group(2).strip()
-        if not content:
-            continue
+    if not formatted:
+        return "📭 Пар нет"
 
-        subject, room = parse_lesson(content)
+    return "\n\n".join(formatted)
 
-        # Выбираем время пары
-        if is_thursday:
-            time = LESSON_TIMES_THURSDAY.get(num, "—")
-        else:
-            time = LESSON_TIMES_DEFAULT.get(num, "—")
 
-        # На четверг для num >= 1 время — строка, для 0 — кортеж
-        if isinstance(time, tuple):
-            time = time[0]
+def _collect_render_cache() -> None:
+    info = render_lessons.cache_info()
+    RENDER_CACHE.set(info.hits, "hits")
+    RENDER_CACHE.set(info.misses, "misses")
+    RENDER_CACHE.set(info.currsize, "size")
 
-        formatted.append(f"📖 {subject}\n⏰ {time}\n🏫 {room}")
 
-    if not formatted:
-        return "📭 Пар нет"
+REGISTRY.add_collector(_collect_render_cache)
 
-    return "\n\n".join(formatted)
+
+def format_schedule(lessons: List[str], weekday: int) -> str:
+    """
+    Форматирует список строк-пар в красивое сообщение для Telegram.
+    lessons: список строк вида "1) Предмет 305"
+    weekday: номер дня недели (0 = понедельник, ..., 3 = четверг, и т.д.)
+    """
+    return render_lessons(
+        weekday, tuple(make_lesson(lesson, weekday) for lesson in lessons)
+    )
@@ -0,0 +1,83 @@
+# schedule/lessons.py
+import re
+from typing import NamedTuple
+
+from config import LESSON_TIMES_DEFAULT, LESSON_TIMES_THURSDAY
+
+# "1) Математика 305" -> номер пары и остаток строки
+_LESSON_RE = re.compile(r"^(\d+)\)\s*(.*)$")
+
+# Номер кабинета в конце строки
+_ROOM_RE = re.compile(r"\s+(\d{3}|ЦОС|полигон|\(полигон\))$", re.IGNORECASE)
+
+
+class Lesson(NamedTuple):
+    """
+    Пара, разобранная один раз при парсинге страницы.
+
+    Кортеж: компактный, хэшируемый (ключ кэша рендера)
+    и передаётся между процессами без накладных расходов.
+    """
+
+    num: int  # -1, если строка не похожа на пару
+    subject: str  # пустой — пары нет ("4)")
+    room: str
+    time: str
+    text: str  # исходная строка со страницы
+
+    @property
+    def is_empty(self) -> bool:
+        return self.num < 0 or not self.subject
+
+
+def parse_lesson(lesson_text: str) -> tuple[str, str]:
+    """
+    Разбирает строку пары на название предмета и кабинет.
+    Пример входа:
+    "1) Математика 305" -> ("Математика", "305")
+    """
+    lesson_text = lesson_text.strip()
+
+    if not lesson_text:
+        return "", ""
+
+    # Ищем номер кабинета в конце строки
+    match = _ROOM_RE.search(lesson_text)
+
+    if match:
+        room = match.group(1).strip("()")
+        subject = lesson_text[: match.start()].strip()
+    else:
+        subject = lesson_text
+        room = "—"
+
+    return subject, room
+
+
+def lesson_time(num: int, weekday: int | None) -> str:
+    """Время пары по расписанию звонков (в четверг — своё)."""
+    if weekday == 3:
+        time = LESSON_TIMES_THURSDAY.get(num, "—")
+    else:
+        time = LESSON_TIMES_DEFAULT.get(num, "—")
+
+    # На четверг для num >= 1 время — строка, для 0 — кортеж
+    if isinstance(time, tuple):
+        time = time[0]
+    return time
+
+
+def make_lesson(text: str, weekday: int | None) -> Lesson:
+    """Строит Lesson из строки вида "1) Предмет 305"."""
+    # Извлекаем номер пары (1), (2) и т.д.
+    match = _LESSON_RE.match(text)
+    if not match:
+        return Lesson(-1, "", "", "", text)
+
+    num = int(match.group(1))
+    content = match.group(2).strip()
+    if not content:
+        return Lesson(num, "", "", "", text)
+
+    subject, room = parse_lesson(content)
+    return Lesson(num, subject, room, lesson_time(num, weekday), text)
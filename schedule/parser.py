@@ -1,47 +1,185 @@
 # schedule/parser.py
+import hashlib
 import re
-from typing import List
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from .engines import PageTable, get_engine
+from .lessons import Lesson, make_lesson
+
+MONTHS: Dict[str, str] = {
+    "января": "01",
+    "февраля": "02",
+    "марта": "03",
+    "апреля": "04",
+    "мая": "05",
+    "июня": "06",
+    "июля": "07",
+    "августа": "08",
+    "сентября": "09",
+    "октября": "10",
+    "ноября": "11",
+    "декабря": "12",
+}
+
+
+@dataclass
+class ParsedDay:
+    """
+    Разобранная страница расписания на один день.
 
-from bs4 import BeautifulSoup
+    Хранит дату и пары всех групп со страницы, чтобы HTML
+    разбирался один раз. Первый поиск группы — линейный проход
+    по cells (нужна первая подходящая ячейка, как в исходном парсере),
+    повторные берутся из found за O(1).
+    """
 
+    date: str = ""
+    weekday: int | None = None
+    # Все ячейки в порядке документа: текст ячейки -> пары из ячейки под ней
+    cells: List[Tuple[str, Tuple[Lesson, ...]]] = field(default_factory=list)
+    # Уже найденные группы: group -> пары (cells просматриваются
+    # один раз на группу)
+    found: Dict[str, Tuple[Lesson, ...]] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+
+    def lessons_for(self, group: str) -> Tuple[Lesson, ...]:
+        """
+        Возвращает пары группы (пустой кортеж, если группа не найдена).
+
+        Как и исходный парсер, берёт первую сверху вниз ячейку, в тексте
+        которой есть название группы: "ИС-21, ИС-21к" выше ячейки "ИС-21"
+        выигрывает у неё.
+        """
+        lessons = self.found.get(group)
+        if lessons is None:
+            lessons = next(
+                (cell_lessons for text, cell_lessons in self.cells if group in text),
+                (),
+            )
+            self.found[group] = lessons
+        return lessons
+
+    def texts_for(self, group: str) -> List[str]:
+        """Пары группы исходными строками вида "1) Предмет 305"."""
+        return [lesson.text for lesson in self.lessons_for(group)]
+
+    def digest(self) -> str:
+        """
+        Отпечаток разобранной страницы: дата и пары всех ячеек.
+
+        Не зависит от разметки, так что правки оформления страницы
+        не выглядят как изменение расписания.
+        """
+        h = hashlib.blake2b(self.date.encode("utf-8"), digest_size=16)
+        for text, lessons in self.cells:
+            h.update(b"\x1e" + text.strip().encode("utf-8"))
+            for lesson in lessons:
+                h.update(b"\x1f" + lesson.text.strip().encode("utf-8"))
+        return h.hexdigest()
+
+    def add_cell(self, text: str, lessons: Tuple[Lesson, ...]) -> None:
+        self.cells.append((text, lessons))
+        self.found.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-совместимый вид: дата, день недели и cells (без found)."""
+        return {
+            "date": self.date,
+            "weekday": self.weekday,
+            "cells": [
+                [text, [list(lesson) for lesson in lessons]]
+                for text, lessons in self.cells
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ParsedDay":
+        day = cls(date=data.get("date", ""), weekday=data.get("weekday"))
+        for text, lessons in data.get("cells", []):
+            day.add_cell(text, tuple(Lesson(*lesson) for lesson in lessons))
+        return day
+
+
+def _cell_lessons(
+    paragraphs: List[str], weekday: int | None
+) -> Tuple[Lesson, ...]:
+    """Собирает непустые абзацы ячейки с парами."""
+    lessons: List[Lesson] = []
+    for text in paragraphs:
+        # Отбрасываем пустые и неразрывный пробел
+        if text and text != "\xa0":
+            lessons.append(make_lesson(text, weekday))
+    return tuple(lessons)
+
+
+def _parse_date_text(text: str) -> str:
+    """
+    Достаёт дату из строки "Расписание занятий на 15 апреля 2024 г.".
+    Возвращает "15.04.2024" или пустую строку.
+    """
+    if "Расписание занятий на" not in text:
+        return ""
 
-def parse_schedule(html: str, group: str) -> List[str]:
+    # Ищем шаблон "15 апреля 2024"
+    match = re.search(r"(\d{1,2})\s+(\w+)\s+(\d{4})", text)
+    if not match:
+        return ""
+
+    day = match.group(1).zfill(2)
+    month = MONTHS.get(match.group(2).lower(), "00")
+    year = match.group(3)
+    return f"{day}.{month}.{year}"
+
+
+def _find_date(table: PageTable) -> str:
+    """Ищет дату среди <p> с center-стилем."""
+    for text in table.centered:
+        date = _parse_date_text(text)
+        if date:
+            return date
+
+    return ""
+
+
+def parse_day(
+    html: str, weekday: int | None = None, engine: str | None = None
+) -> ParsedDay:
     """
-    Парсит расписание для конкретной группы из HTML.
+    Разбирает страницу расписания за один проход.
 
-    Ищет ячейку таблицы с названием группы,
-    берёт строку ниже и тот же столбец — это ячейка с парами.
-    Возвращает список строк вида "1) Предмет 305".
+    Для каждой ячейки таблицы берёт ячейку того же столбца
+    в следующей строке — это пары группы из верхней ячейки.
+    weekday нужен, чтобы сразу подставить время пар,
+    engine — имя движка извлечения (по умолчанию из конфига).
     """
-    soup = BeautifulSoup(html, "html.parser")
+    table = get_engine(engine).extract(html)
+    day = ParsedDay(date=_find_date(table), weekday=weekday)
 
-    rows = soup.find_all("tr")
-    if not rows:
-        return []
+    rows = table.rows
+    for i in range(len(rows) - 1):
+        cells = rows[i]
+        next_cells = rows[i + 1]
 
-    for i, row in enumerate(rows):
-        cells = row.find_all("td")
-        for j, cell in enumerate(cells):
-            # Проверяем, есть ли название группы в ячейке
-            if group in cell.get_text():
-                # Строка с парами — следующая после строки с группой
-                if i + 1 < len(rows):
-                    next_row = rows[i + 1]
-                    next_cells = next_row.find_all("td")
+        for j, (text, _) in enumerate(cells):
+            if j >= len(next_cells):
+                break
 
-                    if j < len(next_cells):
-                        schedule_cell = next_cells[j]
+            day.add_cell(text, _cell_lessons(next_cells[j][1], weekday))
 
-                        lessons: List[str] = []
-                        for p in schedule_cell.find_all("p"):
-                            text = p.get_text(strip=True)
-                            # Отбрасываем пустые и неразрывный пробел
-                            if text and text != "\xa0":
-                                lessons.append(text)
+    return day
 
-                        return lessons
 
-    return []
+def parse_schedule(html: str, group: str) -> List[str]:
+    """
+    Парсит расписание для конкретной группы из HTML.
+
+    Ищет ячейку таблицы с названием группы,
+    берёт строку ниже и тот же столбец — это ячейка с парами.
+    Возвращает список строк вида "1) Предмет 305".
+    """
+    return parse_day(html).texts_for(group)
 
 
 def parse_schedule_date(html: str) -> str:
@@ -52,37 +190,4 @@ def parse_schedule_date(html: str) -> str:
     "Расписание занятий на 15 апреля 2024 г."
     Возвращает строку в формате ДД.ММ.ГГГГ, например "15.04.2024".
     """
-    soup = BeautifulSoup(html, "html.parser")
-
-    # Ищем все <p> с center-стилем
-    p_tags = soup.find_all("p", style=lambda x: x and "text-align: center" in x)
-
-    months = {
-        "января": "01",
-        "февраля": "02",
-        "марта": "03",
-        "апреля": "04",
-        "мая": "05",
-        "июня": "06",
-        "июля": "07",
-        "августа": "08",
-        "сентября": "09",
-        "октября": "10",
-        "ноября": "11",
-        "декабря": "12",
-    }
-
-    for p in p_tags:
-        text = p.get_text(strip=True)
-        if "Расписание занятий на" in text:
-            # Ищем шаблон "15 апреля 2024"
-            match = re.search(r"(\d{1,2})\s+(\w+)\s+(\d{4})", text)
-            if match:
-                day = match.group(1).zfill(2)
-                month_name = match.group(2).lower()
-                year = match.group(3)
-
-                month = months.get(month_name, "00")
-                return f"{day}.{month}.{year}"
-
-    return ""
+    return _find_date(get_engine().extract(html))
@@ -0,0 +1,350 @@
+# schedule/policy.py
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, TypeVar
+
+import aiohttp
+
+from config import (
+    FETCH_BACKOFF_BASE,
+    FETCH_BACKOFF_MAX,
+    FETCH_BACKOFF_JITTER,
+    FETCH_BREAKER_RESET,
+    FETCH_BREAKER_THRESHOLD,
+    FETCH_DEADLINE,
+    FETCH_HEDGE,
+    FETCH_HEDGE_MIN_DELAY,
+    FETCH_HEDGE_MIN_SAMPLES,
+    FETCH_HEDGE_QUANTILE,
+    FETCH_RETRIES,
+)
+from metrics import Counter
+
+T = TypeVar("T")
+
+# retry, hedge, hedge_win, short_circuit, breaker_open
+FETCH_POLICY_EVENTS = Counter(
+    "schedule_fetch_policy_total", "События политики загрузки страниц", ["event"]
+)
+
+
+class FetchError(Exception):
+    """Неудачная попытка загрузки (transient — имеет смысл повторить)."""
+
+    def __init__(self, message: str, transient: bool = True) -> None:
+        super().__init__(message)
+        self.transient = transient
+
+
+class CircuitOpenError(FetchError):
+    """Хост выключен предохранителем — запрос даже не отправлялся."""
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        super().__init__(
+            f"хост {host} недоступен, повтор через {retry_in:.0f} с", transient=False
+        )
+
+
+def is_transient(error: BaseException) -> bool:
+    """Сетевые сбои, таймауты и 5xx/429 — повторяем; остальное — нет."""
+    if isinstance(error, FetchError):
+        return error.transient
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError, OSError))
+
+
+class CircuitBreaker:
+    """
+    Предохранитель одного хоста.
+
+    После threshold неудач подряд хост «выключается» на reset_timeout
+    секунд: запросы сразу получают CircuitOpenError, а не ждут таймаут.
+    Потом пропускается один пробный запрос (half_open): успех включает
+    хост обратно, неудача — выключает ещё на reset_timeout.
+    """
+
+    def __init__(
+        self,
+        threshold: int = FETCH_BREAKER_THRESHOLD,
+        reset_timeout: float = FETCH_BREAKER_RESET,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._threshold = threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._clock() - self.opened_at >= self._reset_timeout:
+            return "half_open"
+        return "open"
+
+    def retry_in(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self._reset_timeout - self._clock())
+
+    def allow(self) -> bool:
+        """Можно ли отправить запрос сейчас."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> bool:
+        """Учитывает неудачу; True — хост только что выключен."""
+        self.failures += 1
+        self._probing = False
+        state = self.state
+        if state == "open":
+            # Запрос, начатый до выключения, — окно не продлеваем
+            return False
+        if state == "half_open" or self.failures >= self._threshold:
+            self.opened_at = self._clock()
+            return True
+        return False
+
+    def cancel_probe(self) -> None:
+        """Пробный запрос отменён, не дойдя до ответа."""
+        self._probing = False
+
+
+class LatencyWindow:
+    """Время последних успешных попыток — для задержки дублирующего запроса."""
+
+    def __init__(self, size: int = 200) -> None:
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def quantile(self, q: float) -> float:
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _HostState:
+    def __init__(self, breaker: CircuitBreaker) -> None:
+        self.breaker = breaker
+        self.latency = LatencyWindow()
+        self.counts: Dict[str, int] = {
+            "calls": 0,
+            "attempts": 0,
+            "failures": 0,
+            "retries": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "short_circuited": 0,
+        }
+
+
+class FetchPolicy:
+    """
+    Повторы, предохранитель и дублирующие запросы для загрузки страниц.
+
+    call(host, attempt) выполняет attempt() (одна HTTP-попытка, бросает
+    исключение при неудаче) по правилам:
+
+    - временные ошибки повторяются до retries раз с экспоненциальной
+      паузой и разбросом, но весь вызов укладывается в budget секунд —
+      таймауты не складываются;
+    - хост с threshold неудачами подряд выключается предохранителем
+      на reset_timeout секунд, запросы к нему сразу завершаются ошибкой;
+    - hedge=True: если попытка дольше p-квантиля недавних успешных
+      (quantile, не меньше hedge_min_delay), параллельно идёт вторая,
+      берётся первый успешный ответ.
+    """
+
+    def __init__(
+        self,
+        retries: int = FETCH_RETRIES,
+        backoff_base: float = FETCH_BACKOFF_BASE,
+        backoff_max: float = FETCH_BACKOFF_MAX,
+        jitter: float = FETCH_BACKOFF_JITTER,
+        budget: float = FETCH_DEADLINE,
+        breaker_threshold: int = FETCH_BREAKER_THRESHOLD,
+        breaker_reset: float = FETCH_BREAKER_RESET,
+        hedge: bool = FETCH_HEDGE,
+        hedge_quantile: float = FETCH_HEDGE_QUANTILE,
+        hedge_min_delay: float = FETCH_HEDGE_MIN_DELAY,
+        hedge_min_samples: int = FETCH_HEDGE_MIN_SAMPLES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._retries = retries
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._jitter = jitter
+        self._budget = budget
+        self._breaker_threshold = breaker_threshold
+        self._breaker_reset = breaker_reset
+        self._hedge = hedge
+        self._hedge_quantile = hedge_quantile
+        self._hedge_min_delay = hedge_min_delay
+        self._hedge_min_samples = hedge_min_samples
+        self._clock = clock
+        self._random = random.Random()
+        self._hosts: Dict[str, _HostState] = {}
+
+    def _host(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            breaker = CircuitBreaker(
+                self._breaker_threshold, self._breaker_reset, self._clock
+            )
+            state = self._hosts[host] = _HostState(breaker)
+        return state
+
+    def backoff(self, retry: int) -> float:
+        """Пауза перед повтором номер retry (с нуля)."""
+        delay = min(self._backoff_max, self._backoff_base * 2**retry)
+        spread = delay * self._jitter
+        return max(0.0, delay + self._random.uniform(-spread, spread))
+
+    def hedge_delay(self, host: str) -> float | None:
+        """Через сколько отправлять дублирующий запрос (None — не отправлять)."""
+        if not self._hedge:
+            return None
+        latency = self._host(host).latency
+        if len(latency) < self._hedge_min_samples:
+            return None
+        return max(self._hedge_min_delay, latency.quantile(self._hedge_quantile))
+
+    async def call(self, host: str, attempt: Callable[[], Awaitable[T]]) -> T:
+        """Выполняет attempt() с повторами; исключение — если все попытки неудачны."""
+        state = self._host(host)
+        state.counts["calls"] += 1
+        deadline = self._clock() + self._budget
+        retry = 0
+
+        while True:
+            if not state.breaker.allow():
+                state.counts["short_circuited"] += 1
+                FETCH_POLICY_EVENTS.inc("short_circuit")
+                raise CircuitOpenError(host, state.breaker.retry_in())
+
+            remaining = deadline - self._clock()
+            try:
+                result = await self._attempt(host, state, attempt, remaining)
+            except asyncio.CancelledError:
+                state.breaker.cancel_probe()
+                raise
+            except Exception as e:
+                transient = is_transient(e)
+                if transient:
+                    state.counts["failures"] += 1
+                    if state.breaker.record_failure():
+                        FETCH_POLICY_EVENTS.inc("breaker_open")
+                        failures = state.breaker.failures
+                        print(f"⚡ Хост {host} выключен после {failures} неудач подряд")
+                else:
+                    # Сайт ответил (например, 404) — с хостом всё в порядке
+                    state.breaker.record_success()
+
+                if not transient or retry >= self._retries:
+                    raise
+                delay = self.backoff(retry)
+                if self._clock() + delay >= deadline:
+                    raise
+                retry += 1
+                state.counts["retries"] += 1
+                FETCH_POLICY_EVENTS.inc("retry")
+                await asyncio.sleep(delay)
+                continue
+
+            state.breaker.record_success()
+            return result
+
+    async def _attempt(
+        self,
+        host: str,
+        state: _HostState,
+        attempt: Callable[[], Awaitable[T]],
+        timeout: float,
+    ) -> T:
+        """Одна попытка (возможно, с дублем) не дольше timeout секунд."""
+
+        async def timed() -> T:
+            started = self._clock()
+            state.counts["attempts"] += 1
+            result = await attempt()
+            state.latency.add(self._clock() - started)
+            return result
+
+        if timeout <= 0:
+            raise asyncio.TimeoutError()
+
+        delay = self.hedge_delay(host)
+        if delay is None or delay >= timeout:
+            return await asyncio.wait_for(timed(), timeout)
+
+        started = self._clock()
+        first = asyncio.ensure_future(timed())
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return first.result()
+
+            state.counts["hedges"] += 1
+            FETCH_POLICY_EVENTS.inc("hedge")
+            second = asyncio.ensure_future(timed())
+            pending.add(second)
+
+            error: BaseException | None = None
+            while pending:
+                left = max(0.0, timeout - (self._clock() - started))
+                done, pending = await asyncio.wait(
+                    pending, timeout=left, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError()
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            state.counts["hedge_wins"] += 1
+                            FETCH_POLICY_EVENTS.inc("hedge_win")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # Проигравшая попытка больше не нужна — закрываем её соединение
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Состояние по хостам: предохранитель, счётчики, задержки."""
+        result: Dict[str, Dict[str, Any]] = {}
+        for host, state in self._hosts.items():
+            latency = state.latency
+            entry: Dict[str, Any] = {
+                "breaker": state.breaker.state,
+                "consecutive_failures": state.breaker.failures,
+                **state.counts,
+            }
+            if state.breaker.opened_at is not None:
+                entry["retry_in_s"] = round(state.breaker.retry_in(), 2)
+            if len(latency):
+                entry["p50_ms"] = round(latency.quantile(0.5) * 1000, 2)
+                entry["p95_ms"] = round(latency.quantile(0.95) * 1000, 2)
+            delay = self.hedge_delay(host)
+            if delay is not None:
+                entry["hedge_delay_ms"] = round(delay * 1000, 2)
+            result[host] = entry
+        return result
@@ -0,0 +1,78 @@
+# schedule/pool.py
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from config import PARSE_POOL_MODE, PARSE_POOL_WORKERS
+from metrics import Histogram
+
+from .parser import ParsedDay, parse_day
+
+# Маленькая страница для прогрева воркеров
+_WARMUP_HTML = (
+    '<p style="text-align: center">Расписание занятий на 1 сентября 2025 г.</p>'
+    "<table><tr><td>ГРУППА</td></tr><tr><td><p>1) Предмет 101</p></td></tr></table>"
+)
+
+_executor: Executor | None = None
+
+# Меряется в event loop: воркеры пула — отдельные процессы со своими метриками
+PARSE_SECONDS = Histogram(
+    "schedule_parse_seconds", "Разбор страницы (с ожиданием пула)", ["mode"]
+)
+
+
+def _warmup() -> str:
+    """Импортирует парсер и прогоняет его в воркере."""
+    return parse_day(_WARMUP_HTML, 0).date
+
+
+async def init_parse_pool(
+    mode: str = PARSE_POOL_MODE, workers: int = PARSE_POOL_WORKERS
+) -> None:
+    """
+    Запускает пул разбора HTML и прогревает его, не блокируя event loop.
+
+    mode: "process" — отдельные процессы (не держат GIL event loop),
+    "thread" — потоки, "inline" — разбор прямо в event loop (для тестов).
+    """
+    global _executor
+    shutdown_parse_pool()
+
+    if mode == "process":
+        # spawn: форк процесса с запущенным event loop и потоками небезопасен
+        _executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    elif mode == "thread":
+        _executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="parse"
+        )
+    elif mode != "inline":
+        raise ValueError(f"Неизвестный режим пула разбора: {mode}")
+
+    if _executor is not None:
+        # По задаче на воркер: процессы стартуют и импортируют bs4 заранее,
+        # а не на первом запросе пользователя. Ждём через wrap_future —
+        # spawn-воркеры импортируются секундами, loop всё это время работает
+        futures = [_executor.submit(_warmup) for _ in range(workers)]
+        await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+
+
+def shutdown_parse_pool() -> None:
+    """Останавливает пул разбора."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+
+
+async def parse_day_async(html: str, weekday: int | None = None) -> ParsedDay:
+    """parse_day в пуле: event loop не блокируется на разборе страницы."""
+    if _executor is None:
+        with PARSE_SECONDS.time("inline"):
+            return parse_day(html, weekday)
+
+    loop = asyncio.get_running_loop()
+    with PARSE_SECONDS.time("pool"):
+        return await loop.run_in_executor(_executor, parse_day, html, weekday)
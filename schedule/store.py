@@ -0,0 +1,140 @@
+# schedule/store.py
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+
+from config import LEADER_BACKEND, PAGES_DB_PATH, SHARED_DB_PATH
+
+from .parser import ParsedDay
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    weekday      INTEGER PRIMARY KEY,
+    digest       TEXT    NOT NULL,
+    payload      TEXT    NOT NULL,
+    published_at REAL    NOT NULL,
+    checked_at   REAL    NOT NULL
+);
+"""
+
+
+class StoredPage(NamedTuple):
+    """Страница из store: разобранный день, digest версии и время проверки."""
+
+    day: ParsedDay
+    digest: str
+    checked_at: float
+
+
+class PageStore(ABC):
+    """
+    Разобранные страницы, общие для всех реплик бота.
+
+    Лидер публикует сюда каждую новую версию страницы и отмечает
+    проверки без изменений; остальные реплики отвечают на кнопки
+    из этих данных, не обращаясь к сайту.
+    """
+
+    @abstractmethod
+    def save(self, weekday: int, day: ParsedDay, digest: str) -> None:
+        ...
+
+    @abstractmethod
+    def confirm(self, weekday: int, digest: str) -> None:
+        """Версия digest проверена и не изменилась (другая — не трогается)."""
+
+    @abstractmethod
+    def load(self, weekday: int, max_age: float) -> StoredPage | None:
+        """Страница, подтверждённая не раньше max_age секунд назад."""
+
+    @abstractmethod
+    def load_last(self, weekday: int) -> StoredPage | None:
+        """Последняя известная страница любой давности."""
+
+    def close(self) -> None:
+        pass
+
+
+class SqlitePageStore(PageStore):
+    """Страницы в SQLite-файле: общем для реплик на одной машине/томе или своём."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                self.path, timeout=5, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conn:
+                self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def save(self, weekday: int, day: ParsedDay, digest: str) -> None:
+        payload = json.dumps(day.to_dict(), ensure_ascii=False, separators=(",", ":"))
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO pages (weekday, digest, payload, published_at, checked_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(weekday) DO UPDATE SET digest = excluded.digest, "
+                "payload = excluded.payload, published_at = excluded.published_at, "
+                "checked_at = excluded.checked_at",
+                (weekday, digest, payload, now, now),
+            )
+
+    def confirm(self, weekday: int, digest: str) -> None:
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE pages SET checked_at = ? WHERE weekday = ? AND digest = ?",
+                (time.time(), weekday, digest),
+            )
+
+    def load(self, weekday: int, max_age: float) -> StoredPage | None:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT payload, digest, checked_at FROM pages "
+                "WHERE weekday = ? AND checked_at >= ?",
+                (weekday, time.time() - max_age),
+            ).fetchone()
+        return self._page(row)
+
+    def load_last(self, weekday: int) -> StoredPage | None:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT payload, digest, checked_at FROM pages WHERE weekday = ?",
+                (weekday,),
+            ).fetchone()
+        return self._page(row)
+
+    @staticmethod
+    def _page(row) -> StoredPage | None:
+        if row is None:
+            return None
+        return StoredPage(ParsedDay.from_dict(json.loads(row[0])), row[1], row[2])
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def create_page_store(backend: str = LEADER_BACKEND) -> PageStore:
+    """
+    Хранилище страниц: общее для реплик или локальное для одной —
+    в обоих случаях в нём последние разобранные версии дней.
+    """
+    if backend == "local":
+        return SqlitePageStore(PAGES_DB_PATH)
+    if backend == "sqlite":
+        return SqlitePageStore(SHARED_DB_PATH)
+    raise ValueError(f"Неизвестный бэкенд лидерства: {backend}")
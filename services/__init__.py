@@ -1,4 +1,14 @@
 # services/__init__.py
+from .leader import LeaderLease, LocalLease, SqliteLease, create_lease, run_as_leader
+from .poller import PollScheduler
 from .schedule_checker import check_schedule_updates
 
-__all__ = ["check_schedule_updates"]
+__all__ = [
+    "LeaderLease",
+    "LocalLease",
+    "SqliteLease",
+    "create_lease",
+    "run_as_leader",
+    "PollScheduler",
+    "check_schedule_updates",
+]
@@ -0,0 +1,199 @@
+# services/broadcaster.py
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+
+from config import (
+    BROADCAST_CHAT_INTERVAL,
+    BROADCAST_MAX_RETRIES,
+    BROADCAST_RATE,
+    BROADCAST_WORKERS,
+)
+from database import set_auto_send
+from metrics import Counter, Gauge, Histogram
+
+# Темп отправки — rate(broadcast_messages_total{result="sent"}[1m])
+BROADCAST_MESSAGES = Counter(
+    "broadcast_messages_total", "Сообщения рассылки по результату", ["result"]
+)
+BROADCAST_QUEUE = Gauge("broadcast_queue_depth", "Сообщений рассылки в очереди")
+BROADCAST_SEND_SECONDS = Histogram(
+    "broadcast_send_seconds", "Вызов send_message при рассылке"
+)
+
+
+class TokenBucket:
+    """Глобальный лимит сообщений в секунду с возможностью паузы (429)."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self._rate = rate
+        self._capacity = capacity if capacity is not None else rate
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Останавливает выдачу токенов (Telegram прислал RetryAfter)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+    async def acquire(self) -> None:
+        """Ждёт, пока можно отправить одно сообщение."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(
+                    self._capacity, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+@dataclass
+class BroadcastStats:
+    sent: int = 0
+    failed: int = 0
+    blocked: int = 0
+    # Сообщений ещё в очереди (учтены в BROADCAST_QUEUE)
+    pending: int = 0
+
+
+class Broadcaster:
+    """
+    Рассылка уведомлений с учётом лимитов Telegram.
+
+    Несколько воркеров отправляют параллельно, общий темп ограничен
+    token bucket (~30 сообщений/с), сообщения одному чату идут по
+    порядку и не чаще раза в chat_interval секунд. RetryAfter ставит
+    всю рассылку на паузу, а заблокировавшим бота авто-рассылка
+    отключается, чтобы не слать им повторно.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        rate: float = BROADCAST_RATE,
+        chat_interval: float = BROADCAST_CHAT_INTERVAL,
+        workers: int = BROADCAST_WORKERS,
+        max_retries: int = BROADCAST_MAX_RETRIES,
+    ) -> None:
+        self.bot = bot
+        self._bucket = TokenBucket(rate)
+        self._chat_interval = chat_interval
+        self._workers = workers
+        self._max_retries = max_retries
+        self._blocked: Set[int] = set()
+
+    async def broadcast(self, messages: Iterable[Tuple[int, str]]) -> BroadcastStats:
+        """Отправляет пары (chat_id, текст); для одного чата — в исходном порядке."""
+        by_chat: Dict[int, List[str]] = {}
+        for chat_id, text in messages:
+            if chat_id not in self._blocked:
+                by_chat.setdefault(chat_id, []).append(text)
+
+        # Очередь по времени готовности: следующее сообщение чата
+        # возвращается в неё с задержкой и не держит воркер
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        seq = itertools.count()
+        now = time.monotonic()
+        for chat_id, texts in by_chat.items():
+            queue.put_nowait((now, next(seq), chat_id, texts))
+        stats = BroadcastStats(pending=sum(len(texts) for texts in by_chat.values()))
+        BROADCAST_QUEUE.inc(amount=stats.pending)
+
+        workers = [
+            asyncio.create_task(self._worker(queue, seq, stats))
+            for _ in range(min(self._workers, len(by_chat)))
+        ]
+        try:
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            # Рассылку могли отменить на середине — неотправленное
+            # больше не в очереди
+            BROADCAST_QUEUE.dec(amount=stats.pending)
+            stats.pending = 0
+
+        return stats
+
+    async def _worker(
+        self, queue: asyncio.PriorityQueue, seq: Iterator[int], stats: BroadcastStats
+    ) -> None:
+        while True:
+            ready_at, _, chat_id, texts = await queue.get()
+            try:
+                delay = ready_at - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                keep = await self._send(chat_id, texts[0], stats)
+                # Из очереди ушло это сообщение, а при блокировке — и остальные чата
+                done = 1 if keep else len(texts)
+                stats.pending -= done
+                BROADCAST_QUEUE.dec(amount=done)
+                if keep and len(texts) > 1:
+                    # Не чаще одного сообщения в chat_interval в один чат
+                    queue.put_nowait(
+                        (
+                            time.monotonic() + self._chat_interval,
+                            next(seq),
+                            chat_id,
+                            texts[1:],
+                        )
+                    )
+            finally:
+                queue.task_done()
+
+    async def _send(self, chat_id: int, text: str, stats: BroadcastStats) -> bool:
+        """Отправляет одно сообщение. False — в этот чат больше не слать."""
+        for _ in range(self._max_retries + 1):
+            await self._bucket.acquire()
+            try:
+                with BROADCAST_SEND_SECONDS.time():
+                    await self.bot.send_message(
+                        chat_id=chat_id, text=text, parse_mode="HTML"
+                    )
+                stats.sent += 1
+                BROADCAST_MESSAGES.inc("sent")
+                return True
+            except TelegramRetryAfter as e:
+                BROADCAST_MESSAGES.inc("retry_after")
+                print(f"⏳ Telegram просит подождать {e.retry_after} с")
+                self._bucket.pause(e.retry_after)
+            except TelegramForbiddenError:
+                # Пользователь заблокировал бота — больше не пытаемся
+                self._blocked.add(chat_id)
+                stats.blocked += 1
+                BROADCAST_MESSAGES.inc("blocked")
+                print(f"🚫 Пользователь {chat_id} заблокировал бота")
+                try:
+                    await set_auto_send(chat_id, False)
+                except Exception as e:
+                    print(f"❌ Не удалось отключить авто-рассылку {chat_id}: {e}")
+                return False
+            except Exception as e:
+                stats.failed += 1
+                BROADCAST_MESSAGES.inc("failed")
+                print(f"❌ Не удалось отправить сообщение {chat_id}: {e}")
+                return True
+
+        stats.failed += 1
+        BROADCAST_MESSAGES.inc("failed")
+        print(f"❌ Не удалось отправить сообщение {chat_id}: превышено число повторов")
+        return True
@@ -0,0 +1,198 @@
+# services/leader.py
+import asyncio
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable
+
+from config import (
+    LEADER_BACKEND,
+    LEADER_LEASE_TTL,
+    LEADER_RENEW_INTERVAL,
+    SHARED_DB_PATH,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    name       TEXT PRIMARY KEY,
+    holder     TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def make_holder_id() -> str:
+    """Идентификатор реплики: хост, pid и случайный суффикс."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaderLease(ABC):
+    """
+    Аренда лидерства с истечением.
+
+    acquire() захватывает свободную (или истёкшую) аренду либо продлевает
+    свою; release() отдаёт её сразу. Сетевой бэкенд (Redis, etcd,
+    Postgres) реализует тот же интерфейс.
+    """
+
+    holder: str = ""
+
+    @abstractmethod
+    async def acquire(self) -> bool:
+        """True — эта реплика лидер до истечения аренды."""
+
+    @abstractmethod
+    async def release(self) -> None:
+        ...
+
+
+class LocalLease(LeaderLease):
+    """Одна реплика: всегда лидер."""
+
+    def __init__(self) -> None:
+        self.holder = make_holder_id()
+
+    async def acquire(self) -> bool:
+        return True
+
+    async def release(self) -> None:
+        pass
+
+
+class SqliteLease(LeaderLease):
+    """Аренда в SQLite-файле, общем для реплик на одной машине/томе."""
+
+    def __init__(
+        self,
+        path: str,
+        name: str = "schedule_checker",
+        ttl: float = LEADER_LEASE_TTL,
+        holder: str | None = None,
+    ) -> None:
+        self.path = path
+        self.name = name
+        self.ttl = ttl
+        self.holder = holder or make_holder_id()
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # isolation_level=None: транзакции открываются явно (BEGIN IMMEDIATE)
+            self._conn = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            conn = self.conn
+            now = time.time()
+            # Блокировка на запись сразу: две реплики не захватят аренду вместе
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT holder, expires_at FROM leases WHERE name = ?",
+                    (self.name,),
+                ).fetchone()
+                if row is not None and row[0] != self.holder and row[1] > now:
+                    conn.execute("COMMIT")
+                    return False
+
+                conn.execute(
+                    "INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, "
+                    "expires_at = excluded.expires_at",
+                    (self.name, self.holder, now + self.ttl),
+                )
+                conn.execute("COMMIT")
+                return True
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _release(self) -> None:
+        with self._lock:
+            self.conn.execute(
+                "DELETE FROM leases WHERE name = ? AND holder = ?",
+                (self.name, self.holder),
+            )
+            self._conn.close()
+            self._conn = None
+
+    async def acquire(self) -> bool:
+        return await asyncio.to_thread(self._acquire)
+
+    async def release(self) -> None:
+        await asyncio.to_thread(self._release)
+
+
+def create_lease(backend: str = LEADER_BACKEND) -> LeaderLease:
+    """Аренда по имени бэкенда из конфига."""
+    if backend == "local":
+        return LocalLease()
+    if backend == "sqlite":
+        return SqliteLease(SHARED_DB_PATH)
+    raise ValueError(f"Неизвестный бэкенд лидерства: {backend}")
+
+
+async def _stop(task: asyncio.Task) -> None:
+    """Отменяет задачу лидера; её падение логируется, а не всплывает."""
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        print(f"❌ Задача лидера упала: {e}")
+
+
+async def run_as_leader(
+    lease: LeaderLease,
+    job: Callable[[], Awaitable[None]],
+    renew_interval: float = LEADER_RENEW_INTERVAL,
+) -> None:
+    """
+    Запускает job(), пока эта реплика — лидер.
+
+    Аренда продлевается каждые renew_interval секунд (должно быть
+    заметно меньше ttl). Потеряли аренду или не смогли её продлить —
+    job отменяется; другая реплика подхватит её после истечения ttl.
+    """
+    task: asyncio.Task | None = None
+    try:
+        while True:
+            try:
+                leader = await lease.acquire()
+            except Exception as e:
+                # Не можем подтвердить аренду — считаем, что её уже нет
+                print(f"❌ Ошибка продления аренды лидера: {e}")
+                leader = False
+
+            if leader and task is None:
+                print(f"👑 Реплика {lease.holder} стала лидером")
+                task = asyncio.create_task(job())
+            elif leader and task.done():
+                if not task.cancelled() and task.exception() is not None:
+                    print(f"❌ Задача лидера упала: {task.exception()}, перезапуск")
+                task = asyncio.create_task(job())
+            elif not leader and task is not None:
+                print(f"⏸ Реплика {lease.holder} больше не лидер")
+                await _stop(task)
+                task = None
+
+            await asyncio.sleep(renew_interval)
+    finally:
+        if task is not None:
+            await _stop(task)
+        try:
+            await lease.release()
+        except Exception as e:
+            print(f"❌ Не удалось освободить аренду лидера: {e}")
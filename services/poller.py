@@ -0,0 +1,184 @@
+# services/poller.py
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from datetime import time as day_time
+from typing import Awaitable, Callable, Dict, List, Sequence, Tuple
+
+from config import (
+    CHECK_INTERVAL,
+    POLL_BACKOFF_FACTOR,
+    POLL_JITTER,
+    POLL_LOOKAHEAD_DAYS,
+    POLL_MAX_INTERVAL,
+    POLL_WINDOW_INTERVAL,
+    POLL_WINDOW_MAX_INTERVAL,
+    POLL_WINDOWS,
+    SCHEDULE_URLS,
+)
+
+# Проверка дней: weekday -> True (изменился), False (нет), None (ошибка)
+CheckDays = Callable[[List[int]], Awaitable[Dict[int, bool | None]]]
+
+# Даже без готовых дней планировщик просыпается не реже, чтобы
+# заметить смену суток (другие дни становятся актуальными)
+_MAX_SLEEP = 60
+
+# Дальше этого откат не считается (интервал всё равно упирается в потолок)
+_MAX_STREAK = 32
+
+
+def parse_windows(windows: Sequence[Tuple[str, str]]) -> List[Tuple[day_time, day_time]]:
+    """[("12:00", "18:00")] -> [(time(12, 0), time(18, 0))]."""
+    return [
+        (day_time.fromisoformat(start), day_time.fromisoformat(end))
+        for start, end in windows
+    ]
+
+
+def days_until(weekday: int, today: int) -> int:
+    """Через сколько дней наступит weekday (0 — сегодня)."""
+    return (weekday - today) % 7
+
+
+@dataclass
+class _DayState:
+    next_due: float = 0.0  # time.monotonic() следующей проверки
+    unchanged: int = 0  # проверок подряд без изменений
+
+
+class PollScheduler:
+    """
+    Планировщик проверок расписания: у каждого дня свой интервал.
+
+    В окнах публикации день проверяется каждые window_interval секунд,
+    вне окон — раз в interval. Пока страница не меняется, интервал
+    растёт в factor раз до потолка; изменение сбрасывает его. Перед
+    началом окна все дни проверяются заново, а дни, до которых больше
+    lookahead суток (прошедшие на этой неделе), не опрашиваются.
+    """
+
+    def __init__(
+        self,
+        check: CheckDays,
+        windows: Sequence[Tuple[str, str]] = POLL_WINDOWS,
+        window_interval: float = POLL_WINDOW_INTERVAL,
+        window_max_interval: float = POLL_WINDOW_MAX_INTERVAL,
+        interval: float = CHECK_INTERVAL,
+        max_interval: float = POLL_MAX_INTERVAL,
+        factor: float = POLL_BACKOFF_FACTOR,
+        jitter: float = POLL_JITTER,
+        lookahead: int = POLL_LOOKAHEAD_DAYS,
+        clock: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        self._check = check
+        self._windows = parse_windows(windows)
+        self._window_interval = window_interval
+        self._window_max_interval = window_max_interval
+        self._interval = interval
+        self._max_interval = max_interval
+        self._factor = factor
+        self._jitter = jitter
+        self._lookahead = lookahead
+        self._clock = clock
+        self._random = random.Random()
+        self._days: Dict[int, _DayState] = {
+            weekday: _DayState() for weekday in SCHEDULE_URLS
+        }
+
+    def in_window(self, now: datetime) -> bool:
+        moment = now.time()
+        return any(start <= moment < end for start, end in self._windows)
+
+    def seconds_until_window(self, now: datetime) -> float | None:
+        """Сколько секунд до начала ближайшего окна (None — окон нет)."""
+        starts = []
+        for start, _ in self._windows:
+            at = datetime.combine(now.date(), start, now.tzinfo)
+            if at <= now:
+                at += timedelta(days=1)
+            starts.append((at - now).total_seconds())
+        return min(starts, default=None)
+
+    def active_days(self, now: datetime) -> List[int]:
+        """Дни, которые стоит опрашивать: сегодня и ближайшие lookahead суток."""
+        today = now.weekday()
+        return [
+            weekday
+            for weekday in self._days
+            if days_until(weekday, today) <= self._lookahead
+        ]
+
+    def delay(self, weekday: int, now: datetime) -> float:
+        """Через сколько секунд снова проверить день."""
+        streak = min(self._days[weekday].unchanged, _MAX_STREAK)
+
+        if self.in_window(now):
+            base, cap = self._window_interval, self._window_max_interval
+        else:
+            base, cap = self._interval, self._max_interval
+
+        delay = min(base * self._factor**streak, cap)
+        # Разброс, чтобы проверки не шли строго в такт (и не совпадали у реплик)
+        spread = delay * self._jitter
+        delay += self._random.uniform(-spread, spread)
+
+        if not self.in_window(now):
+            # Не проспать начало окна публикации
+            until_window = self.seconds_until_window(now)
+            if until_window is not None:
+                delay = min(delay, until_window)
+
+        return max(1.0, delay)
+
+    def record(self, weekday: int, changed: bool | None, now: datetime) -> None:
+        """Учитывает результат проверки и планирует следующую."""
+        state = self._days[weekday]
+        if changed:
+            state.unchanged = 0
+        elif changed is not None:
+            state.unchanged += 1
+        # Ошибка загрузки: интервал не растёт — повторим в том же темпе
+        state.next_due = time.monotonic() + self.delay(weekday, now)
+
+    def due(self, now: datetime) -> List[int]:
+        """Дни, которым пора на проверку."""
+        moment = time.monotonic()
+        return [
+            weekday
+            for weekday in self.active_days(now)
+            if self._days[weekday].next_due <= moment
+        ]
+
+    def _sleep_time(self, now: datetime) -> float:
+        moment = time.monotonic()
+        waits = [
+            self._days[weekday].next_due - moment for weekday in self.active_days(now)
+        ]
+        return max(0.0, min([_MAX_SLEEP, *waits]))
+
+    async def tick(self) -> List[int]:
+        """Проверяет дни, которым пора; возвращает их список."""
+        now = self._clock()
+        weekdays = self.due(now)
+        if not weekdays:
+            return []
+
+        try:
+            results = await self._check(weekdays)
+        except Exception as e:
+            print(f"❌ Ошибка в чекере расписания: {e}")
+            results = {}
+
+        now = self._clock()
+        for weekday in weekdays:
+            self.record(weekday, results.get(weekday), now)
+        return weekdays
+
+    async def run(self) -> None:
+        """Бесконечный цикл проверок."""
+        while True:
+            await self.tick()
+            await asyncio.sleep(self._sleep_time(self._clock()))
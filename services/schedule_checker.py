@@ -1,120 +1,162 @@
 # services/schedule_checker.py
-import asyncio
-from datetime import datetime
-from typing import Dict, List, Set
+from typing import Dict, List, Sequence, Tuple
 
 from aiogram import Bot
 
-from config import CHECK_INTERVAL, DAY_NAMES, SCHEDULE_URLS
+from config import DAY_NAMES, SCHEDULE_URLS
 from database import (
-    get_cached_date,
-    get_cached_schedule,
-    get_users_with_auto_send,
-    set_cached_date,
-    set_cached_schedule,
+    cache_batch,
+    get_cached_day,
+    get_subscribers_by_group,
+    lessons_digest,
+    set_cached_day,
 )
+from metrics import Counter, Histogram, timed
 from schedule import (
-    fetch_schedule,
-    format_schedule,
-    parse_schedule,
-    parse_schedule_date,
+    DayCache,
+    FetchResult,
+    Lesson,
+    parse_day_async,
+    render_lessons,
 )
 
+from .broadcaster import Broadcaster
+from .poller import PollScheduler
 
-async def check_schedule_updates(bot: Bot) -> None:
+CHECK_SECONDS = Histogram(
+    "schedule_check_cycle_seconds",
+    "Цикл проверки расписания (загрузка, сравнение, рассылка)",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+CHANGED_GROUPS = Counter(
+    "schedule_changed_groups_total", "Изменившиеся расписания групп по дням"
+)
+
+
+async def check_schedule_updates(bot: Bot, day_cache: DayCache) -> None:
     """
     Фоновая задача для проверки обновлений расписания.
-    Запускается каждые CHECK_INTERVAL секунд.
+    Когда проверять какой день, решает PollScheduler.
     """
     print("🔄 Запущен чекер расписания")
+    broadcaster = Broadcaster(bot)
 
-    while True:
-        try:
-            await _check_all_days(bot)
-        except Exception as e:
-            print(f"❌ Ошибка в чекере расписания: {e}")
-
-        await asyncio.sleep(CHECK_INTERVAL)
-
-
-async def _check_all_days(bot: Bot) -> None:
-    """Проверяет расписание на все дни недели."""
-    # Получаем пользователей с авто-рассылкой
-    users = await get_users_with_auto_send()
-
-    if not users:
-        return
-
-    # Группируем пользователей по группам
-    groups_to_check: Dict[str, List[int]] = {}
-    for user in users:
-        group_name = user["group_name"]
-        user_id = user["user_id"]
-
-        if group_name not in groups_to_check:
-            groups_to_check[group_name] = []
-        groups_to_check[group_name].append(user_id)
-
-    # Проверяем каждый день недели
-    for weekday in range(5):
-        url = SCHEDULE_URLS.get(weekday)
-        if not url:
-            continue
-
-        html = await fetch_schedule(url)
-        if not html:
-            continue
-
-        # Проверяем дату расписания
-        new_date = parse_schedule_date(html)
-        cached_date = await get_cached_date(weekday)
-
-        date_changed = new_date and new_date != cached_date
-
-        if date_changed:
-            await set_cached_date(weekday, new_date)
-            print(f"📅 Обнаружена новая дата для {DAY_NAMES[weekday]}: {new_date}")
-
-        # Проверяем расписание для каждой группы
-        for group_name, user_ids in groups_to_check.items():
-            await _check_group_schedule(
-                bot=bot,
-                html=html,
-                weekday=weekday,
-                group_name=group_name,
-                user_ids=user_ids,
-                date_changed=date_changed,
-                schedule_date=new_date,
-            )
+    async def check(weekdays: List[int]) -> Dict[int, bool | None]:
+        return await _check_all_days(broadcaster, day_cache, weekdays)
 
+    await PollScheduler(check).run()
 
-async def _check_group_schedule(
-    bot: Bot,
-    html: str,
-    weekday: int,
-    group_name: str,
-    user_ids: List[int],
-    date_changed: bool,
-    schedule_date: str,
-) -> None:
-    """Проверяет расписание для конкретной группы и рассылает при изменениях."""
-    new_lessons = parse_schedule(html, group_name)
-    cached_lessons = await get_cached_schedule(weekday, group_name)
 
-    # Проверяем, изменилось ли расписание
-    schedule_changed = new_lessons != cached_lessons
+@timed(CHECK_SECONDS)
+async def _check_all_days(
+    broadcaster: Broadcaster,
+    day_cache: DayCache,
+    weekdays: Sequence[int] = range(5),
+) -> Dict[int, bool | None]:
+    """
+    Проверяет расписание на дни weekdays (по умолчанию — все).
+    Возвращает weekday -> изменилась ли страница (None — не загрузилась).
+    """
+    # Только группы, у которых есть подписчики (индекс хранилища)
+    groups_to_check = await get_subscribers_by_group()
+
+    if not groups_to_check:
+        return {}
+
+    # Загружаем дни параллельно условными запросами
+    weekdays = [weekday for weekday in weekdays if SCHEDULE_URLS.get(weekday)]
+    fetcher = day_cache.fetcher
+    results = await fetcher.fetch_many_if_changed(
+        [SCHEDULE_URLS[weekday] for weekday in weekdays]
+    )
+
+    processed: List[FetchResult] = []
+    notifications: List[Tuple[int, str]] = []
+    changes: Dict[int, bool | None] = {}
+
+    # Все изменения кэша за цикл записываются одной атомарной операцией
+    async with cache_batch():
+        # Проверяем каждый день недели
+        for weekday, result in zip(weekdays, results):
+            if result is None:
+                changes[weekday] = None
+                continue
+
+            changes[weekday] = result.changed
+
+            # 304 или тот же digest — страница не менялась
+            if not result.changed:
+                await day_cache.confirm(weekday, result.digest)
+                continue
+
+            # Разбираем страницу один раз для всех групп
+            day = await parse_day_async(result.text, weekday)
+            # Свежая версия сразу доступна кнопкам меню (и другим репликам)
+            await day_cache.publish(weekday, day, result.digest)
+
+            page_digest = day.digest()
+            cached = await get_cached_day(weekday)
+            groups = cached["groups"]
+
+            # Проверяем дату расписания
+            new_date = day.date
+            if new_date and new_date != cached["date"]:
+                print(f"📅 Обнаружена новая дата для {DAY_NAMES[weekday]}: {new_date}")
+
+            # Та же страница и все группы уже сверены — пропускаем день целиком
+            seen_all = groups.keys() >= groups_to_check.keys()
+            if page_digest == cached["page"] and seen_all:
+                processed.append(result)
+                continue
+
+            # Проверяем расписание для каждой группы
+            for group_name, user_ids in groups_to_check.items():
+                new_lessons = day.lessons_for(group_name)
+                digest = lessons_digest([lesson.text for lesson in new_lessons])
+                if groups.get(group_name) == digest:
+                    continue
+
+                groups[group_name] = digest
+                CHANGED_GROUPS.inc()
+                message = _format_notification(
+                    new_lessons=new_lessons,
+                    weekday=weekday,
+                    group_name=group_name,
+                    schedule_date=new_date,
+                )
+                notifications.extend((user_id, message) for user_id in user_ids)
+
+            await set_cached_day(
+                weekday,
+                {
+                    "date": new_date or cached["date"],
+                    "page": page_digest,
+                    "groups": groups,
+                },
+            )
+            processed.append(result)
 
-    if not schedule_changed and not date_changed:
-        return
+    # Кэш записан — версии обработаны, следующий цикл их пропустит
+    for result in processed:
+        fetcher.commit(result)
 
-    # Сохраняем новое расписание в кэш
-    await set_cached_schedule(weekday, group_name, new_lessons)
+    if notifications:
+        stats = await broadcaster.broadcast(notifications)
+        print(
+            f"📨 Рассылка: отправлено {stats.sent}, ошибок {stats.failed}, "
+            f"заблокировали бота {stats.blocked}"
+        )
 
-    # Если расписание не изменилось, но изменилась только дата — не рассылаем
-    if not schedule_changed:
-        return
+    return changes
 
-    # Формируем сообщение
+
+def _format_notification(
+    new_lessons: Tuple[Lesson, ...],
+    weekday: int,
+    group_name: str,
+    schedule_date: str,
+) -> str:
+    """Текст уведомления об изменившемся расписании группы."""
     day_name = DAY_NAMES.get(weekday, "")
 
     if schedule_date:
@@ -123,22 +165,8 @@ async def _check_group_schedule(
         header = f"🆕 <b>Новое расписание на {day_name}!</b>"
 
     if not new_lessons:
-        message = f"{header}\n\n❌ Группа {group_name} не найдена в расписании"
-    else:
-        formatted = format_schedule(new_lessons, weekday)
-        message = f"{header}\n\n{formatted}"
-
-    # Рассылаем пользователям
-    for user_id in user_ids:
-        try:
-            await bot.send_message(
-                chat_id=user_id,
-                text=message,
-                parse_mode="HTML",
-            )
-            print(f"📨 Отправлено уведомление пользователю {user_id} ({group_name})")
-        except Exception as e:
-            print(f"❌ Не удалось отправить сообщение {user_id}: {e}")
+        return f"{header}\n\n❌ Группа {group_name} не найдена в расписании"
 
-        # Небольшая задержка, чтобы не спамить API
-        await asyncio.sleep(0.1)
+    # Рендер общий для всех групп с тем же расписанием и для кнопок меню
+    formatted = render_lessons(weekday, new_lessons)
+    return f"{header}\n\n{formatted}"
@@ -0,0 +1,109 @@
+# tests/test_broadcaster.py
+import asyncio
+import time
+
+import pytest
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+import metrics
+from services import broadcaster
+from services.broadcaster import BROADCAST_QUEUE, Broadcaster
+
+_METHOD = SendMessage(chat_id=0, text="")
+
+
+class FakeBot:
+    """send_message по сценарию: chat_id -> список исключений по попыткам."""
+
+    def __init__(self, failures=None, delay: float = 0.0) -> None:
+        self.failures = {chat: list(errs) for chat, errs in (failures or {}).items()}
+        self.delay = delay
+        self.attempts = []
+        self.sent = []
+
+    async def send_message(self, chat_id: int, text: str, parse_mode: str) -> None:
+        self.attempts.append((chat_id, text, time.monotonic()))
+        errors = self.failures.get(chat_id)
+        if errors:
+            raise errors.pop(0)
+        await asyncio.sleep(self.delay)
+        self.sent.append((chat_id, text, time.monotonic()))
+
+
+@pytest.fixture(autouse=True)
+def disabled_auto_send(monkeypatch):
+    calls = []
+
+    async def set_auto_send(user_id: int, enabled: bool) -> None:
+        calls.append((user_id, enabled))
+
+    monkeypatch.setattr(broadcaster, "set_auto_send", set_auto_send)
+    return calls
+
+
+def _run(bot, messages, **kwargs):
+    kwargs.setdefault("rate", 1000)
+    kwargs.setdefault("chat_interval", 0)
+    sender = Broadcaster(bot, **kwargs)
+    return sender, asyncio.run(sender.broadcast(messages))
+
+
+def test_chat_messages_keep_order_and_pacing():
+    bot = FakeBot()
+    messages = [(1, "a"), (2, "x"), (1, "b"), (1, "c")]
+    _, stats = _run(bot, messages, chat_interval=0.05)
+
+    assert stats.sent == 4
+    first_chat = [(text, at) for chat, text, at in bot.sent if chat == 1]
+    assert [text for text, _ in first_chat] == ["a", "b", "c"]
+    gaps = [b[1] - a[1] for a, b in zip(first_chat, first_chat[1:])]
+    assert all(gap >= 0.045 for gap in gaps)
+
+
+def test_retry_after_pauses_and_retries():
+    bot = FakeBot({1: [TelegramRetryAfter(_METHOD, "flood", retry_after=0.1)]})
+    _, stats = _run(bot, [(1, "a")])
+
+    assert stats.sent == 1 and stats.failed == 0
+    (_, _, failed_at), (_, _, retried_at) = bot.attempts
+    assert retried_at - failed_at >= 0.09
+
+
+def test_blocked_chat_is_not_retried(disabled_auto_send):
+    bot = FakeBot({1: [TelegramForbiddenError(_METHOD, "blocked")]})
+    sender, stats = _run(bot, [(1, "a"), (1, "b"), (2, "x")])
+
+    assert stats.blocked == 1 and stats.sent == 1
+    assert [chat for chat, _, _ in bot.attempts].count(1) == 1
+    assert disabled_auto_send == [(1, False)]
+
+    # Следующая рассылка этот чат пропускает
+    asyncio.run(sender.broadcast([(1, "c")]))
+    assert [chat for chat, _, _ in bot.attempts].count(1) == 1
+
+
+def test_gives_up_after_max_retries():
+    retry = [TelegramRetryAfter(_METHOD, "flood", retry_after=0.01) for _ in range(5)]
+    bot = FakeBot({1: retry})
+    _, stats = _run(bot, [(1, "a")], max_retries=2)
+
+    assert len(bot.attempts) == 3
+    assert stats.failed == 1 and stats.sent == 0
+
+
+def test_cancelled_broadcast_leaves_queue_gauge_at_zero():
+    async def scenario():
+        sender = Broadcaster(FakeBot(delay=0.05), rate=1000, chat_interval=0.05)
+        task = asyncio.create_task(sender.broadcast([(1, str(i)) for i in range(10)]))
+        await asyncio.sleep(0.08)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    metrics.enable()
+    try:
+        before = BROADCAST_QUEUE._values.get((), 0)
+        asyncio.run(scenario())
+        assert BROADCAST_QUEUE._values.get((), 0) == before
+    finally:
+        metrics.enable(False)
@@ -0,0 +1,129 @@
+# tests/test_day_cache.py
+import asyncio
+import time
+
+from schedule.cache import DayCache
+from schedule.parser import ParsedDay, parse_day
+from schedule.store import PageStore, StoredPage
+
+_HTML = (
+    '<p style="text-align: center">Расписание занятий на {date}</p>'
+    "<table><tr><td>ИС-21</td></tr><tr><td><p>1) {subject} 101</p></td></tr></table>"
+)
+OLD_HTML = _HTML.format(date="1 сентября 2025 г.", subject="Старый")
+NEW_DAY = parse_day(_HTML.format(date="1 сентября 2025 г.", subject="Новый"), 0)
+
+
+class GatedFetcher:
+    """Отдаёт OLD_HTML, но только когда тест откроет ворота."""
+
+    def __init__(self) -> None:
+        self.started = asyncio.Event()
+        self.gate = asyncio.Event()
+
+    async def fetch(self, url: str) -> str:
+        self.started.set()
+        await self.gate.wait()
+        return OLD_HTML
+
+
+def _subject(day: ParsedDay) -> str:
+    return " ".join(day.texts_for("ИС-21"))
+
+
+def test_load_started_before_publish_does_not_overwrite_it():
+    async def scenario():
+        fetcher = GatedFetcher()
+        cache = DayCache(fetcher)
+        load = asyncio.ensure_future(cache.get(0))
+        await fetcher.started.wait()
+
+        # Чекер публикует новую версию, пока загрузка обработчика в пути
+        await cache.publish(0, NEW_DAY, "new")
+        fetcher.gate.set()
+        loaded = await load
+
+        assert "Новый" in _subject(loaded)
+        assert "Новый" in _subject(cache._fresh(0))
+
+    asyncio.run(scenario())
+
+
+def test_confirm_refreshes_only_the_confirmed_version():
+    async def scenario():
+        cache = DayCache(GatedFetcher(), ttl=60)
+        await cache.publish(0, NEW_DAY, "new")
+        entry = cache._entries[0]
+        entry.stored_at = time.monotonic() - 3600
+
+        # 304 на чужую версию запись не продлевает
+        await cache.confirm(0, "old")
+        assert cache._fresh(0) is None
+
+        await cache.confirm(0, "new")
+        assert cache._fresh(0) is NEW_DAY
+
+    asyncio.run(scenario())
+
+
+class MemoryStore(PageStore):
+    """Store в памяти с одной страницей заданного возраста."""
+
+    def __init__(self, day: ParsedDay, age: float) -> None:
+        self.page = StoredPage(day, "stored", time.time() - age)
+
+    def save(self, weekday: int, day: ParsedDay, digest: str) -> None:
+        self.page = StoredPage(day, digest, time.time())
+
+    def confirm(self, weekday: int, digest: str) -> None:
+        pass
+
+    def load(self, weekday: int, max_age: float) -> StoredPage | None:
+        if time.time() - self.page.checked_at > max_age:
+            return None
+        return self.page
+
+    def load_last(self, weekday: int) -> StoredPage | None:
+        return self.page
+
+
+class SiteFetcher:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def fetch(self, url: str) -> str:
+        self.calls += 1
+        return OLD_HTML
+
+
+def test_follower_serves_store_page_with_its_real_age():
+    async def scenario():
+        fetcher = SiteFetcher()
+        store = MemoryStore(NEW_DAY, age=1000)
+        cache = DayCache(fetcher, ttl=120, store=store, store_first=True)
+
+        snapshot = await cache.snapshot(0)
+        assert snapshot.day is NEW_DAY
+        assert snapshot.stale and snapshot.age >= 1000
+        assert await snapshot.refresh is NEW_DAY
+
+        # Обновление снова берёт страницу у лидера и не делает её свежей
+        assert cache._fresh(0) is None
+        assert cache._age(0) >= 1000
+        assert fetcher.calls == 0
+
+    asyncio.run(scenario())
+
+
+def test_single_replica_goes_to_the_site_on_miss():
+    async def scenario():
+        fetcher = SiteFetcher()
+        store = MemoryStore(NEW_DAY, age=10)
+        cache = DayCache(fetcher, store=store)
+
+        day = await cache.get(0)
+        assert "Старый" in _subject(day)
+        assert fetcher.calls == 1
+        assert cache._age(0) < 5
+
+    asyncio.run(scenario())
@@ -0,0 +1,55 @@
+# tests/test_db.py
+import asyncio
+
+import pytest
+
+from database import db
+from database.storage import JsonStorage
+
+
+class CountingStorage(JsonStorage):
+    """JsonStorage, запоминающий записи кэша."""
+
+    def __init__(self, tmp_path) -> None:
+        super().__init__(str(tmp_path / "users.json"), str(tmp_path / "cache.json"))
+        self.cache_writes = []
+
+    def set_cache(self, key, value):
+        self.cache_writes.append([key])
+        super().set_cache(key, value)
+
+    def set_cache_many(self, items):
+        self.cache_writes.append(sorted(items))
+        super().set_cache_many(items)
+
+
+def _record(date: str):
+    return {"date": date, "page": "p", "groups": {"ИС-21": "d"}}
+
+
+def test_cache_batch_writes_once_on_success_and_nothing_on_error(tmp_path):
+    storage = CountingStorage(tmp_path)
+
+    async def scenario():
+        await db.init_db(storage, flush_interval=0)
+        try:
+            async with db.cache_batch():
+                await db.set_cached_day(0, _record("01.09"))
+                async with db.cache_batch():
+                    await db.set_cached_day(1, _record("02.09"))
+                # Внутри пакета видно своё, хранилище ещё не тронуто
+                assert (await db.get_cached_day(1))["date"] == "02.09"
+                assert storage.cache_writes == []
+            assert storage.cache_writes == [["day:0", "day:1"]]
+
+            with pytest.raises(RuntimeError):
+                async with db.cache_batch():
+                    await db.set_cached_day(0, _record("08.09"))
+                    raise RuntimeError("проверка прервана")
+            return await db.get_cached_day(0)
+        finally:
+            await db.close_db()
+
+    monday = asyncio.run(scenario())
+    assert monday["date"] == "01.09"
+    assert storage.cache_writes == [["day:0", "day:1"]]
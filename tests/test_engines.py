@@ -0,0 +1,58 @@
+# tests/test_engines.py
+import glob
+import os
+
+import pytest
+
+from benchmarks.fixtures import PAGES_DIR
+from schedule.engines import compare_engines, get_engine
+
+SAVED_PAGES = sorted(glob.glob(os.path.join(PAGES_DIR, "*.html")))
+
+# Разметка, на которой потоковый движок легче всего разойтись с bs4
+EDGE_CASES = {
+    "br": (
+        "<table><tr><td><p>1) Математика<br>305</p>"
+        "<p>2)<br/>Физика</p></td></tr></table>"
+    ),
+    "entities": (
+        '<p style="text-align: center">Расписание&nbsp;на 12&nbsp;января</p>'
+        "<table><tr><td><p>МДК&nbsp;01.01 &amp; практика &lt;305&gt;</p>"
+        "</td></tr></table>"
+    ),
+    "unclosed_td": "<table><tr><td><p>ИСП-21-24<td><p>ПКС-22</table>",
+    "unclosed_tr": "<table><tr><td>1) Физика<tr><td>2) Химия</table>",
+    "nested_tables": (
+        "<table><tr><td><table><tr><td><p>внутри</p></td></tr></table>"
+        "<p>снаружи</p></td><td>ещё</td></tr></table>"
+    ),
+    "script_style": (
+        '<script>var a = "<td>x</td>";</script>'
+        "<table><tr><td><p>1) Математика"
+        '<script>document.write("<p>y</p>")</script></p>'
+        "<style>p { color: red; }</style></td></tr></table>"
+    ),
+    "comment": "<table><tr><td><!-- <p>нет</p> --><p>да</p></td></tr></table>",
+}
+
+
+def test_saved_pages_exist():
+    assert SAVED_PAGES, f"нет сохранённых страниц в {PAGES_DIR}"
+
+
+@pytest.mark.parametrize("path", SAVED_PAGES, ids=os.path.basename)
+def test_engines_match_on_saved_pages(path):
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+
+    assert compare_engines(html) == []
+    # Не пустое совпадение: на странице есть таблица и заголовок с датой
+    table = get_engine("stream").extract(html)
+    assert table.rows
+    assert table.centered
+
+
+@pytest.mark.parametrize("html", EDGE_CASES.values(), ids=EDGE_CASES.keys())
+def test_engines_match_on_edge_cases(html):
+    assert compare_engines(html) == []
+
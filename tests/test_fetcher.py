@@ -0,0 +1,130 @@
+# tests/test_fetcher.py
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from schedule.fetcher import ScheduleFetcher
+from schedule.policy import FetchPolicy
+
+LAST_MODIFIED = "Mon, 01 Sep 2025 10:00:00 GMT"
+
+
+def _collect(fetcher, fetch):
+    async def scenario():
+        try:
+            return [r async for _, r in fetcher.iter_many(["a", "b"], fetch)]
+        finally:
+            await fetcher.close()
+
+    return asyncio.run(scenario())
+
+
+def test_iter_many_leaves_the_budget_to_the_policy():
+    # Ответ приходит ровно к бюджету политики — внешний дедлайн его не режет
+    async def fetch(url):
+        await asyncio.sleep(0.2)
+        return url
+
+    fetcher = ScheduleFetcher(deadline=0.2, deadline_grace=0.2)
+    assert _collect(fetcher, fetch) == ["a", "b"]
+
+
+def test_iter_many_gives_up_on_hung_requests():
+    async def fetch(url):
+        await asyncio.sleep(10)
+
+    fetcher = ScheduleFetcher(deadline=0.1, deadline_grace=0.1)
+    assert _collect(fetcher, fetch) == [None, None]
+
+
+class Site:
+    """Страница с ETag: на совпавший If-None-Match отвечает 304."""
+
+    def __init__(self) -> None:
+        self.body = "<p>v1</p>"
+        self.etag = '"v1"'
+        self.always_304 = False
+        self.requests = []
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests.append(dict(request.headers))
+        if self.always_304 or request.headers.get("If-None-Match") == self.etag:
+            return web.Response(status=304)
+        return web.Response(
+            text=self.body,
+            headers={"ETag": self.etag, "Last-Modified": LAST_MODIFIED},
+        )
+
+
+def run_against_site(scenario):
+    """Запускает scenario(fetcher, url, site) против локального сервера."""
+
+    async def main():
+        site = Site()
+        app = web.Application()
+        app.router.add_get("/pon", site.handle)
+        async with TestServer(app) as server:
+            fetcher = ScheduleFetcher(policy=FetchPolicy(retries=0))
+            try:
+                await scenario(fetcher, str(server.make_url("/pon")), site)
+            finally:
+                await fetcher.close()
+
+    asyncio.run(main())
+
+
+def test_validators_are_sent_after_commit_and_304_is_unchanged():
+    async def scenario(fetcher, url, site):
+        first = await fetcher.fetch_if_changed(url)
+        assert first.changed and first.text == "<p>v1</p>"
+        assert "If-None-Match" not in site.requests[-1]
+        fetcher.commit(first)
+
+        second = await fetcher.fetch_if_changed(url)
+        assert site.requests[-1]["If-None-Match"] == '"v1"'
+        assert site.requests[-1]["If-Modified-Since"] == LAST_MODIFIED
+        assert not second.changed
+        assert second.digest == first.digest and second.text is None
+
+    run_against_site(scenario)
+
+
+def test_same_body_with_new_etag_is_unchanged_and_refreshes_validators():
+    async def scenario(fetcher, url, site):
+        fetcher.commit(await fetcher.fetch_if_changed(url))
+
+        # Сервер сменил ETag, а тело то же
+        site.etag = '"v1-gzip"'
+        result = await fetcher.fetch_if_changed(url)
+        assert not result.changed
+
+        await fetcher.fetch_if_changed(url)
+        assert site.requests[-1]["If-None-Match"] == '"v1-gzip"'
+
+    run_against_site(scenario)
+
+
+def test_304_without_known_version_is_an_error():
+    async def scenario(fetcher, url, site):
+        site.always_304 = True
+        assert await fetcher.fetch_if_changed(url) is None
+
+    run_against_site(scenario)
+
+
+def test_change_is_reported_again_until_committed():
+    async def scenario(fetcher, url, site):
+        fetcher.commit(await fetcher.fetch_if_changed(url))
+        site.body, site.etag = "<p>v2</p>", '"v2"'
+
+        first = await fetcher.fetch_if_changed(url)
+        assert first.changed and first.text == "<p>v2</p>"
+        # Обработка упала, commit() не было — изменение не теряется
+        again = await fetcher.fetch_if_changed(url)
+        assert again.changed and again.digest == first.digest
+
+        fetcher.commit(again)
+        assert not (await fetcher.fetch_if_changed(url)).changed
+
+    run_against_site(scenario)
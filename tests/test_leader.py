@@ -0,0 +1,94 @@
+# tests/test_leader.py
+import asyncio
+
+from services.leader import LeaderLease, SqliteLease, run_as_leader
+
+
+class ScriptedLease(LeaderLease):
+    """Аренда, которая отвечает на acquire() по заданному сценарию."""
+
+    def __init__(self, answers):
+        self.holder = "test"
+        self._answers = list(answers)
+        self.released = False
+
+    async def acquire(self) -> bool:
+        return self._answers.pop(0) if self._answers else False
+
+    async def release(self) -> None:
+        self.released = True
+
+
+def test_crashed_job_does_not_kill_leader_loop_when_lease_is_lost():
+    async def job():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        lease = ScriptedLease([True, False, False])
+        runner = asyncio.create_task(run_as_leader(lease, job, renew_interval=0.01))
+        await asyncio.sleep(0.1)
+        # Цикл жив после потери аренды с упавшей задачей
+        assert not runner.done()
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+        return lease
+
+    assert asyncio.run(scenario()).released
+
+
+def test_crashed_job_does_not_escape_on_shutdown():
+    async def job():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        lease = ScriptedLease([True] * 100)
+        runner = asyncio.create_task(run_as_leader(lease, job, renew_interval=10))
+        await asyncio.sleep(0.05)
+        runner.cancel()
+        results = await asyncio.gather(runner, return_exceptions=True)
+        return lease, results[0]
+
+    lease, result = asyncio.run(scenario())
+    assert isinstance(result, asyncio.CancelledError)
+    assert lease.released
+
+
+
+def test_sqlite_lease_acquire_renew_and_release(tmp_path):
+    async def scenario():
+        path = str(tmp_path / "shared.db")
+        first = SqliteLease(path, ttl=30, holder="first")
+        second = SqliteLease(path, ttl=30, holder="second")
+
+        assert await first.acquire()
+        assert not await second.acquire()
+        # Продление своей аренды
+        assert await first.acquire()
+        assert not await second.acquire()
+
+        await first.release()
+        assert await second.acquire()
+        assert not await first.acquire()
+        await second.release()
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_lease_is_taken_over_after_expiry(tmp_path):
+    async def scenario():
+        path = str(tmp_path / "shared.db")
+        stalled = SqliteLease(path, ttl=0.05, holder="stalled")
+        standby = SqliteLease(path, ttl=30, holder="standby")
+
+        assert await stalled.acquire()
+        assert not await standby.acquire()
+        await asyncio.sleep(0.1)
+
+        # Лидер не продлил аренду — её забирает другая реплика
+        assert await standby.acquire()
+        assert not await stalled.acquire()
+        await stalled.release()
+        # Чужую аренду release() не снимает
+        assert not await SqliteLease(path, holder="third").acquire()
+
+    asyncio.run(scenario())
@@ -0,0 +1,116 @@
+# tests/test_metrics.py
+import asyncio
+import itertools
+
+import pytest
+
+import metrics
+from metrics import Counter, Gauge, Histogram, timed
+
+_ids = itertools.count()
+
+
+def _name(prefix: str) -> str:
+    # Метрики регистрируются глобально — имена в тестах не повторяются
+    return f"test_{prefix}_{next(_ids)}"
+
+
+@pytest.fixture
+def enabled():
+    metrics.enable()
+    yield
+    metrics.enable(False)
+
+
+def test_counter_and_gauge_samples(enabled):
+    counter = Counter(_name("requests"), "Запросы", ["result"])
+    counter.inc("hit")
+    counter.inc("hit")
+    counter.inc("miss", amount=0.5)
+    gauge = Gauge(_name("queue"), "Очередь")
+    gauge.set(5)
+    gauge.dec(amount=2)
+
+    assert list(counter.samples()) == [
+        f'{counter.name}{{result="hit"}} 2',
+        f'{counter.name}{{result="miss"}} 0.5',
+    ]
+    assert list(gauge.samples()) == [f"{gauge.name} 3"]
+    assert gauge.render()[:2] == [
+        f"# HELP {gauge.name} Очередь",
+        f"# TYPE {gauge.name} gauge",
+    ]
+
+
+def test_histogram_buckets_are_cumulative(enabled):
+    histogram = Histogram(_name("seconds"), "Время", ["kind"], buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.7, 3):
+        histogram.observe(value, "full")
+
+    name = histogram.name
+    assert list(histogram.samples()) == [
+        f'{name}_bucket{{kind="full",le="0.1"}} 1',
+        f'{name}_bucket{{kind="full",le="1"}} 3',
+        f'{name}_bucket{{kind="full",le="+Inf"}} 4',
+        f'{name}_sum{{kind="full"}} 4.25',
+        f'{name}_count{{kind="full"}} 4',
+    ]
+
+
+def test_label_values_are_escaped(enabled):
+    counter = Counter(_name("escaped"), "Экранирование", ["value"])
+    counter.inc('a"b\\c\nd')
+
+    assert list(counter.samples()) == [f'{counter.name}{{value="a\\"b\\\\c\\nd"}} 1']
+
+
+def test_wrong_label_count_is_rejected(enabled):
+    counter = Counter(_name("labels"), "Метки", ["a", "b"])
+    histogram = Histogram(_name("labels_h"), "Метки", ["a"])
+
+    with pytest.raises(ValueError):
+        counter.inc("only_one")
+    with pytest.raises(ValueError):
+        histogram.observe(1.0)
+
+
+def test_disabled_metrics_record_nothing():
+    assert not metrics.is_enabled()
+    counter = Counter(_name("off"), "Выключено", ["a"])
+    histogram = Histogram(_name("off_h"), "Выключено")
+
+    counter.inc("x")
+    # Без меток не проверяется даже их число: запись — одна проверка флага
+    counter.inc()
+    histogram.observe(1.0)
+    timer = histogram.time()
+    with timer:
+        pass
+
+    assert timer is metrics._NULL_TIMER
+    assert list(counter.samples()) == []
+    assert list(histogram.samples()) == []
+
+
+def test_timed_sync_and_async(enabled):
+    histogram = Histogram(_name("timed"), "Вызовы", ["fn"], buckets=(10,))
+
+    @timed(histogram, "sync")
+    def add(a, b):
+        return a + b
+
+    @timed(histogram, "async")
+    async def fail():
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    assert add(1, 2) == 3
+    assert add.__name__ == "add"
+    with pytest.raises(RuntimeError):
+        asyncio.run(fail())
+
+    counts = [line for line in histogram.samples() if "_count" in line]
+    assert counts == [
+        f'{histogram.name}_count{{fn="async"}} 1',
+        f'{histogram.name}_count{{fn="sync"}} 1',
+    ]
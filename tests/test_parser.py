@@ -0,0 +1,33 @@
+# tests/test_parser.py
+from schedule.parser import parse_day
+
+PAGE = """
+<p style="text-align: center">Расписание занятий на 1 сентября 2025 г.</p>
+<table>
+<tr><td>ИС-21, ИС-21к</td><td>ИС-21</td><td>ПК-31</td></tr>
+<tr>
+  <td><p>1) Общая 101</p></td>
+  <td><p>1) Своя 202</p></td>
+  <td><p>1) Чужая 303</p></td>
+</tr>
+</table>
+"""
+
+
+def test_first_cell_containing_group_wins_over_exact_match():
+    day = parse_day(PAGE, 0)
+
+    # Как в исходном парсере: первая сверху вниз ячейка с названием группы
+    assert day.texts_for("ИС-21") == ["1) Общая 101"]
+    assert day.texts_for("ИС-21к") == ["1) Общая 101"]
+    assert day.texts_for("ПК-31") == ["1) Чужая 303"]
+    assert day.texts_for("ТМ-11") == []
+
+
+def test_lookup_survives_round_trip():
+    day = parse_day(PAGE, 0)
+    day.texts_for("ИС-21")
+
+    restored = type(day).from_dict(day.to_dict())
+    assert restored.texts_for("ИС-21") == ["1) Общая 101"]
+    assert restored.digest() == day.digest()
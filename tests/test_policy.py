@@ -0,0 +1,178 @@
+# tests/test_policy.py
+import asyncio
+import time
+
+import pytest
+
+from schedule.policy import CircuitBreaker, CircuitOpenError, FetchError, FetchPolicy
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def scripted(*outcomes):
+    """attempt(), который по очереди бросает исключения или возвращает значения."""
+    calls = []
+
+    async def attempt():
+        outcome = outcomes[len(calls)]
+        calls.append(outcome)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    return attempt, calls
+
+
+def make_policy(clock=None, **kwargs) -> FetchPolicy:
+    options = dict(backoff_base=0, jitter=0, budget=10, hedge=False)
+    options.update(kwargs)
+    return FetchPolicy(clock=clock or FakeClock(), **options)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_breaker_opens_at_threshold():
+    breaker = CircuitBreaker(threshold=3, reset_timeout=30, clock=FakeClock())
+
+    assert not breaker.record_failure()
+    assert not breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_half_open_lets_exactly_one_probe_through():
+    clock = FakeClock()
+    breaker = CircuitBreaker(threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+
+    clock.advance(30)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    # Отменённая проба освобождает место для следующей
+    breaker.cancel_probe()
+    assert breaker.allow()
+
+    # Неудачная проба выключает хост ещё на reset_timeout
+    assert breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.advance(30)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def test_retries_transient_errors_until_success():
+    policy = make_policy(retries=2)
+    attempt, calls = scripted(FetchError("503"), FetchError("503"), "ok")
+
+    assert run(policy.call("host", attempt)) == "ok"
+    assert len(calls) == 3
+    assert policy.stats()["host"]["retries"] == 2
+    assert policy.stats()["host"]["breaker"] == "closed"
+
+
+def test_open_breaker_short_circuits_without_calling():
+    policy = make_policy(retries=0, breaker_threshold=2)
+    attempt, calls = scripted(FetchError("503"), FetchError("503"), "ok")
+
+    for _ in range(2):
+        with pytest.raises(FetchError):
+            run(policy.call("host", attempt))
+
+    with pytest.raises(CircuitOpenError):
+        run(policy.call("host", attempt))
+    assert len(calls) == 2
+    assert policy.stats()["host"]["short_circuited"] == 1
+
+
+def test_non_transient_error_is_not_retried_and_does_not_trip_breaker():
+    policy = make_policy(retries=3, breaker_threshold=1)
+    attempt, calls = scripted(*[FetchError("404", transient=False)] * 3)
+
+    for _ in range(3):
+        with pytest.raises(FetchError):
+            run(policy.call("host", attempt))
+
+    assert len(calls) == 3
+    stats = policy.stats()["host"]
+    assert stats["breaker"] == "closed"
+    assert stats["retries"] == 0
+
+
+def test_budget_cuts_retries_short():
+    # Пауза перед повтором (5 с) не влезает в оставшийся бюджет (4 с)
+    policy = make_policy(retries=5, backoff_base=5, budget=4)
+    attempt, calls = scripted(FetchError("503"), "ok")
+
+    with pytest.raises(FetchError):
+        run(policy.call("host", attempt))
+    assert len(calls) == 1
+
+
+def _hedged_policy() -> FetchPolicy:
+    return make_policy(
+        clock=time.monotonic,
+        hedge=True,
+        hedge_min_samples=1,
+        hedge_min_delay=0.05,
+        hedge_quantile=0.5,
+    )
+
+
+def _attempt_with_delays(*delays):
+    """Попытки отвечают своим номером через заданные задержки."""
+    started = []
+
+    async def attempt():
+        n = len(started)
+        started.append(n)
+        await asyncio.sleep(delays[n])
+        return n
+
+    return attempt, started
+
+
+def test_hedge_wins_when_first_attempt_hangs():
+    async def scenario():
+        policy = _hedged_policy()
+        attempt, started = _attempt_with_delays(0, 5, 0)
+        assert await policy.call("host", attempt) == 0  # задержка для квантиля
+
+        assert await policy.call("host", attempt) == 2
+        return policy.stats()["host"], started
+
+    stats, started = run(scenario())
+    assert len(started) == 3
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_hedge_loses_to_first_attempt():
+    async def scenario():
+        policy = _hedged_policy()
+        attempt, started = _attempt_with_delays(0, 0.15, 5)
+        assert await policy.call("host", attempt) == 0
+
+        assert await policy.call("host", attempt) == 1
+        return policy.stats()["host"]
+
+    stats = run(scenario())
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 0
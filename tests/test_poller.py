@@ -0,0 +1,96 @@
+# tests/test_poller.py
+import asyncio
+from datetime import datetime
+
+from services.poller import PollScheduler
+
+MONDAY = datetime(2025, 9, 1)
+FRIDAY = datetime(2025, 9, 5)
+
+
+def _at(day: datetime, clock: str) -> datetime:
+    hour, minute, *second = (int(part) for part in clock.split(":"))
+    return day.replace(hour=hour, minute=minute, second=second[0] if second else 0)
+
+
+async def _unused_check(weekdays):
+    raise AssertionError("проверка не ожидалась")
+
+
+def make_scheduler(check=_unused_check, now: datetime = MONDAY) -> PollScheduler:
+    return PollScheduler(
+        check,
+        windows=[("12:00", "18:00")],
+        window_interval=30,
+        window_max_interval=60,
+        interval=300,
+        max_interval=1800,
+        factor=2,
+        jitter=0,
+        lookahead=3,
+        clock=lambda: now,
+    )
+
+
+def test_interval_inside_and_outside_window():
+    scheduler = make_scheduler()
+
+    assert scheduler.in_window(_at(MONDAY, "13:00"))
+    assert scheduler.delay(0, _at(MONDAY, "13:00")) == 30
+    assert not scheduler.in_window(_at(MONDAY, "08:00"))
+    assert scheduler.delay(0, _at(MONDAY, "08:00")) == 300
+
+
+def test_backoff_grows_until_cap():
+    scheduler = make_scheduler()
+    night = _at(MONDAY, "19:00")  # до следующего окна 17 часов
+    window = _at(MONDAY, "13:00")
+
+    delays = []
+    for _ in range(6):
+        delays.append(scheduler.delay(0, night))
+        scheduler.record(0, False, night)
+    assert delays == [300, 600, 1200, 1800, 1800, 1800]
+    assert scheduler.delay(0, window) == 60
+
+    # Изменение сбрасывает откат
+    scheduler.record(0, True, night)
+    assert scheduler.delay(0, night) == 300
+
+
+def test_delay_does_not_overshoot_next_window():
+    scheduler = make_scheduler()
+
+    assert scheduler.delay(0, _at(MONDAY, "11:58")) == 120
+    assert scheduler.seconds_until_window(_at(MONDAY, "18:00")) == 18 * 3600
+    # Не меньше секунды, даже если окно вот-вот начнётся
+    assert scheduler.delay(0, _at(MONDAY, "11:59:59")) == 1.0
+
+
+def test_active_days_look_ahead_and_wrap_over_weekend():
+    scheduler = make_scheduler()
+
+    assert scheduler.active_days(MONDAY) == [0, 1, 2, 3]
+    # Пятница: суббота и воскресенье без расписания, понедельник через 3 дня
+    assert scheduler.active_days(FRIDAY) == [0, 4]
+    assert scheduler.active_days(datetime(2025, 9, 6)) == [0, 1]
+
+
+def test_failing_check_keeps_interval_and_loop():
+    calls = []
+
+    async def check(weekdays):
+        calls.append(weekdays)
+        raise RuntimeError("сайт недоступен")
+
+    night = _at(MONDAY, "19:00")
+    scheduler = make_scheduler(check, now=night)
+    for _ in range(2):
+        scheduler.record(0, False, night)
+    scheduler._days[0].next_due = 0
+
+    # Ошибка не роняет тик, а откат дня не растёт и не сбрасывается
+    assert asyncio.run(scheduler.tick()) == [0, 1, 2, 3]
+    assert calls == [[0, 1, 2, 3]]
+    assert scheduler._days[0].unchanged == 2
+    assert scheduler.delay(0, night) == 1200
@@ -0,0 +1,140 @@
+# tests/test_profiles.py
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from database import db
+from database.profiles import ProfileCache, UserProfile
+from database.storage import JsonStorage
+from handlers import middlewares
+from handlers.middlewares import ProfileMiddleware
+
+
+class RecordingStorage(JsonStorage):
+    """JsonStorage, запоминающий записи пользователей."""
+
+    def __init__(self, tmp_path) -> None:
+        super().__init__(str(tmp_path / "users.json"), str(tmp_path / "cache.json"))
+        self.writes = []
+        self.read_gate: threading.Event | None = None
+
+    def get_user(self, user_id):
+        if self.read_gate is not None:
+            self.read_gate.wait(5)
+        return super().get_user(user_id)
+
+    def set_user_group(self, user_id, group_name):
+        self.writes.append(("group_name", group_name))
+        super().set_user_group(user_id, group_name)
+
+    def set_auto_send(self, user_id, enabled):
+        self.writes.append(("auto_send", enabled))
+        super().set_auto_send(user_id, enabled)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return RecordingStorage(tmp_path)
+
+
+def with_db(storage, scenario):
+    async def main():
+        await db.init_db(storage, flush_interval=0)
+        try:
+            return await scenario()
+        finally:
+            await db.close_db()
+
+    return asyncio.run(main())
+
+
+def test_cached_profile_is_a_copy():
+    cache = ProfileCache(maxsize=10, ttl=60)
+    cache.put(UserProfile(user_id=1, group_name="ИС-21"))
+
+    profile = cache.get(1)
+    profile.group_name = "ПК-31"
+
+    assert cache.get(1).group_name == "ИС-21"
+    assert cache.get(1) is not cache.get(1)
+
+
+def test_entries_expire_after_ttl():
+    cache = ProfileCache(maxsize=10, ttl=0.01)
+    cache.put(UserProfile(user_id=1, group_name="ИС-21"))
+    time.sleep(0.02)
+
+    assert cache.get(1) is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_is_evicted():
+    cache = ProfileCache(maxsize=2, ttl=60)
+    for user_id in (1, 2):
+        cache.put(UserProfile(user_id=user_id, group_name="ИС-21"))
+    cache.get(1)
+    cache.put(UserProfile(user_id=3, group_name="ИС-21"))
+
+    assert cache.get(2) is None
+    assert cache.get(1) is not None and cache.get(3) is not None
+
+
+def test_load_racing_with_write_is_not_cached(storage):
+    async def scenario():
+        storage.set_user_group(1, "ИС-21")
+        storage.read_gate = threading.Event()
+        load = asyncio.create_task(db.get_profile(1))
+        await asyncio.sleep(0.05)
+
+        # Пока чтение в пути, профиль записали — прочитанное устарело
+        db._profiles.update(1, group_name="ПК-31")
+        storage.read_gate.set()
+        loaded = await load
+
+        storage.read_gate = None
+        return loaded, db._profiles.get(1)
+
+    loaded, cached = with_db(storage, scenario)
+    assert loaded.group_name == "ИС-21"
+    assert cached is None
+
+
+def test_save_profile_writes_only_changed_fields(storage):
+    async def scenario():
+        profile = await db.get_profile(1)
+        await db.save_profile(profile)
+        assert storage.writes == []
+
+        profile.group_name = "ПК-31"
+        await db.save_profile(profile)
+        assert storage.writes == [("group_name", "ПК-31")]
+        assert not profile.dirty and profile.exists
+
+        profile.auto_send = True
+        await db.save_profile(profile)
+        return (await db.get_profile(1)).auto_send
+
+    assert with_db(storage, scenario)
+    assert storage.writes == [("group_name", "ПК-31"), ("auto_send", True)]
+
+
+def test_double_tap_toggle_is_not_lost(storage):
+    middleware = ProfileMiddleware()
+
+    async def toggle(event, data):
+        profile = data["profile"]
+        await asyncio.sleep(0.01)  # хендлер ждёт Telegram
+        profile.auto_send = not profile.auto_send
+
+    async def scenario():
+        data = [{"event_from_user": SimpleNamespace(id=1)} for _ in range(2)]
+        await asyncio.gather(*(middleware(toggle, None, d) for d in data))
+        return (await db.get_profile(1)).auto_send
+
+    # Два нажатия «переключить» возвращают исходное значение
+    assert with_db(storage, scenario) is False
+    assert storage.writes == [("auto_send", True), ("auto_send", False)]
+    assert middlewares._user_locks == {}
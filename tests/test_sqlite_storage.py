@@ -0,0 +1,91 @@
+# tests/test_sqlite_storage.py
+import json
+
+import pytest
+
+from config import DEFAULT_GROUP
+from database.sqlite_storage import SqliteStorage
+from database.storage import lessons_digest
+
+
+def _storage(tmp_path) -> SqliteStorage:
+    return SqliteStorage(
+        str(tmp_path / "bot.db"),
+        json_db_path=str(tmp_path / "users.json"),
+        json_cache_path=str(tmp_path / "schedule_cache.json"),
+    )
+
+
+def _write(path, data) -> None:
+    path.write_text(data if isinstance(data, str) else json.dumps(data), "utf-8")
+
+
+@pytest.mark.parametrize("users_json", ["{not json", '{"users": []}', "[1]"])
+def test_broken_users_json_is_not_migrated_as_empty(tmp_path, users_json):
+    _write(tmp_path / "users.json", users_json)
+
+    storage = _storage(tmp_path)
+    storage.init()
+    assert storage.get_user(1) is None
+    storage.close()
+
+    # Файл отложен в сторону, а не потерян
+    (broken,) = tmp_path.glob("users.json.corrupt-*")
+    assert broken.read_text("utf-8") == users_json
+
+    # Отметки о переносе нет: восстановленный файл переносится потом
+    _write(tmp_path / "users.json", {"users": {"1": {"group_name": "ИС-21"}}})
+    storage = _storage(tmp_path)
+    storage.init()
+    assert storage.get_user(1) == {"group_name": "ИС-21", "auto_send": False}
+    storage.close()
+
+
+def test_json_data_is_migrated_once(tmp_path):
+    _write(
+        tmp_path / "users.json",
+        {"users": {"1": {"group_name": "ИС-21", "auto_send": True}, "2": {}}},
+    )
+    _write(
+        tmp_path / "schedule_cache.json",
+        {"date:0": "01.09.2025", "0:ИС-21": ["1) Предмет 101"]},
+    )
+
+    storage = _storage(tmp_path)
+    storage.init()
+    assert storage.get_user(1) == {"group_name": "ИС-21", "auto_send": True}
+    assert storage.get_user(2) == {"group_name": DEFAULT_GROUP, "auto_send": False}
+    assert storage.get_cache("0:ИС-21") is None
+    day = storage.get_cache("day:0")
+    assert day["date"] == "01.09.2025"
+    assert day["groups"] == {"ИС-21": lessons_digest(["1) Предмет 101"])}
+    storage.set_user_group(1, "ПК-31")
+    storage.close()
+
+    # Повторный запуск не переносит JSON поверх новых данных
+    storage = _storage(tmp_path)
+    storage.init()
+    assert storage.get_user(1)["group_name"] == "ПК-31"
+    storage.close()
+
+
+def test_round_trip_survives_reopen(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "bot.db"))
+    storage.init()
+    storage.set_user_group(1, "ИС-21")
+    storage.set_auto_send(1, True)
+    storage.set_auto_send(2, True)
+    storage.set_auto_send(3, False)
+    storage.set_cache("day:0", {"date": "01.09.2025", "page": "p", "groups": {}})
+    storage.set_cache_many({"day:1": {"date": "02.09.2025"}, "day:2": {"date": ""}})
+    storage.close()
+
+    storage = SqliteStorage(str(tmp_path / "bot.db"))
+    storage.init()
+    assert storage.get_user(1) == {"group_name": "ИС-21", "auto_send": True}
+    assert storage.get_user(3) == {"group_name": DEFAULT_GROUP, "auto_send": False}
+    assert storage.get_subscribers_by_group() == {DEFAULT_GROUP: [2], "ИС-21": [1]}
+    assert storage.get_cache("day:0")["page"] == "p"
+    assert storage.get_cache("day:1") == {"date": "02.09.2025"}
+    assert storage.get_cache("missing") is None
+    storage.close()
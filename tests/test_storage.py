@@ -0,0 +1,89 @@
+# tests/test_storage.py
+import json
+
+import pytest
+
+from config import DEFAULT_GROUP
+from database.storage import JsonStorage, lessons_digest
+
+
+@pytest.mark.parametrize(
+    "users_json", ["{}", '{"users": []}', "[]", '{"other": {"1": {}}}']
+)
+def test_init_survives_valid_json_without_users(tmp_path, users_json):
+    db_path = tmp_path / "users.json"
+    cache_path = tmp_path / "schedule_cache.json"
+    db_path.write_text(users_json, encoding="utf-8")
+    cache_path.write_text("[]", encoding="utf-8")
+
+    storage = JsonStorage(str(db_path), str(cache_path))
+    storage.init()
+
+    assert storage.get_user(1) is None
+    storage.set_auto_send(1, True)
+    assert storage.get_subscribers_by_group() == {DEFAULT_GROUP: [1]}
+
+
+def test_wrong_shape_users_json_is_set_aside(tmp_path):
+    db_path = tmp_path / "users.json"
+    db_path.write_text('{"users": ["1"]}', encoding="utf-8")
+
+    JsonStorage(str(db_path), str(tmp_path / "schedule_cache.json")).init()
+
+    (broken,) = tmp_path.glob("users.json.corrupt-*")
+    assert broken.read_text(encoding="utf-8") == '{"users": ["1"]}'
+    assert json.loads(db_path.read_text(encoding="utf-8")) == {"users": {}}
+
+
+def test_init_keeps_users(tmp_path):
+    db_path = tmp_path / "users.json"
+    user = {"group_name": "ИС-21", "auto_send": True}
+    db_path.write_text(json.dumps({"users": {"1": user}}), encoding="utf-8")
+
+    storage = JsonStorage(str(db_path), str(tmp_path / "schedule_cache.json"))
+    storage.init()
+
+    assert storage.get_user(1) == user
+    assert storage.get_subscribers_by_group() == {"ИС-21": [1]}
+
+
+
+def test_subscriber_index_follows_group_and_auto_send(tmp_path):
+    storage = JsonStorage(str(tmp_path / "users.json"), str(tmp_path / "cache.json"))
+    storage.init()
+
+    # Без рассылки смена группы индекс не трогает
+    storage.set_user_group(1, "ИС-21")
+    assert storage.get_subscribers_by_group() == {}
+
+    storage.set_auto_send(1, True)
+    storage.set_auto_send(2, True)
+    storage.set_user_group(1, "ПК-31")
+    assert storage.get_subscribers_by_group() == {"ПК-31": [1], DEFAULT_GROUP: [2]}
+
+    storage.set_auto_send(1, False)
+    storage.set_user_group(1, "ИС-21")
+    storage.set_user_group(2, "ИС-21")
+    assert storage.get_subscribers_by_group() == {"ИС-21": [2]}
+
+
+def test_legacy_schedule_cache_is_folded_into_day_records(tmp_path):
+    cache_path = tmp_path / "schedule_cache.json"
+    lessons = ["1 пара Математика", "2 пара Физика"]
+    legacy = {"date:0": "01.09", "0:ИС-21": lessons, "1:ИС-21": [], "other": 1}
+    cache_path.write_text(json.dumps(legacy), encoding="utf-8")
+
+    storage = JsonStorage(str(tmp_path / "users.json"), str(cache_path))
+    storage.init()
+
+    saved = json.loads(cache_path.read_text(encoding="utf-8"))
+    assert saved == {
+        "other": 1,
+        "day:0": {
+            "date": "01.09",
+            "page": "",
+            "groups": {"ИС-21": lessons_digest(lessons)},
+        },
+        "day:1": {"date": "", "page": "", "groups": {"ИС-21": lessons_digest([])}},
+    }
+    assert storage.get_cache("date:0") is None
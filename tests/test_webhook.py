@@ -0,0 +1,44 @@
+# tests/test_webhook.py
+import asyncio
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message
+from aiohttp.test_utils import TestClient, TestServer
+
+from loadtest.webhook import message_update
+from main import build_webhook_app
+
+SECRET = "test-secret"
+
+
+def test_webhook_accepts_only_requests_with_secret():
+    received = []
+    dp = Dispatcher()
+
+    @dp.message()
+    async def remember(message: Message) -> None:
+        received.append(message.text)
+
+    async def post(client: TestClient, headers) -> int:
+        response = await client.post(
+            "/webhook", json=message_update(1, "Сегодня"), headers=headers
+        )
+        return response.status
+
+    async def scenario():
+        bot = Bot(token="123456:TEST")
+        app = build_webhook_app(
+            bot, dp, path="/webhook", secret=SECRET, background=False
+        )
+        async with TestClient(TestServer(app)) as client:
+            ok = await post(client, {"X-Telegram-Bot-Api-Secret-Token": SECRET})
+            missing = await post(client, {})
+            wrong = await post(client, {"X-Telegram-Bot-Api-Secret-Token": "nope"})
+        await bot.session.close()
+        return ok, missing, wrong
+
+    ok, missing, wrong = asyncio.run(scenario())
+    assert ok == 200
+    assert missing == wrong == 401
+    # До хендлера дошёл только апдейт с правильным секретом
+    assert received == ["Сегодня"]